@@ -1,21 +1,86 @@
-from fastapi import FastAPI, HTTPException
+import json
+import time
+from contextlib import asynccontextmanager
+import math
+from fastapi import FastAPI, HTTPException, Query, Header, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import BaseModel
-from typing import Optional
-import uvicorn
-from datetime import datetime, timedelta
+from typing import Optional, List
+from datetime import datetime, timedelta, timezone
 from config import (
     DEFAULT_TIMEZONE, DEFAULT_HOST, DEFAULT_PORT, API_TITLE,
-    ERROR_MESSAGES, SUCCESS_MESSAGES, HTTP_STATUS
+    ERROR_MESSAGES, SUCCESS_MESSAGES, HTTP_STATUS,
+    EVENTS_PAGE_SIZE, MAX_EVENTS_PAGE_SIZE, MAX_SUGGESTION_HORIZON_WEEKS,
+    MAX_SUGGESTIONS_PER_DURATION, ENABLE_AUTO_RESCHEDULE, MAX_BATCH_CREATE_EVENTS,
+    ENABLE_CONFLICT_RESOLUTION, FIELD_MASKS, ENABLE_PUSH_NOTIFICATIONS, PUSH_WEBHOOK_PATH
 )
+from async_calendar import get_async_client, close_async_client
 from utils import (
-    get_service, get_current_ongoing_event, auto_reschedule_abandoned_events,
+    get_current_ongoing_event, auto_reschedule_abandoned_events,
     find_available_slot, create_event_in_past, get_expired_events_info,
-    configure_calendar_id, get_configured_calendar_id, add_paused_event,
+    configure_calendar_id, get_configured_calendar_id, is_calendar_configured, add_paused_event,
     get_paused_event, get_all_paused_events, remove_paused_event,
-    get_last_paused_event_id
+    get_last_paused_event_id, get_event_mirror, record_created_event,
+    record_deleted_event, format_event_info, batch_delete_events,
+    find_events_by_name, suggest_free_slots, attach_reschedule_scheduler, calendar_registry,
+    paused_event_lease_key, build_event_body, batch_insert_events, find_conflicts, get_paused_store,
+    get_push_channels
 )
+from response_cache import get_response_cache, MISS
+from rate_limit import client_address, get_inbound_limiter, get_outbound_throttle, interactive
+from resilience import get_circuit_breaker
+from leases import get_lease_manager, LeaseUnavailable
+from paused_store import PausedEvent
+from scheduler import RescheduleScheduler
 
-app = FastAPI(title=API_TITLE)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled async Calendar client for the lifetime of the server
+    get_async_client()
+    # Reschedule abandoned paused events as their deadlines fall due
+    scheduler = None
+    if ENABLE_AUTO_RESCHEDULE:
+        scheduler = RescheduleScheduler(
+            auto_reschedule_abandoned_events,
+            lambda event_id: get_paused_event(event_id) is not None,
+            lambda: get_paused_store().next_deadline()  # Deadlines set by other workers
+        )
+        attach_reschedule_scheduler(scheduler)
+        scheduler.start()
+    # Keep events().watch channels open so edits made elsewhere arrive as notifications
+    if ENABLE_PUSH_NOTIFICATIONS:
+        get_push_channels().start()
+    yield
+    if scheduler is not None:
+        attach_reschedule_scheduler(None)
+        await scheduler.stop()
+    if ENABLE_PUSH_NOTIFICATIONS:
+        await get_push_channels().stop()
+    calendar_registry.stop_all()
+    await close_async_client()
+
+app = FastAPI(title=API_TITLE, lifespan=lifespan)
+
+@app.middleware("http")
+async def rate_limit_clients(request: Request, call_next):
+    """Token-bucket admission per client address (RATE_LIMIT); over the limit gets 429 + Retry-After
+
+    Google's push notifications are exempt: they arrive in bursts and are verified by channel token.
+    Behind trusted reverse proxies the client address is read from X-Forwarded-For.
+    """
+    limiter = get_inbound_limiter()
+    if limiter is not None and request.url.path != PUSH_WEBHOOK_PATH:
+        peer = request.client.host if request.client else "unknown"
+        client = client_address(peer, request.headers.get("x-forwarded-for"))
+        retry_after = limiter.admit(client)
+        if retry_after > 0:
+            return JSONResponse(
+                status_code=HTTP_STATUS["TOO_MANY_REQUESTS"],
+                content={"detail": ERROR_MESSAGES["rate_limited"]},
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+    return await call_next(request)
 
 # Pydantic models for requests
 class CalendarConfig(BaseModel):
@@ -23,6 +88,7 @@ class CalendarConfig(BaseModel):
 
 class DeleteEventRequest(BaseModel):
     event_name: str
+    match_case: bool = True  # False matches titles case-insensitively
 
 class EventRequest(BaseModel):
     event_name: str
@@ -31,6 +97,7 @@ class EventRequest(BaseModel):
     timezone: str = DEFAULT_TIMEZONE
     utc_offset: Optional[str] = None  # Format: "+5:30", "-7:00", "+0:00", etc.
     recurrence: Optional[list] = None
+    reject_on_conflict: bool = False  # True refuses to double-book instead of only reporting conflicts
 
 class PauseEventRequest(BaseModel):
     pass  # No event name needed - will pause current ongoing event
@@ -38,6 +105,34 @@ class PauseEventRequest(BaseModel):
 class ResumeEventRequest(BaseModel):
     pass  # No event name needed - will resume last paused event
 
+class SuggestSlotsRequest(BaseModel):
+    durations_minutes: List[int]
+    horizon_weeks: int = 1
+    top_k: int = 5
+    start_datetime: Optional[str] = None  # ISO 8601, defaults to now; naive values are read as UTC
+
+def resolve_calendar_id(x_calendar_id: Optional[str] = Header(None)):
+    """Calendar a request targets: the X-Calendar-Id header, else the default configured calendar"""
+    if x_calendar_id:
+        if not is_calendar_configured(x_calendar_id):
+            raise HTTPException(status_code=HTTP_STATUS["BAD_REQUEST"], detail=f"{ERROR_MESSAGES['calendar_not_configured']} ({x_calendar_id})")
+        return x_calendar_id
+    calendar_id = get_configured_calendar_id()
+    if not calendar_id:
+        raise HTTPException(status_code=HTTP_STATUS["BAD_REQUEST"], detail=ERROR_MESSAGES["calendar_not_configured"])
+    return calendar_id
+
+async def stream_events_ndjson(calendar_id: str, page_size: int):
+    """Yield events as NDJSON lines, fetching one upstream page at a time"""
+    try:
+        async for page in get_async_client().iter_event_pages(calendar_id, singleEvents=True, orderBy='startTime',
+                                                              maxResults=page_size, fields=FIELD_MASKS["events_page"]):
+            for event in page.get('items', []):
+                yield json.dumps(format_event_info(event)) + "\n"
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        yield json.dumps({"error": f"{ERROR_MESSAGES['failed_to_retrieve_events']}: {str(e)}"}) + "\n"
+
 @app.post("/configure-calendar")
 async def configure_calendar(config: CalendarConfig):
     """
@@ -48,20 +143,20 @@ async def configure_calendar(config: CalendarConfig):
         "gmail": "cotgen00@gmail.com"
     }
 
+    Any number of calendars can be configured. Other endpoints act on the
+    calendar named in the X-Calendar-Id header, or on the most recently
+    configured one when the header is absent.
     """
     try:
-        configure_calendar_id(config.gmail)
-        
-        # Test if we can access this calendar
-        service = get_service()
-        # Try to get calendar info to verify access
-        calendar = service.calendars().get(calendarId=config.gmail).execute()
+        # Get calendar info to verify access before registering it
+        calendar = await get_async_client().get_calendar(config.gmail, fields=FIELD_MASKS["calendar_info"])
+        await run_in_threadpool(configure_calendar_id, config.gmail)
         return {"message": f"{SUCCESS_MESSAGES['calendar_configured']} {config.gmail}", "calendar_name": calendar.get("summary")}
     except Exception as e:
         raise HTTPException(status_code=HTTP_STATUS["BAD_REQUEST"], detail=f"{ERROR_MESSAGES['failed_to_access_calendar']} {config.gmail}: {str(e)}")
 
 @app.post("/create-event")
-async def create_event(event: EventRequest):
+async def create_event(event: EventRequest, calendar_id: str = Depends(resolve_calendar_id)):
     """
     Create an event in the configured calendar
     
@@ -78,36 +173,30 @@ async def create_event(event: EventRequest):
     Supported formats:
     - Timezone names: "UTC", "Asia/Kolkata", "America/New_York", "Europe/London", etc.
     - UTC offsets: "+5:30" (India), "-7:00" (USA PST), "+0:00" (London), "+1:00" (CET), etc.
+    
+    Overlapping events (for every occurrence of a recurrence) are returned
+    in "conflicts"; with "reject_on_conflict": true the event is not created
+    and the response is 409. "conflicts" is null when no local index was
+    available to check against.
     """
-    configured_calendar_id = get_configured_calendar_id()
+    try:
+        event_data, timezone_to_use = build_event_body(
+            event.event_name, event.start_datetime, event.end_datetime,
+            event.timezone, event.utc_offset, event.recurrence
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=HTTP_STATUS["BAD_REQUEST"], detail=str(e))
     
-    if not configured_calendar_id:
-        raise HTTPException(status_code=HTTP_STATUS["BAD_REQUEST"], detail=ERROR_MESSAGES["calendar_not_configured"])
+    conflicts = find_conflicts(calendar_id, event_data) if ENABLE_CONFLICT_RESOLUTION else None
+    if conflicts and event.reject_on_conflict:
+        raise HTTPException(status_code=HTTP_STATUS["CONFLICT"], detail={
+            "message": ERROR_MESSAGES["event_conflict"],
+            "conflicts": conflicts
+        })
     
     try:
-        service = get_service()
-        
-        # Determine which timezone to use
-        timezone_to_use = event.timezone
-        if event.utc_offset:
-            # Convert UTC offset to timezone format
-            # Google Calendar accepts UTC offsets in format like "UTC+05:30" or "UTC-07:00"
-            timezone_to_use = f"UTC{event.utc_offset}"
-        
-        event_data = {
-            "summary": event.event_name,
-            "start": {"dateTime": event.start_datetime, "timeZone": timezone_to_use},
-            "end": {"dateTime": event.end_datetime, "timeZone": timezone_to_use},
-        }
-        
-        # Add recurrence if provided
-        if event.recurrence:
-            event_data["recurrence"] = event.recurrence
-        
-        created_event = service.events().insert(
-            calendarId=configured_calendar_id, 
-            body=event_data
-        ).execute()
+        created_event = await get_async_client().insert_event(calendar_id, event_data)
+        record_created_event(calendar_id, created_event)
         
         return {
             "message": "Event created successfully",
@@ -119,50 +208,158 @@ async def create_event(event: EventRequest):
             "timezone_used": timezone_to_use,
             "original_timezone": event.timezone,
             "utc_offset": event.utc_offset,
-            "recurrence": event.recurrence
+            "recurrence": event.recurrence,
+            "conflicts": conflicts
         }
         
     except Exception as e:
         raise HTTPException(status_code=HTTP_STATUS["INTERNAL_SERVER_ERROR"], detail=f"{ERROR_MESSAGES['failed_to_create_event']}: {str(e)}")
 
+@app.post("/create-events/batch")
+async def create_events_batch(events: List[EventRequest], calendar_id: str = Depends(resolve_calendar_id)):
+    """
+    Create many events in one call
+    
+    Body: a JSON array of /create-event payloads. Every item is validated
+    (timezone, datetimes) before anything is sent; valid items then go out
+    as Google batch requests. The response has one result per item, in order,
+    with status "created", "invalid", "conflict" (reject_on_conflict items
+    that overlap existing events) or "failed".
+    """
+    if len(events) > MAX_BATCH_CREATE_EVENTS:
+        raise HTTPException(status_code=HTTP_STATUS["BAD_REQUEST"], detail=f"At most {MAX_BATCH_CREATE_EVENTS} events per batch")
+    
+    results = []
+    bodies = []
+    for index, event in enumerate(events):
+        result = {"index": index, "event_name": event.event_name, "status": "invalid", "event_id": None}
+        try:
+            event_data, result["timezone_used"] = build_event_body(
+                event.event_name, event.start_datetime, event.end_datetime,
+                event.timezone, event.utc_offset, event.recurrence
+            )
+        except ValueError as e:
+            result["error"] = str(e)
+            results.append(result)
+            continue
+        result["conflicts"] = find_conflicts(calendar_id, event_data) if ENABLE_CONFLICT_RESOLUTION else None
+        if result["conflicts"] and event.reject_on_conflict:
+            result["status"] = "conflict"
+            result["error"] = ERROR_MESSAGES["event_conflict"]
+        else:
+            bodies.append((result, event_data))
+        results.append(result)
+    
+    try:
+        # Batch requests run on blocking httplib2 transports, so off the event loop
+        inserted = await run_in_threadpool(batch_insert_events, calendar_id, [body for _, body in bodies])
+    except Exception as e:
+        raise HTTPException(status_code=HTTP_STATUS["INTERNAL_SERVER_ERROR"], detail=f"{ERROR_MESSAGES['failed_to_create_event']}: {str(e)}")
+    
+    for (result, _), outcome in zip(bodies, inserted):
+        result["status"] = outcome["status"]
+        if outcome["status"] == "created":
+            record_created_event(calendar_id, outcome["event"])
+            result["event_id"] = outcome["event"].get("id")
+            result["event_link"] = outcome["event"].get("htmlLink")
+        else:
+            result["error"] = outcome["error"]
+    
+    created_count = sum(1 for result in results if result["status"] == "created")
+    return {
+        "message": f"Created {created_count} of {len(events)} events",
+        "created_count": created_count,
+        "failed_count": len(events) - created_count,
+        "results": results
+    }
+
 @app.get("/events")
-async def get_events():
+async def get_events(
+    page_token: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_EVENTS_PAGE_SIZE),
+    stream: bool = False,
+    calendar_id: str = Depends(resolve_calendar_id)
+):
     """
     Get all event names from the configured calendar
     
     Returns a list of all events with their names, IDs, and basic timing information
+    
+    Optional query parameters:
+    - limit / page_token: return one page of events plus "next_page_token" for the next call
+    - stream=true: stream every event as NDJSON (one JSON object per line), fetching pages as it goes
+    
+    Non-streamed responses are cached (CACHE_CONFIG) until this service
+    changes the calendar or the TTL runs out.
     """
-    configured_calendar_id = get_configured_calendar_id()
+    if stream:
+        return StreamingResponse(
+            stream_events_ndjson(calendar_id, limit or EVENTS_PAGE_SIZE),
+            media_type="application/x-ndjson"
+        )
     
-    if not configured_calendar_id:
-        raise HTTPException(status_code=HTTP_STATUS["BAD_REQUEST"], detail=ERROR_MESSAGES["calendar_not_configured"])
+    cache = get_response_cache()
+    cache_key = ("/events", calendar_id, page_token, limit)
+    cached = cache.get(cache_key)
+    if cached is not MISS:
+        return cached
     
     try:
-        service = get_service()
-        
-        # Get all events from the calendar
-        events_result = service.events().list(
-            calendarId=configured_calendar_id,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
-        event_list = []
-        
-        # Extract event information
-        for event in events:
-            event_info = {
-                "event_id": event.get('id'),
-                "event_name": event.get('summary', 'No Title'),
-                "start_time": event.get('start', {}).get('dateTime', event.get('start', {}).get('date', 'N/A')),
-                "end_time": event.get('end', {}).get('dateTime', event.get('end', {}).get('date', 'N/A')),
-                "status": event.get('status', 'confirmed')
+        if page_token or limit:
+            # Cursor pagination straight over Google's page tokens
+            params = {"singleEvents": True, "orderBy": 'startTime', "maxResults": limit or EVENTS_PAGE_SIZE,
+                      "fields": FIELD_MASKS["events_page"]}
+            if page_token:
+                params["pageToken"] = page_token
+            page = await get_async_client().list_events(calendar_id, **params)
+            event_list = [format_event_info(event) for event in page.get('items', [])]
+            
+            response = {
+                "message": f"Found {len(event_list)} events in this page",
+                "total_events": len(event_list),
+                "events": event_list,
+                "next_page_token": page.get('nextPageToken')
             }
-            event_list.append(event_info)
+        else:
+            mirror = get_event_mirror(calendar_id)
+            if mirror:
+                events = mirror.all_events()
+            else:
+                # Get all events from the calendar, following every page
+                events = []
+                async for page in get_async_client().iter_event_pages(calendar_id, singleEvents=True,
+                                                                      orderBy='startTime', maxResults=MAX_EVENTS_PAGE_SIZE,
+                                                                      fields=FIELD_MASKS["events_page"]):
+                    events.extend(page.get('items', []))
+            
+            # Extract event information
+            event_list = [format_event_info(event) for event in events]
+            
+            response = {
+                "message": f"Found {len(event_list)} events in calendar",
+                "total_events": len(event_list),
+                "events": event_list
+            }
+        
+    except Exception as e:
+        raise HTTPException(status_code=HTTP_STATUS["INTERNAL_SERVER_ERROR"], detail=f"{ERROR_MESSAGES['failed_to_retrieve_events']}: {str(e)}")
+    
+    cache.set(cache_key, response, calendar_id)
+    return response
+
+@app.get("/events/search")
+async def search_events(event_name: str, match_case: bool = True, calendar_id: str = Depends(resolve_calendar_id)):
+    """
+    Find events by name in the configured calendar
+    
+    Example: GET /events/search?event_name=TEST&match_case=false
+    """
+    try:
+        events = await find_events_by_name(calendar_id, event_name, match_case)
+        event_list = [format_event_info(event) for event in events]
         
         return {
-            "message": f"Found {len(event_list)} events in calendar",
+            "message": f"Found {len(event_list)} events with name '{event_name}'",
             "total_events": len(event_list),
             "events": event_list
         }
@@ -171,7 +368,7 @@ async def get_events():
         raise HTTPException(status_code=HTTP_STATUS["INTERNAL_SERVER_ERROR"], detail=f"{ERROR_MESSAGES['failed_to_retrieve_events']}: {str(e)}")
 
 @app.delete("/delete-event")
-async def delete_event(request: DeleteEventRequest):
+async def delete_event(request: DeleteEventRequest, calendar_id: str = Depends(resolve_calendar_id)):
     """
     Delete an event by event name from the configured calendar
     
@@ -180,253 +377,315 @@ async def delete_event(request: DeleteEventRequest):
         "event_name": "TEST"
     }
     """
-    configured_calendar_id = get_configured_calendar_id()
-    
-    if not configured_calendar_id:
-        raise HTTPException(status_code=HTTP_STATUS["BAD_REQUEST"], detail=ERROR_MESSAGES["calendar_not_configured"])
-    
     try:
-        service = get_service()
-        
-        # First, list all events to find the one with the matching name
-        events_result = service.events().list(
-            calendarId=configured_calendar_id,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
-        deleted_events = []
-        
-        # Find and delete events with matching name
-        for event in events:
-            if event.get('summary') == request.event_name:
-                # Delete the event
-                service.events().delete(
-                    calendarId=configured_calendar_id,
-                    eventId=event['id']
-                ).execute()
-                deleted_events.append({
-                    "event_id": event['id'],
-                    "event_name": event.get('summary'),
-                    "start_time": event.get('start', {}).get('dateTime', 'N/A'),
-                    "end_time": event.get('end', {}).get('dateTime', 'N/A')
-                })
+        # Look up the events with the matching name
+        matching_events = await find_events_by_name(calendar_id, request.event_name, request.match_case)
         
-        if not deleted_events:
+        if not matching_events:
             return {
                 "message": f"No events found with name '{request.event_name}'",
                 "deleted_count": 0
             }
         
-        return {
+        # Delete them in batch requests (blocking httplib2, so off the event loop), one result per event
+        results = await run_in_threadpool(
+            batch_delete_events, calendar_id, [event['id'] for event in matching_events])
+        deleted_events = []
+        failed_events = []
+        
+        for event, result in zip(matching_events, results):
+            event_info = {
+                "event_id": event['id'],
+                "event_name": event.get('summary'),
+                "start_time": event.get('start', {}).get('dateTime', 'N/A'),
+                "end_time": event.get('end', {}).get('dateTime', 'N/A'),
+                "status": result["status"]
+            }
+            if result["status"] == "failed":
+                event_info["error"] = result["error"]
+                failed_events.append(event_info)
+            else:
+                record_deleted_event(calendar_id, event['id'])
+                deleted_events.append(event_info)
+        
+        response = {
             "message": f"Successfully deleted {len(deleted_events)} event(s) with name '{request.event_name}'",
             "deleted_count": len(deleted_events),
             "deleted_events": deleted_events
         }
+        if failed_events:
+            response["failed_count"] = len(failed_events)
+            response["failed_events"] = failed_events
+        return response
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete event: {str(e)}")
 
 @app.post("/pause-event")
-async def pause_event(request: PauseEventRequest):
+@interactive
+async def pause_event(request: PauseEventRequest, calendar_id: str = Depends(resolve_calendar_id)):
     """
     Pause the currently ongoing event automatically
     
     No parameters needed - will find and pause the event happening right now
     """
-    configured_calendar_id = get_configured_calendar_id()
-    
-    if not configured_calendar_id:
-        raise HTTPException(status_code=HTTP_STATUS["BAD_REQUEST"], detail=ERROR_MESSAGES["calendar_not_configured"])
-    
     try:
-        # Auto-reschedule any abandoned events first
-        auto_reschedule_abandoned_events()
-        
         # Get the current ongoing event
-        current_event = get_current_ongoing_event()
+        current_event = await get_current_ongoing_event(calendar_id)
         
         if not current_event:
             raise HTTPException(status_code=404, detail="No ongoing event found at this time")
         
-        service = get_service()
-        event_name = current_event.get('summary', 'Unknown Event')
-        
-        # Get event timing details
-        start_time = datetime.fromisoformat(current_event['start']['dateTime'].replace('Z', '+00:00'))
-        original_end_time = datetime.fromisoformat(current_event['end']['dateTime'].replace('Z', '+00:00'))
-        current_time = datetime.now(start_time.tzinfo)  # Use same timezone as event
-        
-        # Calculate remaining duration
-        remaining_duration = original_end_time - current_time
-        
-        # Create a completed event for the portion that was done
-        completed_event = create_event_in_past(
-            event_name,
-            start_time,
-            current_time
-        )
-        
-        # Delete the original event
-        service.events().delete(
-            calendarId=configured_calendar_id,
-            eventId=current_event['id']
-        ).execute()
-        
-        # Store pause information using event ID as key
-        pause_info = {
-            "event_name": event_name,
-            "original_event": current_event,
-            "pause_time": current_time,
-            "remaining_duration": remaining_duration,
-            "original_end_time": original_end_time
-        }
-        
-        add_paused_event(current_event['id'], pause_info)
-        
-        return {
-            "message": f"Event '{event_name}' paused successfully",
-            "event_name": event_name,
-            "event_id": current_event['id'],
-            "paused_at": current_time.isoformat(),
-            "remaining_duration": str(remaining_duration),
-            "completed_event_id": completed_event.get("id"),
-            "original_end_time": original_end_time.isoformat()
-        }
-        
+        # One lease per event: a concurrent pause, resume or reschedule of it gets a 409 instead of waiting
+        async with get_lease_manager().hold(paused_event_lease_key(current_event['id'])) as lease:
+            if await run_in_threadpool(get_paused_event, current_event['id']) is not None:
+                raise HTTPException(status_code=HTTP_STATUS["CONFLICT"], detail="Event is already paused")
+            
+            event_name = current_event.get('summary', 'Unknown Event')
+            
+            # Get event timing details
+            start_time = datetime.fromisoformat(current_event['start']['dateTime'].replace('Z', '+00:00'))
+            original_end_time = datetime.fromisoformat(current_event['end']['dateTime'].replace('Z', '+00:00'))
+            current_time = datetime.now(start_time.tzinfo)  # Use same timezone as event
+            
+            # Calculate remaining duration
+            remaining_duration = original_end_time - current_time
+            
+            # Fencing: never write to the calendar on a lease that has expired meanwhile
+            await lease.ensure_valid()
+            
+            # Create a completed event for the portion that was done
+            completed_event = await create_event_in_past(
+                calendar_id,
+                event_name,
+                start_time,
+                current_time
+            )
+            
+            # Delete the original event
+            await get_async_client().delete_event(calendar_id, current_event['id'])
+            record_deleted_event(calendar_id, current_event['id'])
+            
+            # Store pause information using event ID as key
+            pause_info = PausedEvent.create(event_name, current_time, original_end_time, remaining_duration, current_event)
+            await run_in_threadpool(add_paused_event, calendar_id, current_event['id'], pause_info)
+            
+            return {
+                "message": f"Event '{event_name}' paused successfully",
+                "event_name": event_name,
+                "event_id": current_event['id'],
+                "paused_at": current_time.isoformat(),
+                "remaining_duration": str(remaining_duration),
+                "completed_event_id": completed_event.get("id"),
+                "original_end_time": original_end_time.isoformat()
+            }
+            
+    except LeaseUnavailable:
+        raise HTTPException(status_code=HTTP_STATUS["CONFLICT"], detail=ERROR_MESSAGES["event_busy"])
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to pause event: {str(e)}")
 
 @app.post("/resume-event")
-async def resume_event(request: ResumeEventRequest):
+@interactive
+async def resume_event(request: ResumeEventRequest, calendar_id: str = Depends(resolve_calendar_id)):
     """
     Resume the most recently paused event automatically
     
     No parameters needed - will resume the last paused event
     """
-    configured_calendar_id = get_configured_calendar_id()
-    
-    if not configured_calendar_id:
-        raise HTTPException(status_code=HTTP_STATUS["BAD_REQUEST"], detail=ERROR_MESSAGES["calendar_not_configured"])
-    
     try:
         # Check if there's a paused event
-        last_paused_event_id = get_last_paused_event_id()
+        last_paused_event_id = await run_in_threadpool(get_last_paused_event_id, calendar_id)
         if not last_paused_event_id:
             raise HTTPException(status_code=404, detail="No paused event found to resume")
         
-        pause_info = get_paused_event(last_paused_event_id)
-        if not pause_info:
-            raise HTTPException(status_code=404, detail="No paused event found to resume")
-        
-        current_time = datetime.now(pause_info["pause_time"].tzinfo)  # Use same timezone as paused event
-        
-        # Calculate how long the pause was
-        pause_duration = current_time - pause_info["pause_time"]
-        
-        service = get_service()
-        
-        # Try to resume immediately (current time)
-        proposed_start_time = current_time
-        proposed_end_time = proposed_start_time + pause_info["remaining_duration"]
-        
-        # Check if the slot is available
-        available_start, available_end = find_available_slot(
-            proposed_start_time,
-            pause_info["remaining_duration"],
-            service
+        async with get_lease_manager().hold(paused_event_lease_key(last_paused_event_id)) as lease:
+            # Re-read under the lease: the auto-reschedule may have taken it meanwhile
+            pause_info = await run_in_threadpool(get_paused_event, last_paused_event_id)
+            if not pause_info:
+                raise HTTPException(status_code=404, detail="No paused event found to resume")
+            
+            current_time = datetime.now(pause_info.pause_time.tzinfo)  # Use same timezone as paused event
+            
+            # Calculate how long the pause was
+            pause_duration = current_time - pause_info.pause_time
+            
+            # Try to resume immediately (current time)
+            proposed_start_time = current_time
+            proposed_end_time = proposed_start_time + pause_info.remaining_duration
+            
+            # Check if the slot is available
+            available_start, available_end = await find_available_slot(
+                calendar_id,
+                proposed_start_time,
+                pause_info.remaining_duration
+            )
+            
+            # Fencing: never write to the calendar on a lease that has expired meanwhile
+            await lease.ensure_valid()
+            
+            # Create the resumed event
+            event_data = {
+                "summary": pause_info.event_name,
+                "start": {"dateTime": available_start.isoformat(), "timeZone": "UTC"},
+                "end": {"dateTime": available_end.isoformat(), "timeZone": "UTC"},
+            }
+            
+            created_event = await get_async_client().insert_event(calendar_id, event_data)
+            record_created_event(calendar_id, created_event)
+            
+            # Remove from paused events
+            await run_in_threadpool(remove_paused_event, last_paused_event_id)
+            
+            return {
+                "message": f"Event '{pause_info.event_name}' resumed successfully",
+                "event_name": pause_info.event_name,
+                "resumed_at": available_start.isoformat(),
+                "ends_at": available_end.isoformat(),
+                "duration": str(pause_info.remaining_duration),
+                "pause_duration": str(pause_duration),
+                "event_id": created_event.get("id"),
+                "event_link": created_event.get("htmlLink"),
+                "rescheduled": available_start != proposed_start_time
+            }
+            
+    except LeaseUnavailable:
+        raise HTTPException(status_code=HTTP_STATUS["CONFLICT"], detail=ERROR_MESSAGES["event_busy"])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to resume event: {str(e)}")
+
+@app.post("/suggest-slots")
+async def suggest_slots(request: SuggestSlotsRequest, calendar_id: str = Depends(resolve_calendar_id)):
+    """
+    Suggest the earliest free slots for several durations at once
+    
+    {
+        "durations_minutes": [30, 60],
+        "horizon_weeks": 2,
+        "top_k": 5
+    }
+    """
+    if not request.durations_minutes or any(duration <= 0 for duration in request.durations_minutes):
+        raise HTTPException(status_code=HTTP_STATUS["BAD_REQUEST"], detail="durations_minutes must be a non-empty list of positive minutes")
+    if not 1 <= request.horizon_weeks <= MAX_SUGGESTION_HORIZON_WEEKS:
+        raise HTTPException(status_code=HTTP_STATUS["BAD_REQUEST"], detail=f"horizon_weeks must be between 1 and {MAX_SUGGESTION_HORIZON_WEEKS}")
+    if not 1 <= request.top_k <= MAX_SUGGESTIONS_PER_DURATION:
+        raise HTTPException(status_code=HTTP_STATUS["BAD_REQUEST"], detail=f"top_k must be between 1 and {MAX_SUGGESTIONS_PER_DURATION}")
+    
+    try:
+        if request.start_datetime:
+            start_time = datetime.fromisoformat(request.start_datetime.replace('Z', '+00:00'))
+            if start_time.tzinfo is None:
+                start_time = start_time.replace(tzinfo=timezone.utc)
+        else:
+            start_time = datetime.now(timezone.utc)
+    except ValueError:
+        raise HTTPException(status_code=HTTP_STATUS["BAD_REQUEST"], detail=f"Invalid start_datetime: {request.start_datetime}")
+    
+    try:
+        suggestions = await suggest_free_slots(
+            calendar_id,
+            start_time,
+            request.durations_minutes,
+            timedelta(weeks=request.horizon_weeks),
+            request.top_k
         )
         
-        # Create the resumed event
-        event_data = {
-            "summary": pause_info["event_name"],
-            "start": {"dateTime": available_start.isoformat(), "timeZone": "UTC"},
-            "end": {"dateTime": available_end.isoformat(), "timeZone": "UTC"},
-        }
-        
-        created_event = service.events().insert(
-            calendarId=configured_calendar_id,
-            body=event_data
-        ).execute()
-        
-        # Remove from paused events
-        remove_paused_event(last_paused_event_id)
-        
         return {
-            "message": f"Event '{pause_info['event_name']}' resumed successfully",
-            "event_name": pause_info["event_name"],
-            "resumed_at": available_start.isoformat(),
-            "ends_at": available_end.isoformat(),
-            "duration": str(pause_info["remaining_duration"]),
-            "pause_duration": str(pause_duration),
-            "event_id": created_event.get("id"),
-            "event_link": created_event.get("htmlLink"),
-            "rescheduled": available_start != proposed_start_time
+            "message": f"Suggested slots for {len(request.durations_minutes)} duration(s)",
+            "horizon_start": start_time.isoformat(),
+            "horizon_end": (start_time + timedelta(weeks=request.horizon_weeks)).isoformat(),
+            "suggestions": [
+                {
+                    "duration_minutes": duration,
+                    "slots": [{"start": slot_start.isoformat(), "end": slot_end.isoformat()}
+                              for slot_start, slot_end in suggestions[duration]]
+                }
+                for duration in request.durations_minutes
+            ]
         }
         
-    except HTTPException:
-        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to resume event: {str(e)}")
+        raise HTTPException(status_code=HTTP_STATUS["INTERNAL_SERVER_ERROR"], detail=f"Failed to suggest slots: {str(e)}")
 
 @app.get("/paused-events")
-async def get_paused_events():
+async def get_paused_events(calendar_id: str = Depends(resolve_calendar_id)):
     """
     Get all currently paused events
     """
-    paused_events = get_all_paused_events()
-    last_paused_event_id = get_last_paused_event_id()
+    cache = get_response_cache()
+    cache_key = ("/paused-events", calendar_id)
+    version = await run_in_threadpool(get_paused_store().version)  # Catches pauses and resumes made by other workers
+    cached = cache.get(cache_key, version)
+    if cached is not MISS:
+        return cached
+    
+    paused_events = await run_in_threadpool(get_all_paused_events, calendar_id)
+    last_paused_event_id = await run_in_threadpool(get_last_paused_event_id, calendar_id)
     
     if not paused_events:
-        return {"message": "No paused events", "paused_events": [], "last_paused_event_id": None}
+        response = {"message": "No paused events", "paused_events": [], "last_paused_event_id": None}
+        cache.set(cache_key, response, calendar_id, version)
+        return response
     
     paused_list = []
     for event_id, pause_info in paused_events.items():
         paused_list.append({
             "event_id": event_id,
-            "event_name": pause_info["event_name"],
-            "paused_at": pause_info["pause_time"].isoformat(),
-            "remaining_duration": str(pause_info["remaining_duration"]),
-            "original_end_time": pause_info["original_end_time"].isoformat(),
+            "event_name": pause_info.event_name,
+            "paused_at": pause_info.pause_time.isoformat(),
+            "remaining_duration": str(pause_info.remaining_duration),
+            "original_end_time": pause_info.original_end_time.isoformat(),
             "is_last_paused": event_id == last_paused_event_id
         })
     
-    return {
+    response = {
         "message": f"Found {len(paused_list)} paused events",
         "paused_events": paused_list,
         "last_paused_event_id": last_paused_event_id
     }
+    cache.set(cache_key, response, calendar_id, version)
+    return response
 
 @app.get("/check-expired-events")
-async def check_expired_events():
+async def check_expired_events(calendar_id: str = Depends(resolve_calendar_id)):
     """
     Check for paused events that should be auto-rescheduled
     """
-    expired_events = get_expired_events_info()
-    paused_events = get_all_paused_events()
+    cache = get_response_cache()
+    cache_key = ("/check-expired-events", calendar_id)
+    store = get_paused_store()
+    version = await run_in_threadpool(store.version)
+    cached = cache.get(cache_key, version)
+    if cached is not MISS:
+        return cached
     
-    return {
+    expired_events = await run_in_threadpool(get_expired_events_info, calendar_id)
+    paused_events = await run_in_threadpool(get_all_paused_events, calendar_id)
+    
+    response = {
         "message": f"Found {len(expired_events)} expired paused events",
         "expired_events": expired_events,
         "total_paused_events": len(paused_events)
     }
+    # The answer changes when the next paused event expires
+    next_deadline = await run_in_threadpool(store.next_deadline)
+    expires_in = next_deadline - time.time() if next_deadline is not None else None
+    cache.set(cache_key, response, calendar_id, version, expires_in)
+    return response
 
 @app.post("/force-reschedule-expired")
-async def force_reschedule_expired():
+async def force_reschedule_expired(calendar_id: str = Depends(resolve_calendar_id)):
     """
-    Manually trigger rescheduling of all expired paused events
+    Manually trigger rescheduling of the calendar's expired paused events
     """
-    configured_calendar_id = get_configured_calendar_id()
-    
-    if not configured_calendar_id:
-        raise HTTPException(status_code=400, detail="Calendar not configured. Please call /configure-calendar first.")
-    
     try:
-        # Run the auto-reschedule logic
-        auto_reschedule_abandoned_events()
+        # Run the auto-reschedule logic for this calendar only
+        await auto_reschedule_abandoned_events(calendar_id)
         
         return {
             "message": "Force reschedule completed. Check paused events to see results.",
@@ -436,10 +695,53 @@ async def force_reschedule_expired():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to force reschedule: {str(e)}")
 
+@app.post(PUSH_WEBHOOK_PATH)
+async def calendar_webhook(
+    x_goog_channel_id: str = Header(""),
+    x_goog_channel_token: str = Header(""),
+    x_goog_resource_state: str = Header(""),
+    x_goog_message_number: str = Header("")
+):
+    """
+    Receive events().watch push notifications from Google
+    
+    The channel token must be one this service signed for the channel, and the
+    channel must be the calendar's current one (not replaced or expired). Every
+    notification except the initial "sync" handshake triggers an incremental
+    sync of the calendar, which drops its cached responses and indexes.
+    """
+    calendar_id = await run_in_threadpool(get_push_channels().verify, x_goog_channel_id, x_goog_channel_token)
+    if calendar_id is None:
+        raise HTTPException(status_code=HTTP_STATUS["FORBIDDEN"], detail=ERROR_MESSAGES["invalid_channel_token"])
+    if x_goog_resource_state != "sync":
+        await run_in_threadpool(get_push_channels().notified, calendar_id, x_goog_message_number)
+    return {"message": "Notification received", "resource_state": x_goog_resource_state}
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Internal counters for monitoring
+    """
+    return {
+        "single_flight": get_async_client().reads.stats(),
+        "response_cache": get_response_cache().stats(),
+        "outbound_throttle": get_outbound_throttle().stats(),
+        "circuit_breaker": get_circuit_breaker().stats(),
+        "push_channels": get_push_channels().stats() if ENABLE_PUSH_NOTIFICATIONS else None
+    }
+
 @app.get("/")
 async def root():
-    configured_calendar_id = get_configured_calendar_id()
-    return {"message": "Google Calendar API Server", "configured_calendar": configured_calendar_id}
+    cache = get_response_cache()
+    version = await run_in_threadpool(get_paused_store().version)
+    cached = cache.get(("/",), version)
+    if cached is not MISS:
+        return cached
+    configured_calendar_id = await run_in_threadpool(get_configured_calendar_id)
+    response = {"message": "Google Calendar API Server", "configured_calendar": configured_calendar_id}
+    cache.set(("/",), response, None, version)
+    return response
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host=DEFAULT_HOST, port=DEFAULT_PORT)
\ No newline at end of file
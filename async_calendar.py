@@ -0,0 +1,155 @@
+import asyncio
+import json
+import uuid
+from urllib.parse import quote
+import httpx
+from calendar_client import get_credentials, refresh_credentials, load_discovery_document
+from single_flight import SingleFlight
+from rate_limit import get_outbound_throttle
+from resilience import call_with_retry_async
+from config import (
+    ASYNC_HTTP_MAX_CONNECTIONS, ASYNC_HTTP_MAX_KEEPALIVE, ASYNC_HTTP_TIMEOUT_SECONDS, FIELD_MASKS
+)
+
+class CalendarHTTPError(Exception):
+    """Error response from the Calendar API on the async transport"""
+
+    def __init__(self, status_code: int, reason: str, retry_after: str = None):
+        super().__init__(f"<HttpError {status_code} \"{reason}\">")
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_response(cls, response: httpx.Response):
+        try:
+            reason = response.json()["error"]["message"]
+        except (ValueError, KeyError, TypeError):
+            reason = response.reason_phrase
+        return cls(response.status_code, reason, response.headers.get("Retry-After"))
+
+def _path_id(value: str) -> str:
+    # Calendar IDs are e-mail addresses and may contain '@', '#', '+'
+    return quote(value, safe="")
+
+class AsyncCalendarClient:
+    """Calendar v3 client on a pooled httpx.AsyncClient
+
+    Covers the calls the API endpoints make (events list/insert/delete/get,
+    calendars get and freebusy) without blocking the event loop. Access
+    tokens come from the shared credentials kept fresh by calendar_client.
+    Identical concurrent reads share one upstream request. Every attempt
+    passes the outbound quota throttle; failed attempts are retried with
+    backoff behind the shared circuit breaker (resilience.py).
+    """
+
+    def __init__(self):
+        document = load_discovery_document()
+        self._http = httpx.AsyncClient(
+            base_url=document["rootUrl"] + document["servicePath"],
+            timeout=ASYNC_HTTP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=ASYNC_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=ASYNC_HTTP_MAX_KEEPALIVE
+            )
+        )
+        self.reads = SingleFlight()
+
+    async def _authorization(self):
+        credentials = get_credentials()
+        if not credentials.valid:
+            # Normally the background refresher got here first
+            await asyncio.to_thread(refresh_credentials)
+        return {"Authorization": f"Bearer {credentials.token}"}
+
+    async def _read(self, method: str, path: str, params: dict = None, body: dict = None):
+        """A read-only request, coalesced with identical concurrent ones"""
+        key = (method, path, tuple(sorted((params or {}).items())), json.dumps(body, sort_keys=True))
+        return await self.reads.do(key, lambda: self._request(method, path, params=params, body=body))
+
+    async def _request(self, method: str, path: str, params: dict = None, body: dict = None):
+        # The throttle wait comes out of the call's deadline, not the attempt's timeout
+        return await call_with_retry_async(lambda timeout: self._attempt(method, path, params, body, timeout),
+                                           before_attempt=lambda: get_outbound_throttle().acquire_async())
+
+    async def _attempt(self, method: str, path: str, params: dict, body: dict, timeout: float):
+        headers = await self._authorization()
+        response = await asyncio.wait_for(
+            self._http.request(method, path, params=params, json=body, headers=headers), timeout)
+        if response.status_code >= 400:
+            raise CalendarHTTPError.from_response(response)
+        if response.status_code == 204 or not response.content:
+            return {}
+        return response.json()
+
+    async def list_events(self, calendar_id: str, **params):
+        """One page of events().list"""
+        return await self._read("GET", f"calendars/{_path_id(calendar_id)}/events", params=params)
+
+    async def iter_event_pages(self, calendar_id: str, **params):
+        """Yield events().list pages, following nextPageToken lazily"""
+        while True:
+            page = await self.list_events(calendar_id, **dict(params))
+            yield page
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                return
+            params["pageToken"] = page_token
+
+    async def insert_event(self, calendar_id: str, body: dict):
+        """Insert an event; safe to retry because the event ID is chosen here"""
+        generated_id = "id" not in body
+        if generated_id:
+            body = dict(body, id=uuid.uuid4().hex)  # base32hex-safe
+        try:
+            return await self._request("POST", f"calendars/{_path_id(calendar_id)}/events", body=body)
+        except CalendarHTTPError as e:
+            if e.status_code == 409 and generated_id:
+                # An earlier attempt landed before its response was lost
+                return await self.get_event(calendar_id, body["id"], fields=FIELD_MASKS["created_event"])
+            raise
+
+    async def delete_event(self, calendar_id: str, event_id: str):
+        try:
+            return await self._request("DELETE", f"calendars/{_path_id(calendar_id)}/events/{_path_id(event_id)}")
+        except CalendarHTTPError as e:
+            if e.status_code == 410:
+                return {}  # Already deleted, e.g. by an earlier attempt
+            raise
+
+    async def get_event(self, calendar_id: str, event_id: str, **params):
+        return await self._read(
+            "GET", f"calendars/{_path_id(calendar_id)}/events/{_path_id(event_id)}", params=params)
+
+    async def get_calendar(self, calendar_id: str, **params):
+        return await self._read("GET", f"calendars/{_path_id(calendar_id)}", params=params)
+
+    async def watch_events(self, calendar_id: str, body: dict):
+        """Open an events().watch push channel"""
+        return await self._request("POST", f"calendars/{_path_id(calendar_id)}/events/watch", body=body)
+
+    async def stop_channel(self, channel_id: str, resource_id: str):
+        return await self._request("POST", "channels/stop", body={"id": channel_id, "resourceId": resource_id})
+
+    async def freebusy(self, body: dict):
+        return await self._read("POST", "freeBusy", body=body)
+
+    async def aclose(self):
+        await self._http.aclose()
+
+# Shared client, opened with the app lifespan (or lazily on first use)
+async_client = None
+
+def get_async_client() -> AsyncCalendarClient:
+    """Get the shared async Calendar client"""
+    global async_client
+    if async_client is None:
+        async_client = AsyncCalendarClient()
+    return async_client
+
+async def close_async_client():
+    """Close the shared async client and its connection pool"""
+    global async_client
+    if async_client is not None:
+        await async_client.aclose()
+        async_client = None
@@ -0,0 +1,158 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from config import (
+    SERVICE_ACCOUNT_FILE, SCOPES, TOKEN_REFRESH_MARGIN_SECONDS, DISCOVERY_DOCUMENT_FILE,
+    CALENDAR_ATTEMPT_TIMEOUT_SECONDS
+)
+
+# Process-wide client state
+# Credentials and the built service are created once and shared by every caller.
+# httplib2 is not thread-safe, so each thread gets its own authorized transport.
+_client_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_credentials = None
+_service = None
+_thread_local = threading.local()
+_refresher_thread = None
+_refresher_stop = threading.Event()
+_discovery_document = None
+
+TOKEN_REFRESH_RETRY_SECONDS = 30
+
+def load_discovery_document():
+    """Load the bundled Calendar v3 discovery document (parsed once, no network)"""
+    global _discovery_document
+
+    if _discovery_document is None:
+        with open(DISCOVERY_DOCUMENT_FILE, encoding="utf-8") as f:
+            _discovery_document = json.load(f)
+    return _discovery_document
+
+def build_calendar_service(credentials, **kwargs):
+    """Build a Calendar v3 service from the bundled discovery document"""
+    from googleapiclient.discovery import build_from_document
+    return build_from_document(load_discovery_document(), credentials=credentials, **kwargs)
+
+def get_credentials():
+    """Get the shared service account credentials, loading them on first use"""
+    global _credentials
+
+    if _credentials is None:
+        with _client_lock:
+            if _credentials is None:
+                from google.oauth2.service_account import Credentials
+                _credentials = Credentials.from_service_account_file(
+                    SERVICE_ACCOUNT_FILE, scopes=SCOPES)
+                _start_token_refresher()
+    return _credentials
+
+def authorized_http(credentials):
+    """An authorized httplib2 transport whose socket operations time out"""
+    import httplib2
+    from google_auth_httplib2 import AuthorizedHttp
+    return AuthorizedHttp(credentials, http=httplib2.Http(timeout=CALENDAR_ATTEMPT_TIMEOUT_SECONDS))
+
+def get_thread_http():
+    """Get the authorized HTTP transport owned by the calling thread"""
+    http = getattr(_thread_local, "http", None)
+    if http is None:
+        http = authorized_http(get_credentials())
+        _thread_local.http = http
+    return http
+
+def build_resilient_request(http, *args, **kwargs):
+    """An HttpRequest whose execute() is throttled and retried
+
+    Each attempt waits for the outbound quota throttle; retryable failures
+    are retried with backoff behind the circuit breaker (resilience.py).
+    Requests added to a batch are never executed on their own; batch
+    callers acquire one token per sub-request instead.
+    """
+    from googleapiclient.http import HttpRequest
+    from rate_limit import get_outbound_throttle
+    from resilience import call_with_retry
+    request = HttpRequest(http, *args, **kwargs)
+    execute = request.execute
+
+    def resilient_execute(*execute_args, **execute_kwargs):
+        def attempt():
+            get_outbound_throttle().acquire()
+            return execute(*execute_args, **execute_kwargs)
+        return call_with_retry(attempt)
+
+    request.execute = resilient_execute
+    return request
+
+def _build_request(http, *args, **kwargs):
+    """Bind every API request to the calling thread's transport"""
+    return build_resilient_request(get_thread_http(), *args, **kwargs)
+
+def get_service():
+    """Get the shared Google Calendar service instance"""
+    global _service
+
+    if _service is None:
+        credentials = get_credentials()
+        with _client_lock:
+            if _service is None:
+                _service = build_calendar_service(credentials, requestBuilder=_build_request)
+    return _service
+
+def iter_event_pages(calendar_id: str, **params):
+    """Yield raw events().list responses, following nextPageToken lazily"""
+    service = get_service()
+    page_token = params.pop("pageToken", None)
+    while True:
+        if page_token:
+            params["pageToken"] = page_token
+        page = service.events().list(calendarId=calendar_id, **params).execute()
+        yield page
+        page_token = page.get("nextPageToken")
+        if not page_token:
+            return
+
+def refresh_credentials():
+    """Refresh the shared access token now"""
+    from google.auth.transport.requests import Request
+
+    credentials = get_credentials()
+    with _refresh_lock:
+        credentials.refresh(Request())
+    return credentials.expiry
+
+def _seconds_until_refresh(credentials):
+    """Seconds to wait before the token enters the refresh margin"""
+    if not credentials.token or credentials.expiry is None:
+        return 0
+    refresh_at = credentials.expiry - timedelta(seconds=TOKEN_REFRESH_MARGIN_SECONDS)
+    # google-auth keeps expiry as a naive UTC datetime
+    return max(0, (refresh_at - datetime.utcnow()).total_seconds())
+
+def _token_refresher_loop():
+    """Keep the access token fresh so requests never block on a refresh"""
+    while not _refresher_stop.is_set():
+        wait_seconds = _seconds_until_refresh(_credentials)
+        if wait_seconds > 0:
+            _refresher_stop.wait(wait_seconds)
+            continue
+        try:
+            refresh_credentials()
+        except Exception as e:
+            print(f"Failed to refresh Google credentials: {str(e)}")
+            _refresher_stop.wait(TOKEN_REFRESH_RETRY_SECONDS)
+
+def _start_token_refresher():
+    """Start the background token refresher (called with the client lock held)"""
+    global _refresher_thread
+
+    if _refresher_thread is not None and _refresher_thread.is_alive():
+        return
+    _refresher_stop.clear()
+    _refresher_thread = threading.Thread(
+        target=_token_refresher_loop, name="calendar-token-refresher", daemon=True)
+    _refresher_thread.start()
+
+def stop_token_refresher():
+    """Stop the background token refresher"""
+    _refresher_stop.set()
@@ -0,0 +1,78 @@
+import threading
+from event_mirror import EventMirror
+from response_cache import get_response_cache
+from config import ENABLE_EVENT_MIRROR, CALENDAR_LOCK_STRIPES
+
+class CalendarState:
+    """Everything this process keeps for one calendar
+
+    Paused events are shared by all workers, so they live in the paused
+    store (keyed by calendar_id) rather than here.
+    """
+
+    def __init__(self, calendar_id: str):
+        self.calendar_id = calendar_id
+        self.mirror = None  # Local copy of the calendar (EventMirror)
+        self.busy_intervals_cache = None  # Last free/busy answer for the calendar
+        self.push_seen = None  # Last push notification marker acted on (see push_channels.py)
+
+    def start(self):
+        if ENABLE_EVENT_MIRROR and self.mirror is None:
+            self.mirror = EventMirror(self.calendar_id, on_change=self.changed_upstream)
+            self.mirror.start()
+
+    def changed_upstream(self):
+        """Drop what was derived from the calendar's old events (the mirror rebuilds its own indexes)"""
+        self.busy_intervals_cache = None
+        get_response_cache().invalidate(self.calendar_id)
+
+    def stop(self):
+        if self.mirror is not None:
+            self.mirror.stop()
+            self.mirror = None
+
+class CalendarRegistry:
+    """Per-calendar state objects behind a fixed set of striped locks
+
+    A calendar always hashes to the same lock, so creating or mutating
+    state for one calendar only contends with the few calendars that share
+    its stripe, never with a registry-wide lock.
+    """
+
+    def __init__(self, stripes: int = CALENDAR_LOCK_STRIPES):
+        self._locks = [threading.Lock() for _ in range(max(1, stripes))]
+        self._states = {}  # {calendar_id: CalendarState}
+
+    def lock_for(self, calendar_id: str) -> threading.Lock:
+        """The stripe lock guarding a calendar's state"""
+        return self._locks[hash(calendar_id) % len(self._locks)]
+
+    def get(self, calendar_id: str) -> CalendarState:
+        """Get a calendar's state, creating (and starting) it on first use"""
+        state = self._states.get(calendar_id)
+        if state is not None:
+            return state
+        with self.lock_for(calendar_id):
+            state = self._states.get(calendar_id)
+            if state is None:
+                state = CalendarState(calendar_id)
+                state.start()
+                self._states[calendar_id] = state
+            return state
+
+    def peek(self, calendar_id: str):
+        """A calendar's state if this process has one, without creating it"""
+        return self._states.get(calendar_id)
+
+    def remove(self, calendar_id: str):
+        with self.lock_for(calendar_id):
+            state = self._states.pop(calendar_id, None)
+        if state is not None:
+            state.stop()
+
+    def calendar_ids(self):
+        return list(self._states)
+
+    def stop_all(self):
+        for calendar_id in self.calendar_ids():
+            self.remove(calendar_id)
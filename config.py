@@ -7,20 +7,101 @@ load_dotenv()
 # Google Calendar API Configuration
 SERVICE_ACCOUNT_FILE = os.getenv("SERVICE_ACCOUNT_FILE", "service_account.json")
 SCOPES = [os.getenv("SCOPES", "https://www.googleapis.com/auth/calendar")]
+TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv("TOKEN_REFRESH_MARGIN_SECONDS", "300"))  # Refresh access tokens this long before expiry
+# Async Calendar transport (httpx connection pool used by the API endpoints)
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "100"))
+ASYNC_HTTP_MAX_KEEPALIVE = int(os.getenv("ASYNC_HTTP_MAX_KEEPALIVE", "20"))
+ASYNC_HTTP_TIMEOUT_SECONDS = float(os.getenv("ASYNC_HTTP_TIMEOUT_SECONDS", "30"))
+# Pinned Calendar v3 discovery document (revision 20231020), loaded without network access
+DISCOVERY_DOCUMENT_FILE = os.getenv(
+    "DISCOVERY_DOCUMENT_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "discovery", "calendar.v3.json")
+)
 
 # Server Configuration
 DEFAULT_TIMEZONE = os.getenv("DEFAULT_TIMEZONE", "Asia/Kolkata")
 DEFAULT_HOST = os.getenv("DEFAULT_HOST", "localhost")
 DEFAULT_PORT = int(os.getenv("DEFAULT_PORT", "8000"))
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "3.0"))  # Max time from launch until uvicorn serves requests
 
 # Auto-Reschedule Configuration
 AUTO_RESCHEDULE_AFTER_ORIGINAL_END_MINUTES = int(os.getenv("AUTO_RESCHEDULE_AFTER_ORIGINAL_END_MINUTES", "30"))
 AUTO_RESCHEDULE_AFTER_PAUSE_HOURS = int(os.getenv("AUTO_RESCHEDULE_AFTER_PAUSE_HOURS", "2"))
 AUTO_RESCHEDULE_SEARCH_DAYS = int(os.getenv("AUTO_RESCHEDULE_SEARCH_DAYS", "7"))
+SCHEDULER_RETRY_SECONDS = int(os.getenv("SCHEDULER_RETRY_SECONDS", "60"))  # Retry delay after a failed auto-reschedule
+SCHEDULER_POLL_SECONDS = int(os.getenv("SCHEDULER_POLL_SECONDS", "60"))  # How often to look for deadlines set by other workers
+FREEBUSY_CACHE_SECONDS = int(os.getenv("FREEBUSY_CACHE_SECONDS", "30"))  # Reuse one free/busy answer across slot searches
+
+# Slot Suggestion Configuration (/suggest-slots)
+SLOT_SUGGESTION_STEP_MINUTES = int(os.getenv("SLOT_SUGGESTION_STEP_MINUTES", "30"))  # Grid for candidates inside a free gap
+MAX_SUGGESTION_HORIZON_WEEKS = int(os.getenv("MAX_SUGGESTION_HORIZON_WEEKS", "8"))
+MAX_SUGGESTIONS_PER_DURATION = int(os.getenv("MAX_SUGGESTIONS_PER_DURATION", "100"))
 
 # Event Configuration
-MAX_EVENTS_TO_FETCH = int(os.getenv("MAX_EVENTS_TO_FETCH", "10"))
+MAX_EVENTS_TO_FETCH = int(os.getenv("MAX_EVENTS_TO_FETCH", "10"))  # Page size of the live "current event" lookup
 MAX_SEARCH_RESULTS = int(os.getenv("MAX_SEARCH_RESULTS", "10"))
+EVENTS_PAGE_SIZE = int(os.getenv("EVENTS_PAGE_SIZE", "250"))  # Default page size for /events pagination and streaming
+MAX_EVENTS_PAGE_SIZE = 2500  # Largest maxResults Google accepts for events().list
+
+# Batch Request Configuration
+BATCH_REQUEST_SIZE = min(int(os.getenv("BATCH_REQUEST_SIZE", "50")), 50)  # Google allows 50 calls per Calendar batch
+BATCH_MAX_RETRIES = int(os.getenv("BATCH_MAX_RETRIES", "3"))  # Retries for failed sub-requests only
+BATCH_RETRY_BASE_SECONDS = float(os.getenv("BATCH_RETRY_BASE_SECONDS", "0.5"))
+BATCH_PARALLELISM = int(os.getenv("BATCH_PARALLELISM", "4"))  # Batches in flight at once
+MAX_BATCH_CREATE_EVENTS = int(os.getenv("MAX_BATCH_CREATE_EVENTS", "1000"))  # Items per /create-events/batch call
+
+# Retries and circuit breaker for Calendar API calls (see resilience.py)
+CALENDAR_MAX_RETRIES = int(os.getenv("CALENDAR_MAX_RETRIES", "4"))  # Retries after 429, 5xx and transport errors
+CALENDAR_RETRY_BASE_SECONDS = float(os.getenv("CALENDAR_RETRY_BASE_SECONDS", "0.5"))
+CALENDAR_RETRY_MAX_SECONDS = float(os.getenv("CALENDAR_RETRY_MAX_SECONDS", "8"))
+CALENDAR_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("CALENDAR_ATTEMPT_TIMEOUT_SECONDS", "10"))
+CALENDAR_CALL_DEADLINE_SECONDS = float(os.getenv("CALENDAR_CALL_DEADLINE_SECONDS", "20"))  # All attempts of one call
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))  # Consecutive failures that open the circuit
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))  # Fail fast this long before probing again
+
+# Event Mirror Configuration (local copy of the calendar kept current with sync tokens)
+ENABLE_EVENT_MIRROR = os.getenv("ENABLE_EVENT_MIRROR", "True").lower() == "true"
+MIRROR_SYNC_INTERVAL_SECONDS = int(os.getenv("MIRROR_SYNC_INTERVAL_SECONDS", "60"))
+MIRROR_MAX_STALENESS_SECONDS = int(os.getenv("MIRROR_MAX_STALENESS_SECONDS", "300"))  # Older mirrors fall back to live reads
+MIRROR_PAGE_SIZE = int(os.getenv("MIRROR_PAGE_SIZE", "2500"))
+SCHEDULE_INDEX_HORIZON_HOURS = int(os.getenv("SCHEDULE_INDEX_HORIZON_HOURS", "24"))  # Minutes bucketed ahead for /pause-event
+
+# Push Notifications (events().watch channels; Google must reach PUSH_WEBHOOK_URL over HTTPS)
+ENABLE_PUSH_NOTIFICATIONS = os.getenv("ENABLE_PUSH_NOTIFICATIONS", "False").lower() == "true"
+PUSH_WEBHOOK_PATH = "/webhooks/calendar"
+PUSH_WEBHOOK_URL = os.getenv("PUSH_WEBHOOK_URL", "")  # e.g. https://calendar.example.com/webhooks/calendar
+PUSH_CHANNEL_SECRET = os.getenv("PUSH_CHANNEL_SECRET", "")  # Signs channel tokens; use one value for all workers
+PUSH_CHANNEL_TTL_SECONDS = int(os.getenv("PUSH_CHANNEL_TTL_SECONDS", "604800"))  # Google caps events channels at 7 days
+PUSH_RENEW_BEFORE_SECONDS = int(os.getenv("PUSH_RENEW_BEFORE_SECONDS", "3600"))
+PUSH_CHECK_INTERVAL_SECONDS = float(os.getenv("PUSH_CHECK_INTERVAL_SECONDS", "2"))  # Local store check, no API calls
+
+# Paused Event Store Configuration (SQLite in WAL mode, shared by all uvicorn workers)
+PAUSED_STORE_PATH = os.getenv("PAUSED_STORE_PATH", "paused_events.db")
+PAUSED_STORE_POOL_SIZE = int(os.getenv("PAUSED_STORE_POOL_SIZE", "4"))
+PAUSED_STORE_CHANGE_LOG_SIZE = int(os.getenv("PAUSED_STORE_CHANGE_LOG_SIZE", "1000"))  # Versions other workers can catch up on by delta
+PAUSED_KEEP_ORIGINAL_EVENT = os.getenv("PAUSED_KEEP_ORIGINAL_EVENT", "False").lower() == "true"  # Stored zlib-compressed
+
+# Partial-response masks (fields=) per Calendar call site: each names only what its callers read
+FIELD_MASKS = {
+    "events_page": "nextPageToken,items(id,summary,status,start,end)",  # GET /events (all modes)
+    # get_current_ongoing_event -> /pause-event, which archives the whole event with PAUSED_KEEP_ORIGINAL_EVENT
+    "ongoing_event": "nextPageToken,items" if PAUSED_KEEP_ORIGINAL_EVENT else "nextPageToken,items(id,summary,start,end)",
+    "events_by_name": "nextPageToken,items(id,summary,status,start,end)",  # /events/search, /delete-event
+    # EventMirror reads; its events also feed /pause-event, so keep them whole with PAUSED_KEEP_ORIGINAL_EVENT
+    "mirror_sync": "nextPageToken,nextSyncToken,items" if PAUSED_KEEP_ORIGINAL_EVENT
+    else "nextPageToken,nextSyncToken,items(id,summary,status,start,end,transparency)",
+    "available_slot": "items(start,end)",  # streamlit_app find_available_slot
+    "calendar_info": "summary",  # /configure-calendar
+    "created_event": "id,htmlLink,summary,status,start,end,recurrence,transparency",  # insert_event after a 409 retry
+}
+
+# Calendar Registry Configuration (many calendars per deployment)
+CALENDAR_LOCK_STRIPES = int(os.getenv("CALENDAR_LOCK_STRIPES", "64"))
+
+# Lease Configuration (per-event locks shared by workers and hosts)
+LEASE_BACKEND = os.getenv("LEASE_BACKEND", "sqlite")  # "sqlite" (paused store file) or "redis" (needs `pip install redis`)
+LEASE_REDIS_URL = os.getenv("LEASE_REDIS_URL", "redis://localhost:6379/0")
+LEASE_TTL_SECONDS = int(os.getenv("LEASE_TTL_SECONDS", "120"))  # Longer than a pause/resume round trip
 
 # Event Labeling Configuration
 COMPLETED_EVENT_PREFIX = os.getenv("COMPLETED_EVENT_PREFIX", "[COMPLETED]")
@@ -50,6 +131,8 @@ MAX_RECURRING_COUNT = int(os.getenv("MAX_RECURRING_COUNT", "365"))
 ENABLE_AUTO_RESCHEDULE = os.getenv("ENABLE_AUTO_RESCHEDULE", "True").lower() == "true"
 ENABLE_EVENT_LABELING = os.getenv("ENABLE_EVENT_LABELING", "True").lower() == "true"
 ENABLE_CONFLICT_RESOLUTION = os.getenv("ENABLE_CONFLICT_RESOLUTION", "True").lower() == "true"
+CONFLICT_CHECK_HORIZON_DAYS = int(os.getenv("CONFLICT_CHECK_HORIZON_DAYS", "366"))  # Recurrences are checked this far ahead
+MAX_REPORTED_CONFLICTS = int(os.getenv("MAX_REPORTED_CONFLICTS", "20"))
 
 # Error Messages
 ERROR_MESSAGES = {
@@ -62,7 +145,11 @@ ERROR_MESSAGES = {
     "failed_to_resume_event": "Failed to resume event",
     "failed_to_retrieve_events": "Failed to retrieve events",
     "failed_to_delete_event": "Failed to delete event",
-    "failed_to_force_reschedule": "Failed to force reschedule"
+    "failed_to_force_reschedule": "Failed to force reschedule",
+    "event_busy": "Event is being updated by another request, please retry",
+    "event_conflict": "Event overlaps existing events",
+    "rate_limited": "Too many requests, please retry later",
+    "invalid_channel_token": "Unknown push channel or invalid channel token"
 }
 
 # Success Messages
@@ -119,18 +206,31 @@ RECURRENCE_RULES = {
 HTTP_STATUS = {
     "OK": 200,
     "BAD_REQUEST": 400,
+    "FORBIDDEN": 403,
     "NOT_FOUND": 404,
+    "CONFLICT": 409,
+    "TOO_MANY_REQUESTS": 429,
     "INTERNAL_SERVER_ERROR": 500
 }
 
-# Rate Limiting (if needed in future)
+# Rate Limiting per API client (see rate_limit.py)
 RATE_LIMIT = {
+    "enabled": os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true",
     "requests_per_minute": int(os.getenv("RATE_LIMIT_RPM", "60")),
-    "requests_per_hour": int(os.getenv("RATE_LIMIT_RPH", "1000"))
+    "requests_per_hour": int(os.getenv("RATE_LIMIT_RPH", "1000")),
+    "max_clients": int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000")),  # Least recently seen clients are forgotten
+    # Reverse proxies in front of the app (1 on Heroku/Railway); clients are then keyed on X-Forwarded-For
+    "trusted_proxies": int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "0"))
 }
 
-# Cache Configuration (if needed in future)
+# Outbound Calendar API throttle, sized to the Google project quota
+OUTBOUND_REQUESTS_PER_MINUTE = int(os.getenv("OUTBOUND_REQUESTS_PER_MINUTE", "600"))
+OUTBOUND_BURST = int(os.getenv("OUTBOUND_BURST", "50"))
+OUTBOUND_INTERACTIVE_RESERVE = int(os.getenv("OUTBOUND_INTERACTIVE_RESERVE", "10"))  # Burst tokens only pause/resume may use
+
+# Response cache for GET endpoints (see response_cache.py)
 CACHE_CONFIG = {
     "enabled": os.getenv("CACHE_ENABLED", "False").lower() == "true",
-    "ttl_seconds": int(os.getenv("CACHE_TTL_SECONDS", "300"))
+    "ttl_seconds": int(os.getenv("CACHE_TTL_SECONDS", "300")),
+    "max_entries": int(os.getenv("CACHE_MAX_ENTRIES", "256"))
 }
\ No newline at end of file
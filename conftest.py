@@ -0,0 +1,121 @@
+import itertools
+import json
+
+import httpx
+import pytest
+
+import async_calendar
+import calendar_registry
+import leases
+import rate_limit
+import resilience
+import utils
+from push_channels import PushChannels, SQLitePushChannelStore
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limits(monkeypatch):
+    """Every test starts with full rate limit buckets and a closed circuit"""
+    monkeypatch.setattr(rate_limit, "inbound_limiter", rate_limit.ClientRateLimiter())
+    monkeypatch.setattr(rate_limit, "outbound_throttle", rate_limit.OutboundThrottle())
+    monkeypatch.setattr(resilience, "circuit_breaker", resilience.CircuitBreaker())
+
+@pytest.fixture
+def local_state(monkeypatch, tmp_path):
+    """No mirror threads, a fresh calendar registry, and the paused store, leases and push channels in tmp_path"""
+    monkeypatch.setattr(calendar_registry, "ENABLE_EVENT_MIRROR", False)
+    monkeypatch.setattr(utils, "calendar_registry", calendar_registry.CalendarRegistry())
+    monkeypatch.setattr(utils, "paused_store", utils.PausedEventStore(tmp_path / "paused.db"))
+    monkeypatch.setattr(utils, "reschedule_scheduler", None)
+    monkeypatch.setattr(leases, "lease_manager", leases.LeaseManager(leases.SQLiteLeaseBackend(tmp_path / "paused.db")))
+    monkeypatch.setattr(utils, "push_channels", PushChannels(
+        SQLitePushChannelStore(tmp_path / "paused.db"), lambda: utils.calendar_registry,
+        utils.get_configured_calendar_ids))
+    return utils.paused_store
+
+def make_event(event_id, summary, start, end, status="confirmed"):
+    """An events().list item with dateTime start and end"""
+    return {
+        "id": event_id,
+        "summary": summary,
+        "status": status,
+        "start": {"dateTime": start},
+        "end": {"dateTime": end},
+    }
+
+class FakeCalendar:
+    """Stand-in for events().list that understands sync tokens"""
+
+    def __init__(self, pages, changes=None, expired_tokens=()):
+        self.pages = pages
+        self.changes = changes or []
+        self.expired_tokens = set(expired_tokens)
+        self.calls = []
+
+    def iter_event_pages(self, calendar_id, **params):
+        self.calls.append(params)
+        token = params.get("syncToken")
+        if token in self.expired_tokens:
+            from googleapiclient.errors import HttpError
+            raise HttpError(type("Resp", (), {"status": 410, "reason": "Gone"})(), b"")
+        if token:
+            yield {"items": self.changes, "nextSyncToken": token + "+"}
+            return
+        for index, items in enumerate(self.pages):
+            page = {"items": items}
+            if index == len(self.pages) - 1:
+                page["nextSyncToken"] = "t1"
+            yield page
+
+class FakeGoogle:
+    """Local stand-in for the Calendar v3 REST API"""
+
+    def __init__(self):
+        self.events = {}
+        self.ids = itertools.count(1)
+        self.requests = []
+        self.failing_pages = {}  # {pageToken ("" for the first page): error status}
+
+    def handler(self, request: httpx.Request):
+        self.requests.append(request)
+        parts = request.url.path.split("/")
+        if parts[-1] == "freeBusy":
+            body = json.loads(request.content)
+            busy = [{"start": e["start"]["dateTime"], "end": e["end"]["dateTime"]} for e in self.events.values()]
+            return httpx.Response(200, json={"calendars": {body["items"][0]["id"]: {"busy": busy}}})
+        if parts[-1] == "events" and request.method == "GET":
+            # Page tokens are offsets into the start-ordered events
+            page_token = request.url.params.get("pageToken", "")
+            if page_token in self.failing_pages:
+                return httpx.Response(self.failing_pages[page_token], json={"error": {"message": "Listing failed"}})
+            items = sorted(self.events.values(), key=lambda e: e["start"]["dateTime"])
+            offset = int(page_token or 0)
+            size = int(request.url.params.get("maxResults", 250))
+            page = {"items": items[offset:offset + size]}
+            if offset + size < len(items):
+                page["nextPageToken"] = str(offset + size)
+            return httpx.Response(200, json=page)
+        if parts[-1] == "events" and request.method == "POST":
+            event = dict(json.loads(request.content), id=f"e{next(self.ids)}", htmlLink="https://calendar/event")
+            self.events[event["id"]] = event
+            return httpx.Response(200, json=event)
+        if parts[-2] == "events" and request.method == "DELETE":
+            if self.events.pop(parts[-1], None) is None:
+                return httpx.Response(404, json={"error": {"message": "Not Found"}})
+            return httpx.Response(204)
+        if parts[-2] == "calendars" and request.method == "GET":
+            return httpx.Response(200, json={"id": parts[-1], "summary": "Team"})
+        return httpx.Response(404, json={"error": {"message": "Not Found"}})
+
+class FakeCredentials:
+    valid = True
+    token = "test-token"
+
+@pytest.fixture
+def google(monkeypatch, local_state):
+    """The shared async client talking to a FakeGoogle, over local_state"""
+    fake = FakeGoogle()
+    monkeypatch.setattr(async_calendar, "get_credentials", lambda: FakeCredentials())
+    client = async_calendar.AsyncCalendarClient()
+    client._http = httpx.AsyncClient(base_url=client._http.base_url, transport=httpx.MockTransport(fake.handler))
+    monkeypatch.setattr(async_calendar, "async_client", client)
+    return fake
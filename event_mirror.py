@@ -0,0 +1,292 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from calendar_client import iter_event_pages
+from name_index import EventNameIndex
+from schedule_index import ScheduleIndex
+from config import (
+    MIRROR_SYNC_INTERVAL_SECONDS, MIRROR_MAX_STALENESS_SECONDS, MIRROR_PAGE_SIZE, FIELD_MASKS
+)
+
+def parse_rfc3339(value: str) -> datetime:
+    """Parse an RFC 3339 timestamp as returned by the Calendar API"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def parse_event_time(event_time: dict) -> datetime:
+    """Parse a Google start/end object into an aware datetime
+
+    All-day events only carry a `date`; they are treated as starting at
+    midnight UTC on that date. A dateTime without an offset (as in request
+    bodies) is read in the object's timeZone, falling back to UTC.
+    """
+    if "dateTime" in event_time:
+        moment = parse_rfc3339(event_time["dateTime"])
+        if moment.tzinfo is None:
+            try:
+                moment = moment.replace(tzinfo=ZoneInfo(event_time.get("timeZone") or "UTC"))
+            except (ZoneInfoNotFoundError, ValueError):
+                moment = moment.replace(tzinfo=timezone.utc)
+        return moment
+    return datetime.fromisoformat(event_time["date"]).replace(tzinfo=timezone.utc)
+
+def event_bounds(event: dict):
+    """Get (start, end) of an event as aware datetimes"""
+    return parse_event_time(event["start"]), parse_event_time(event["end"])
+
+def _settle_max_ends(ordered: list, max_ends: list, position: int):
+    """Recompute prefix-max ends from position after one insert or delete there
+
+    Past position, max_ends still holds each item's old prefix maximum;
+    once a recomputed value matches it, every later one does too.
+    """
+    for index in range(position, len(ordered)):
+        value = ordered[index][1] if index == 0 else max(ordered[index][1], max_ends[index - 1])
+        if index > position and max_ends[index] == value:
+            return
+        max_ends[index] = value
+
+class EventMirror:
+    """In-memory copy of one calendar kept current with incremental sync
+
+    The first sync downloads every (single) event and stores the returned
+    nextSyncToken. Later syncs send that token and only receive changes.
+    When Google expires the token (410 Gone) the mirror starts over with a
+    full sync. on_change() is called after every sync that changed events.
+    """
+
+    def __init__(self, calendar_id: str, on_change=None):
+        self.calendar_id = calendar_id
+        self.on_change = on_change
+        self._events = {}  # {event_id: event}
+        self._ordered = None  # [(start, end, event)] sorted by start; patched on local writes, rebuilt after syncs
+        self._starts = None
+        self._max_ends = None  # _max_ends[i] is the latest end among the first i + 1 events
+        self._names = EventNameIndex()
+        self._schedule = None  # ScheduleIndex over the current snapshot, rebuilt lazily
+        self._sync_token = None
+        self._last_synced = None  # monotonic time of the last successful sync
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # Sync
+
+    def full_sync(self):
+        """Download the whole calendar and remember the sync token"""
+        events = {}
+        sync_token = None
+        for page in iter_event_pages(self.calendar_id, singleEvents=True, maxResults=MIRROR_PAGE_SIZE,
+                                     fields=FIELD_MASKS["mirror_sync"]):
+            for event in page.get('items', []):
+                if event.get('status') != 'cancelled':
+                    events[event['id']] = event
+            sync_token = page.get('nextSyncToken', sync_token)
+
+        with self._lock:
+            self._events = events
+            self._names.rebuild(events.values())
+            self._ordered = None
+            self._sync_token = sync_token
+            self._last_synced = time.monotonic()
+        if self.on_change is not None:
+            self.on_change()
+
+    def incremental_sync(self):
+        """Apply changes since the last sync; falls back to a full sync on 410"""
+        from googleapiclient.errors import HttpError
+
+        changed = {}
+        sync_token = self._sync_token
+        try:
+            for page in iter_event_pages(self.calendar_id, singleEvents=True, syncToken=sync_token,
+                                         maxResults=MIRROR_PAGE_SIZE, fields=FIELD_MASKS["mirror_sync"]):
+                for event in page.get('items', []):
+                    changed[event['id']] = event
+                sync_token = page.get('nextSyncToken', sync_token)
+        except HttpError as e:
+            if e.resp.status == 410:
+                # Sync token expired or invalidated - start over
+                self.full_sync()
+                return
+            raise
+
+        with self._lock:
+            for event_id, event in changed.items():
+                if event.get('status') == 'cancelled':
+                    self._events.pop(event_id, None)
+                    self._names.remove(event_id)
+                else:
+                    self._events[event_id] = event
+                    self._names.add(event)
+            if changed:
+                self._ordered = None
+            self._sync_token = sync_token
+            self._last_synced = time.monotonic()
+        if changed and self.on_change is not None:
+            self.on_change()
+
+    def sync(self):
+        """Bring the mirror up to date"""
+        with self._sync_lock:
+            if self._sync_token is None:
+                self.full_sync()
+            else:
+                self.incremental_sync()
+        self._snapshot()  # Re-sort here, on the sync thread, rather than in the next read
+
+    def request_sync(self):
+        """Ask the background thread to sync now instead of at the next interval"""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"Failed to sync calendar mirror for {self.calendar_id}: {str(e)}")
+            self._wake.wait(MIRROR_SYNC_INTERVAL_SECONDS)
+            self._wake.clear()
+
+    def start(self):
+        """Start syncing in a background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"calendar-mirror-{self.calendar_id}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background sync thread"""
+        self._stop.set()
+        self._wake.set()
+
+    def is_fresh(self) -> bool:
+        """True once synced and the last successful sync is recent enough to serve reads"""
+        last_synced = self._last_synced
+        return last_synced is not None and time.monotonic() - last_synced <= MIRROR_MAX_STALENESS_SECONDS
+
+    # Local writes
+
+    def apply_event(self, event: dict):
+        """Record an event this service just created so reads see it immediately"""
+        if event.get('recurrence'):
+            # Only the expanded instances belong in the mirror
+            self.request_sync()
+            return
+        with self._lock:
+            self._patch(self._events.get(event['id']), event)
+            self._events[event['id']] = event
+            self._names.add(event)
+
+    def discard_event(self, event_id: str):
+        """Forget an event this service just deleted"""
+        with self._lock:
+            removed = self._events.pop(event_id, None)
+            if removed is not None:
+                self._names.remove(event_id)
+                self._patch(removed, None)
+
+    def _patch(self, old: dict, new: dict):
+        """Swap in a snapshot with old replaced by new (either may be None), without a full re-sort
+
+        Copy-on-write, so readers holding the previous lists are unaffected.
+        Prefix maxima are recomputed from the changed position only until
+        they agree with the old ones again, and the schedule index is
+        patched rather than rebuilt.
+        """
+        if self._ordered is None:
+            return
+        ordered, starts, max_ends = list(self._ordered), list(self._starts), list(self._max_ends)
+        removed = added = None
+        if old is not None:
+            try:
+                start = event_bounds(old)[0]
+            except (KeyError, ValueError):
+                start = None
+            position = bisect_left(starts, start) if start is not None else len(ordered)
+            while position < len(ordered) and starts[position] == start:
+                if ordered[position][2] is old:
+                    removed = ordered[position]
+                    del ordered[position], starts[position], max_ends[position]
+                    _settle_max_ends(ordered, max_ends, position)
+                    break
+                position += 1
+        if new is not None:
+            try:
+                start, end = event_bounds(new)
+            except (KeyError, ValueError):
+                start = None
+            if start is not None:
+                added = (start, end, new)
+                position = bisect_right(starts, start)
+                ordered.insert(position, added)
+                starts.insert(position, start)
+                max_ends.insert(position, None)
+                _settle_max_ends(ordered, max_ends, position)
+        schedule = self._schedule
+        if schedule is not None and schedule.source is self._ordered:
+            if removed is not None:
+                schedule.discard(removed)
+            if added is not None:
+                schedule.add(added)
+            schedule.source = ordered
+        self._ordered, self._starts, self._max_ends = ordered, starts, max_ends
+
+    # Reads
+
+    def _snapshot(self):
+        with self._lock:
+            if self._ordered is None:
+                ordered = []
+                for event in self._events.values():
+                    try:
+                        start, end = event_bounds(event)
+                    except (KeyError, ValueError):
+                        continue
+                    ordered.append((start, end, event))
+                ordered.sort(key=lambda item: item[0])
+                max_ends = []
+                for _, end, _ in ordered:
+                    max_ends.append(max(end, max_ends[-1]) if max_ends else end)
+                self._ordered = ordered
+                self._starts = [item[0] for item in ordered]
+                self._max_ends = max_ends
+            return self._ordered, self._starts, self._max_ends
+
+    def all_events(self):
+        """All mirrored events ordered by start time"""
+        ordered, _, _ = self._snapshot()
+        return [event for _, _, event in ordered]
+
+    def intervals_overlapping(self, time_min: datetime, time_max: datetime):
+        """(start, end, event) overlapping [time_min, time_max), ordered by start time
+
+        Events before the first prefix-max end past time_min all finish by
+        then, so only the slice between the two bisects is scanned.
+        """
+        ordered, starts, max_ends = self._snapshot()
+        first = bisect_right(max_ends, time_min)
+        stop = bisect_left(starts, time_max)
+        return [item for item in ordered[first:stop] if item[1] > time_min]
+
+    def ongoing_event(self, moment: datetime):
+        """First pausable event containing moment, in constant time from the schedule index"""
+        ordered, _, max_ends = self._snapshot()
+        with self._lock:
+            schedule = self._schedule
+            if schedule is None or schedule.source is not ordered or not schedule.covers(moment):
+                # Skip the past: everything before first has ended before the window opens
+                first = bisect_left(max_ends, ScheduleIndex.window_start(moment))
+                schedule = self._schedule = ScheduleIndex(ordered, moment, first)
+            return schedule.ongoing(moment)  # Under the lock: local writes patch the index in place
+
+    def events_named(self, summary: str, match_case: bool = True):
+        """Events whose title matches, ordered by start time (served from the name index)"""
+        with self._lock:
+            events = [self._events[event_id] for event_id in self._names.ids_for(summary, match_case)]
+        return sorted(events, key=lambda event: event_bounds(event)[0])
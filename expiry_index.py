@@ -0,0 +1,53 @@
+from bisect import bisect_left, insort
+from datetime import datetime
+
+class ExpiryIndex:
+    """Paused event IDs ordered by their auto-reschedule deadline
+
+    Entries are (epoch_seconds, event_id) in a sorted list, so the expired
+    ones are always a prefix: finding them is one bisect plus k reads.
+    """
+
+    def __init__(self):
+        self._entries = []  # sorted [(deadline, event_id)]
+        self._deadlines = {}  # {event_id: deadline}
+
+    @classmethod
+    def from_sorted(cls, entries):
+        """Build from [(epoch_seconds, event_id)] already sorted, in one pass"""
+        index = cls()
+        index._entries = list(entries)
+        index._deadlines = {event_id: deadline for deadline, event_id in index._entries}
+        return index
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, event_id):
+        return event_id in self._deadlines
+
+    def add(self, event_id: str, deadline: datetime):
+        """Insert an event, replacing any earlier deadline it had"""
+        self.remove(event_id)
+        entry = (deadline.timestamp(), event_id)
+        self._deadlines[event_id] = entry[0]
+        insort(self._entries, entry)
+
+    def remove(self, event_id: str):
+        deadline = self._deadlines.pop(event_id, None)
+        if deadline is not None:
+            index = bisect_left(self._entries, (deadline, event_id))
+            del self._entries[index]
+
+    def clear(self):
+        self._entries.clear()
+        self._deadlines.clear()
+
+    def expired(self, now: datetime):
+        """Event IDs whose deadline is strictly before now, earliest first"""
+        stop = bisect_left(self._entries, (now.timestamp(),))
+        return [event_id for _, event_id in self._entries[:stop]]
+
+    def next_deadline(self):
+        """Epoch seconds of the earliest deadline, or None"""
+        return self._entries[0][0] if self._entries else None
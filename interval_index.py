@@ -0,0 +1,115 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+
+def to_epoch(moment: datetime) -> float:
+    """Seconds since the epoch for an aware datetime"""
+    return moment.timestamp()
+
+def from_epoch(seconds: float, tz=timezone.utc) -> datetime:
+    """Aware datetime for epoch seconds"""
+    return datetime.fromtimestamp(seconds, tz)
+
+class BusyIntervals:
+    """Sorted, merged busy intervals with O(log n) free-slot queries
+
+    Intervals are stored as two parallel sorted lists of epoch seconds with
+    no overlaps. The free gap after each interval is kept in a max segment
+    tree, so "first gap of at least this long after time t" is a bisect plus
+    a tree descent. Adding an interval re-merges and rebuilds the tree
+    lazily on the next query.
+    """
+
+    def __init__(self, intervals=()):
+        self._starts = []
+        self._ends = []
+        self._tree = None
+        self._size = 0
+        for start, end in intervals:
+            self.add(start, end)
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __iter__(self):
+        for start, end in zip(self._starts, self._ends):
+            yield from_epoch(start), from_epoch(end)
+
+    def add(self, start: datetime, end: datetime):
+        """Mark [start, end) busy, merging with overlapping or touching intervals"""
+        start, end = to_epoch(start), to_epoch(end)
+        if end <= start:
+            return
+        # Every interval whose end reaches start, up to the first one that begins after end
+        first = bisect_left(self._ends, start)
+        last = bisect_right(self._starts, end)
+        if first < last:
+            start = min(start, self._starts[first])
+            end = max(end, self._ends[last - 1])
+        self._starts[first:last] = [start]
+        self._ends[first:last] = [end]
+        self._tree = None
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        """True if no busy interval overlaps [start, end)"""
+        start, end = to_epoch(start), to_epoch(end)
+        index = bisect_right(self._ends, start)
+        return index == len(self._starts) or self._starts[index] >= end
+
+    def _gap(self, index: int) -> float:
+        # Free time between interval `index` and the next one (the last gap is open-ended)
+        if index + 1 < len(self._starts):
+            return self._starts[index + 1] - self._ends[index]
+        return float("inf")
+
+    def _build_tree(self):
+        count = len(self._starts)
+        size = 1
+        while size < max(count, 1):
+            size *= 2
+        tree = [float("-inf")] * (2 * size)
+        for index in range(count):
+            tree[size + index] = self._gap(index)
+        for node in range(size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self._tree = tree
+        self._size = size
+
+    def _first_gap_at_least(self, lo: int, length: float) -> int:
+        """Index of the first interval at or after `lo` followed by a gap >= length"""
+        if self._tree is None:
+            self._build_tree()
+        tree, size = self._tree, self._size
+
+        def descend(node, node_lo, node_hi):
+            if node_hi < lo or tree[node] < length:
+                return -1
+            if node >= size:
+                return node - size
+            mid = (node_lo + node_hi) // 2
+            found = descend(2 * node, node_lo, mid)
+            if found == -1:
+                found = descend(2 * node + 1, mid + 1, node_hi)
+            return found
+
+        return descend(1, 0, size - 1)
+
+    def next_free_slot(self, start: datetime, duration: timedelta):
+        """Earliest (slot_start, slot_end) at or after start with no busy overlap"""
+        tz = start.tzinfo or timezone.utc
+        length = duration.total_seconds()
+        candidate = to_epoch(start)
+        # The interval containing candidate, or the last one before it
+        index = bisect_right(self._starts, candidate) - 1
+
+        if index >= 0 and self._ends[index] > candidate:
+            # Starting inside a busy interval - search the gaps from here on
+            found = self._first_gap_at_least(index, length)
+        else:
+            # Starting in the gap after `index`
+            next_index = index + 1
+            if next_index == len(self._starts) or candidate + length <= self._starts[next_index]:
+                return start, start + duration
+            found = self._first_gap_at_least(next_index, length)
+
+        slot_start = from_epoch(self._ends[found], tz)
+        return slot_start, slot_start + duration
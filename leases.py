@@ -0,0 +1,176 @@
+import asyncio
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from config import LEASE_BACKEND, LEASE_REDIS_URL, LEASE_TTL_SECONDS, PAUSED_STORE_PATH
+
+class LeaseUnavailable(Exception):
+    """Another holder has an unexpired lease on the key"""
+
+class LeaseLost(Exception):
+    """The lease expired and may have been taken over; its fencing token is stale"""
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    token INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lease_fence (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    token INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO lease_fence (id, token) VALUES (0, 0);
+"""
+
+class SQLiteLeaseBackend:
+    """Leases in the shared SQLite database (same file as the paused store)
+
+    Fencing tokens come from one counter that only ever grows, so a later
+    holder of any lease always has a larger token than an earlier one.
+    Leases have their own tables and never bump the store's meta.version.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SQLITE_SCHEMA)
+
+    def acquire(self, key: str, owner: str, ttl_seconds: float):
+        """Fencing token for a new lease on key, or None if it is held"""
+        now = time.time()
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute("SELECT expires_at FROM leases WHERE key = ?", (key,)).fetchone()
+                if row is not None and row[0] > now:
+                    connection.execute("ROLLBACK")
+                    return None
+                connection.execute("UPDATE lease_fence SET token = token + 1 WHERE id = 0")
+                token = connection.execute("SELECT token FROM lease_fence WHERE id = 0").fetchone()[0]
+                connection.execute(
+                    "INSERT OR REPLACE INTO leases (key, owner, token, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, owner, token, now + ttl_seconds))
+                connection.execute("COMMIT")
+                return token
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def is_current(self, key: str, token: int, owner: str):
+        """Whether token still holds an unexpired lease on key"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM leases WHERE key = ? AND token = ? AND owner = ? AND expires_at > ?",
+                (key, token, owner, time.time())).fetchone()
+        return row is not None
+
+    def release(self, key: str, token: int, owner: str):
+        """Drop the lease if token still holds it (a taken-over lease is left alone)"""
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM leases WHERE key = ? AND token = ? AND owner = ?", (key, token, owner))
+
+# Compare-and-delete / compare on the lease value, atomically on the server
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+CHECK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return 1
+end
+return 0
+"""
+
+class RedisLeaseBackend:
+    """Leases on a Redis-compatible server
+
+    SET NX PX takes the lease and lets it expire on the server's clock.
+    Fencing tokens come from INCR on a per-key counter, so each new holder
+    of a key gets a larger token than the previous one.
+    """
+
+    def __init__(self, client, prefix: str = "calendar:lease:"):
+        self._client = client
+        self._prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str):
+        import redis  # Optional dependency, only needed for this backend
+        return cls(redis.Redis.from_url(url))
+
+    def acquire(self, key: str, owner: str, ttl_seconds: float):
+        """Fencing token for a new lease on key, or None if it is held"""
+        token = self._client.incr(f"{self._prefix}fence:{key}")
+        acquired = self._client.set(
+            f"{self._prefix}{key}", f"{token}:{owner}", nx=True, px=int(ttl_seconds * 1000))
+        return token if acquired else None
+
+    def is_current(self, key: str, token: int, owner: str):
+        """Whether token still holds an unexpired lease on key"""
+        return bool(self._client.eval(CHECK_SCRIPT, 1, f"{self._prefix}{key}", f"{token}:{owner}"))
+
+    def release(self, key: str, token: int, owner: str):
+        """Drop the lease if token still holds it (a taken-over lease is left alone)"""
+        self._client.eval(RELEASE_SCRIPT, 1, f"{self._prefix}{key}", f"{token}:{owner}")
+
+class Lease:
+    """A held lease; check it right before each side effect it protects"""
+
+    def __init__(self, manager, key: str, token: int):
+        self.manager = manager
+        self.key = key
+        self.token = token
+
+    async def ensure_valid(self):
+        """Raise LeaseLost if the lease expired (another holder may own it now)"""
+        backend, owner = self.manager.backend, self.manager.owner
+        if not await asyncio.to_thread(backend.is_current, self.key, self.token, owner):
+            raise LeaseLost(f"Lease on {self.key} (token {self.token}) is no longer held")
+
+class LeaseManager:
+    """Take leases for this process on a backend"""
+
+    def __init__(self, backend, ttl_seconds: float = LEASE_TTL_SECONDS, owner: str = None):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    @asynccontextmanager
+    async def hold(self, key: str):
+        """Hold the lease on key for the duration of the block
+
+        Raises LeaseUnavailable at once if someone else holds it.
+        """
+        token = await asyncio.to_thread(self.backend.acquire, key, self.owner, self.ttl_seconds)
+        if token is None:
+            raise LeaseUnavailable(f"Lease on {key} is held by another worker")
+        try:
+            yield Lease(self, key, token)
+        finally:
+            await asyncio.to_thread(self.backend.release, key, token, self.owner)
+
+# Shared manager, built from config on first use
+lease_manager = None
+
+def get_lease_manager() -> LeaseManager:
+    """Get the shared lease manager (LEASE_BACKEND picks sqlite or redis)"""
+    global lease_manager
+    if lease_manager is None:
+        if LEASE_BACKEND == "redis":
+            backend = RedisLeaseBackend.from_url(LEASE_REDIS_URL)
+        else:
+            backend = SQLiteLeaseBackend(PAUSED_STORE_PATH)
+        lease_manager = LeaseManager(backend)
+    return lease_manager
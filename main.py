@@ -1,15 +1,4 @@
-import os
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-
-SERVICE_ACCOUNT_FILE = os.getenv("SERVICE_ACCOUNT_FILE", "service_account.json")
-SCOPES = [os.getenv("SCOPES", "https://www.googleapis.com/auth/calendar")]
-
-def get_service():
-    creds = Credentials.from_service_account_file(
-        SERVICE_ACCOUNT_FILE, scopes=SCOPES)
-    service = build("calendar", "v3", credentials=creds)
-    return service
+from calendar_client import get_service
 
 def create_event():
     service = get_service()
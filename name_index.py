@@ -0,0 +1,62 @@
+class EventNameIndex:
+    """Map event titles to event IDs, by exact and case-insensitive title
+
+    Lookups cost time proportional to the number of matches, not to the
+    size of the calendar. The index is not thread-safe on its own; the
+    owning EventMirror guards it with its lock.
+    """
+
+    def __init__(self):
+        self._exact = {}  # {summary: {event_id}}
+        self._folded = {}  # {summary.casefold(): {event_id}}
+        self._names = {}  # {event_id: summary}
+
+    def __len__(self):
+        return len(self._names)
+
+    @staticmethod
+    def _link(keys: dict, key: str, event_id: str):
+        keys.setdefault(key, set()).add(event_id)
+
+    @staticmethod
+    def _unlink(keys: dict, key: str, event_id: str):
+        ids = keys.get(key)
+        if ids is not None:
+            ids.discard(event_id)
+            if not ids:
+                del keys[key]
+
+    def add(self, event: dict):
+        """Index an event, replacing whatever title it had before"""
+        event_id = event['id']
+        summary = event.get('summary', '')
+        previous = self._names.get(event_id)
+        if previous == summary:
+            return
+        if previous is not None:
+            self.remove(event_id)
+        self._names[event_id] = summary
+        self._link(self._exact, summary, event_id)
+        self._link(self._folded, summary.casefold(), event_id)
+
+    def remove(self, event_id: str):
+        """Drop an event from the index"""
+        summary = self._names.pop(event_id, None)
+        if summary is None:
+            return
+        self._unlink(self._exact, summary, event_id)
+        self._unlink(self._folded, summary.casefold(), event_id)
+
+    def rebuild(self, events):
+        """Replace the index contents with the given events"""
+        self._exact = {}
+        self._folded = {}
+        self._names = {}
+        for event in events:
+            self.add(event)
+
+    def ids_for(self, summary: str, match_case: bool = True):
+        """Event IDs whose title equals the given one"""
+        if match_case:
+            return set(self._exact.get(summary, ()))
+        return set(self._folded.get(summary.casefold(), ()))
@@ -0,0 +1,336 @@
+import base64
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from expiry_index import ExpiryIndex
+from config import PAUSED_KEEP_ORIGINAL_EVENT, PAUSED_STORE_CHANGE_LOG_SIZE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS paused_events (
+    event_id TEXT PRIMARY KEY,
+    calendar_id TEXT,
+    pause_time REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS paused_events_pause_time ON paused_events (pause_time);
+CREATE INDEX IF NOT EXISTS paused_events_expires_at ON paused_events (expires_at);
+CREATE INDEX IF NOT EXISTS paused_events_calendar ON paused_events (calendar_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', '0');
+CREATE TABLE IF NOT EXISTS changes (
+    version INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS changes_version ON changes (version);
+"""
+
+@dataclass(slots=True)
+class PausedEvent:
+    """What resume and auto-reschedule need to know about a paused event
+
+    Times are whole epoch seconds plus the UTC offset they were taken in,
+    and names are interned, so a record stays a few small ints and shared
+    strings however large the original event was. The original Google
+    event is only kept (zlib-compressed) with PAUSED_KEEP_ORIGINAL_EVENT.
+    """
+
+    event_name: str
+    pause_ts: int
+    original_end_ts: int
+    remaining_seconds: int
+    utc_offset_seconds: int = 0
+    original_event_z: Optional[bytes] = None
+
+    def __post_init__(self):
+        self.event_name = sys.intern(self.event_name)
+
+    @classmethod
+    def create(cls, event_name: str, pause_time: datetime, original_end_time: datetime,
+               remaining_duration: timedelta, original_event: dict = None):
+        offset = pause_time.utcoffset()
+        original_event_z = None
+        if original_event is not None and PAUSED_KEEP_ORIGINAL_EVENT:
+            original_event_z = zlib.compress(json.dumps(original_event, separators=(",", ":")).encode())
+        return cls(event_name, int(pause_time.timestamp()), int(original_end_time.timestamp()),
+                   int(remaining_duration.total_seconds()), int(offset.total_seconds()) if offset else 0,
+                   original_event_z)
+
+    @property
+    def tz(self):
+        return timezone(timedelta(seconds=self.utc_offset_seconds))
+
+    @property
+    def pause_time(self) -> datetime:
+        return datetime.fromtimestamp(self.pause_ts, self.tz)
+
+    @property
+    def original_end_time(self) -> datetime:
+        return datetime.fromtimestamp(self.original_end_ts, self.tz)
+
+    @property
+    def remaining_duration(self) -> timedelta:
+        return timedelta(seconds=self.remaining_seconds)
+
+    @property
+    def original_event(self):
+        """The original Google event if it was kept, else None"""
+        if self.original_event_z is None:
+            return None
+        return json.loads(zlib.decompress(self.original_event_z))
+
+def _encode(paused: PausedEvent) -> str:
+    record = {
+        "event_name": paused.event_name,
+        "pause_ts": paused.pause_ts,
+        "original_end_ts": paused.original_end_ts,
+        "remaining_seconds": paused.remaining_seconds,
+        "utc_offset_seconds": paused.utc_offset_seconds
+    }
+    if paused.original_event_z is not None:
+        record["original_event_z"] = base64.b64encode(paused.original_event_z).decode()
+    return json.dumps(record, separators=(",", ":"))
+
+def _decode(payload: str) -> PausedEvent:
+    data = json.loads(payload)
+    if "pause_ts" not in data:
+        # Rows written before PausedEvent (ISO times and the full original event)
+        return PausedEvent.create(
+            data["event_name"], datetime.fromisoformat(data["pause_time"]),
+            datetime.fromisoformat(data["original_end_time"]), timedelta(seconds=data["remaining_seconds"]),
+            data.get("original_event"))
+    original_event_z = data.get("original_event_z")
+    return PausedEvent(
+        data["event_name"], data["pause_ts"], data["original_end_ts"], data["remaining_seconds"],
+        data["utc_offset_seconds"], base64.b64decode(original_event_z) if original_event_z else None)
+
+class PausedEventStore:
+    """Paused events and service settings in SQLite (WAL mode)
+
+    Paused events are partitioned by calendar_id, and each calendar has its
+    own "last paused" marker. Every write is a short transaction on a
+    pooled connection that also bumps meta.version and logs the rows it
+    touched in the changes table, then updates the in-memory cache. Reads
+    come from the cache; they only compare meta.version, and when another
+    process (another uvicorn worker) has written since, re-read just the
+    rows logged for the versions they missed. Only a cache that has fallen
+    further behind than the log (PAUSED_STORE_CHANGE_LOG_SIZE) reloads
+    everything. Every method may touch SQLite, so async callers run them
+    in a thread.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4):
+        self.path = str(path)
+        self._pool = queue.LifoQueue()
+        for _ in range(max(1, pool_size)):
+            self._pool.put(self._connect())
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+        self._lock = threading.RLock()
+        self._version = None  # meta.version the cache reflects
+        self._events = {}  # {event_id: PausedEvent}
+        self._calendars = {}  # {event_id: calendar_id}
+        self._by_calendar = {}  # {calendar_id: {event_id: PausedEvent}}
+        self._expiry = ExpiryIndex()
+        self._meta = {}
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @contextmanager
+    def _connection(self):
+        connection = self._pool.get()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    @contextmanager
+    def _write(self):
+        """Write transaction; the cache is updated by the caller under the lock"""
+        with self._lock, self._connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                before = int(connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0])
+                yield connection
+                connection.execute("UPDATE meta SET value = ? WHERE key = 'version'", (str(before + 1),))
+                connection.execute("DELETE FROM changes WHERE version <= ?",
+                                   (before + 1 - PAUSED_STORE_CHANGE_LOG_SIZE,))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            # If someone else wrote since our last load, the next refresh catches up on both writes
+            if before == self._version:
+                self._version = before + 1
+
+    @staticmethod
+    def _log(connection, kind: str, key: str):
+        """Record a row touched by the current write ("event" or "meta") under the version it creates"""
+        connection.execute(
+            "INSERT INTO changes (version, kind, key) "
+            "SELECT CAST(value AS INTEGER) + 1, ?, ? FROM meta WHERE key = 'version'", (kind, key))
+
+    def _refresh(self):
+        with self._connection() as connection:
+            version = int(connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0])
+            if version == self._version:
+                return
+            with self._lock:
+                if self._version is None or not self._apply_changes(connection, version):
+                    self._reload(connection)
+                self._version = version
+
+    def _apply_changes(self, connection, version: int) -> bool:
+        """Re-read the rows written after the cached version; False if the log no longer covers them"""
+        rows = connection.execute(
+            "SELECT version, kind, key FROM changes WHERE version > ? AND version <= ?",
+            (self._version, version)).fetchall()
+        if len({row[0] for row in rows}) != version - self._version:
+            return False
+        for kind, key in {(kind, key) for _, kind, key in rows}:
+            if kind == "meta":
+                row = connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self._meta.pop(key, None)
+                else:
+                    self._meta[key] = row[0]
+                continue
+            self._forget(key)
+            row = connection.execute(
+                "SELECT calendar_id, expires_at, payload FROM paused_events WHERE event_id = ?", (key,)).fetchone()
+            if row is not None:
+                self._remember(key, sys.intern(row[0]), _decode(row[2]), row[1])
+        return True
+
+    def _reload(self, connection):
+        rows = connection.execute(
+            "SELECT event_id, calendar_id, expires_at, payload FROM paused_events "
+            "ORDER BY expires_at, event_id").fetchall()
+        self._events = {event_id: _decode(payload) for event_id, _, _, payload in rows}
+        self._calendars = {event_id: sys.intern(calendar_id) for event_id, calendar_id, _, _ in rows}
+        self._by_calendar = {}
+        for event_id, calendar_id in self._calendars.items():
+            self._by_calendar.setdefault(calendar_id, {})[event_id] = self._events[event_id]
+        self._expiry = ExpiryIndex.from_sorted((expires_at, event_id) for event_id, _, expires_at, _ in rows)
+        self._meta = dict(connection.execute("SELECT key, value FROM meta WHERE key != 'version'").fetchall())
+
+    def _remember(self, event_id: str, calendar_id: str, paused: PausedEvent, deadline: float):
+        self._events[event_id] = paused
+        self._calendars[event_id] = calendar_id
+        self._by_calendar.setdefault(calendar_id, {})[event_id] = paused
+        self._expiry.add(event_id, datetime.fromtimestamp(deadline))
+
+    def _forget(self, event_id: str):
+        self._events.pop(event_id, None)
+        calendar_id = self._calendars.pop(event_id, None)
+        self._by_calendar.get(calendar_id, {}).pop(event_id, None)
+        self._expiry.remove(event_id)
+
+    def add(self, event_id: str, calendar_id: str, paused: PausedEvent, deadline: datetime):
+        """Store a paused event and make it the calendar's last paused one"""
+        self.remove(event_id)  # An event moving calendars must leave the old partition
+        calendar_id = sys.intern(calendar_id)
+        last_paused = f"last_paused:{calendar_id}"
+        with self._write() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO paused_events (event_id, calendar_id, pause_time, expires_at, payload) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (event_id, calendar_id, paused.pause_ts, deadline.timestamp(), _encode(paused)))
+            connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (last_paused, event_id))
+            self._log(connection, "event", event_id)
+            self._log(connection, "meta", last_paused)
+            self._remember(event_id, calendar_id, paused, deadline.timestamp())
+            self._meta[last_paused] = event_id
+
+    def remove(self, event_id: str):
+        """Delete a paused event (no-op if it is gone)"""
+        self._refresh()
+        if event_id not in self._calendars:
+            return
+        last_paused = f"last_paused:{self._calendars[event_id]}"
+        with self._write() as connection:
+            connection.execute("DELETE FROM paused_events WHERE event_id = ?", (event_id,))
+            connection.execute("DELETE FROM meta WHERE key = ? AND value = ?", (last_paused, event_id))
+            self._log(connection, "event", event_id)
+            self._log(connection, "meta", last_paused)
+            self._forget(event_id)
+            if self._meta.get(last_paused) == event_id:
+                del self._meta[last_paused]
+
+    def set_meta(self, key: str, value):
+        """Store a setting (None deletes it)"""
+        with self._write() as connection:
+            self._log(connection, "meta", key)
+            if value is None:
+                connection.execute("DELETE FROM meta WHERE key = ?", (key,))
+                self._meta.pop(key, None)
+            else:
+                connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+                self._meta[key] = value
+
+    def version(self):
+        """meta.version, which changes on every write by any process"""
+        self._refresh()
+        return self._version
+
+    def get_meta(self, key: str):
+        self._refresh()
+        return self._meta.get(key)
+
+    def meta_keys(self, prefix: str):
+        """Setting keys starting with prefix"""
+        self._refresh()
+        with self._lock:
+            return [key for key in self._meta if key.startswith(prefix)]
+
+    def get(self, event_id: str):
+        self._refresh()
+        return self._events.get(event_id)
+
+    def all(self, calendar_id: str = None):
+        """{event_id: PausedEvent} for one calendar, or every calendar (a snapshot copy)"""
+        self._refresh()
+        with self._lock:  # Writes from other threads change the cached dicts in place
+            if calendar_id is None:
+                return dict(self._events)
+            return dict(self._by_calendar.get(calendar_id, {}))
+
+    def calendar_of(self, event_id: str):
+        self._refresh()
+        return self._calendars.get(event_id)
+
+    def last_paused_id(self, calendar_id: str):
+        return self.get_meta(f"last_paused:{calendar_id}")
+
+    def next_deadline(self):
+        """Epoch seconds of the earliest paused-event deadline, or None"""
+        self._refresh()
+        return self._expiry.next_deadline()
+
+    def expired(self, now: datetime, calendar_id: str = None):
+        """IDs of paused events whose deadline is before now, earliest first"""
+        self._refresh()
+        with self._lock:
+            expired = self._expiry.expired(now)
+            if calendar_id is not None:
+                expired = [event_id for event_id in expired if self._calendars.get(event_id) == calendar_id]
+        return expired
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get().close()
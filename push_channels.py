@@ -0,0 +1,238 @@
+import asyncio
+import hashlib
+import hmac
+import secrets
+import sqlite3
+import threading
+import time
+import uuid
+from urllib.parse import parse_qs, urlencode
+from async_calendar import get_async_client
+from leases import get_lease_manager, LeaseLost, LeaseUnavailable
+from config import (
+    PUSH_WEBHOOK_URL, PUSH_CHANNEL_SECRET, PUSH_CHANNEL_TTL_SECONDS, PUSH_RENEW_BEFORE_SECONDS,
+    PUSH_CHECK_INTERVAL_SECONDS
+)
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS push_channels (
+    calendar_id TEXT PRIMARY KEY,
+    channel_id TEXT NOT NULL,
+    resource_id TEXT,
+    expiration REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS push_changed (
+    calendar_id TEXT PRIMARY KEY,
+    marker TEXT NOT NULL
+);
+"""
+
+# start() refuses to run without PUSH_CHANNEL_SECRET; the random fallback only signs for this process
+_secret = (PUSH_CHANNEL_SECRET or secrets.token_hex(32)).encode()
+
+def _signature(channel_id: str, calendar_id: str) -> str:
+    return hmac.new(_secret, f"{channel_id}\n{calendar_id}".encode(), hashlib.sha256).hexdigest()
+
+def channel_token(channel_id: str, calendar_id: str) -> str:
+    """Token Google echoes on every notification (X-Goog-Channel-Token)"""
+    return urlencode({"calendar": calendar_id, "sig": _signature(channel_id, calendar_id)})
+
+def verify_channel_token(channel_id: str, token: str):
+    """The calendar a token was signed for, or None unless we signed it for this channel
+
+    Only proves the channel was once ours; PushChannels.verify also checks it is still the current one.
+    """
+    fields = parse_qs(token or "")
+    calendar_id = fields.get("calendar", [None])[0]
+    signature = fields.get("sig", [""])[0]
+    if not channel_id or not calendar_id or not hmac.compare_digest(signature, _signature(channel_id, calendar_id)):
+        return None
+    return calendar_id
+
+class SQLitePushChannelStore:
+    """Channel records and notification markers in the shared SQLite database
+
+    Same file as the paused store, but in their own tables: renewals and
+    notifications must not bump meta.version, or every one would make each
+    worker reload all paused events and miss its version-keyed caches.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SQLITE_SCHEMA)
+
+    def channel(self, calendar_id: str):
+        """The calendar's current channel record ({id, resource_id, expiration}), or None"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT channel_id, resource_id, expiration FROM push_channels WHERE calendar_id = ?",
+                (calendar_id,)).fetchone()
+        return {"id": row[0], "resource_id": row[1], "expiration": row[2]} if row else None
+
+    def set_channel(self, calendar_id: str, record: dict):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO push_channels (calendar_id, channel_id, resource_id, expiration) "
+                "VALUES (?, ?, ?, ?)", (calendar_id, record["id"], record["resource_id"], record["expiration"]))
+
+    def changed(self, calendar_id: str):
+        """The calendar's latest notification marker, or None"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT marker FROM push_changed WHERE calendar_id = ?", (calendar_id,)).fetchone()
+        return row[0] if row else None
+
+    def mark_changed(self, calendar_id: str, marker: str):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO push_changed (calendar_id, marker) VALUES (?, ?)", (calendar_id, marker))
+
+class PushChannels:
+    """events().watch channels for every calendar this process serves
+
+    Channel records (id, resourceId, expiry) live in a store shared by the
+    workers (SQLitePushChannelStore), so they keep one channel per calendar
+    between them and renew it, under a lease, before it expires. Only the
+    current channel's notifications are accepted. A notification can reach
+    any worker: it is recorded as the calendar's changed marker, and each
+    worker's check loop notices the new marker and syncs its own mirror (or
+    drops its cached responses when it has no mirror). Changes then show
+    up within a check interval instead of after a polling sync or a cache TTL.
+
+    get_configured() lists the calendars configured in the shared store, so
+    their channels are kept open even before a request reaches this process.
+    """
+
+    def __init__(self, store, get_registry, get_configured=None, address: str = PUSH_WEBHOOK_URL,
+                 ttl_seconds: int = PUSH_CHANNEL_TTL_SECONDS, renew_before_seconds: int = PUSH_RENEW_BEFORE_SECONDS):
+        self.store = store
+        self._get_registry = get_registry
+        self._get_configured = get_configured
+        self.address = address
+        self.ttl_seconds = ttl_seconds
+        self.renew_before_seconds = renew_before_seconds
+        self.notifications = 0
+        self.renewals = 0
+        self._task = None
+
+    def channel(self, calendar_id: str):
+        """The calendar's current channel record, or None"""
+        return self.store.channel(calendar_id)
+
+    def verify(self, channel_id: str, token: str):
+        """The calendar a notification is about, or None unless it came on the calendar's current channel"""
+        calendar_id = verify_channel_token(channel_id, token)
+        if calendar_id is None:
+            return None
+        record = self.channel(calendar_id)  # Replaced and stopped channels are no longer current
+        if record is None or record["id"] != channel_id or record["expiration"] <= time.time():
+            return None
+        return calendar_id
+
+    def _due(self, record) -> bool:
+        return record is None or record["expiration"] - time.time() <= self.renew_before_seconds
+
+    async def ensure_channel(self, calendar_id: str):
+        """Open (or renew) the calendar's channel if it is missing or about to expire"""
+        if not self._due(await asyncio.to_thread(self.channel, calendar_id)):
+            return
+        try:
+            async with get_lease_manager().hold(f"push_channel:{calendar_id}") as lease:
+                old = await asyncio.to_thread(self.channel, calendar_id)  # Another worker may have renewed it meanwhile
+                if not self._due(old):
+                    return
+                channel_id = uuid.uuid4().hex
+                response = await get_async_client().watch_events(calendar_id, {
+                    "id": channel_id,
+                    "type": "web_hook",
+                    "address": self.address,
+                    "token": channel_token(channel_id, calendar_id),
+                    "params": {"ttl": str(self.ttl_seconds)}
+                })
+                expiration = int(response.get("expiration", 0)) / 1000 or time.time() + self.ttl_seconds
+                try:
+                    await lease.ensure_valid()
+                except LeaseLost:
+                    # Not recorded, so its notifications would be refused until it expires
+                    await self._stop_channel(channel_id, response.get("resourceId"))
+                    raise
+                await asyncio.to_thread(self.store.set_channel, calendar_id, {
+                    "id": channel_id, "resource_id": response.get("resourceId"), "expiration": expiration})
+                self.renewals += 1
+        except LeaseUnavailable:
+            return  # Another worker is renewing it
+        if old is not None:
+            await self._stop_channel(old["id"], old["resource_id"])  # It would keep notifying until it expires
+
+    async def _stop_channel(self, channel_id: str, resource_id: str):
+        try:
+            await get_async_client().stop_channel(channel_id, resource_id)
+        except Exception as e:
+            print(f"Failed to stop push channel {channel_id}: {str(e)}")
+
+    def notified(self, calendar_id: str, message_number: str):
+        """Record a verified notification for every worker, and act on it here"""
+        self.notifications += 1
+        marker = f"{message_number}:{uuid.uuid4().hex}"  # Message numbers restart with each channel
+        self.store.mark_changed(calendar_id, marker)
+        self.apply(calendar_id)
+
+    def apply(self, calendar_id: str):
+        """Sync the calendar if a notification arrived since the last one acted on in this process"""
+        state = self._get_registry().peek(calendar_id)
+        if state is None:
+            return
+        marker = self.store.changed(calendar_id)
+        if marker is None or marker == state.push_seen:
+            return
+        state.push_seen = marker
+        if state.mirror is not None:
+            state.mirror.request_sync()  # Its on_change drops caches once the changes are in
+        else:
+            state.changed_upstream()
+
+    async def check(self):
+        """One pass: act on new notifications and keep every calendar's channel open"""
+        calendar_ids = self._get_registry().calendar_ids()
+        if self._get_configured is not None:
+            calendar_ids += await asyncio.to_thread(self._get_configured)
+        for calendar_id in dict.fromkeys(calendar_ids):
+            await asyncio.to_thread(self.apply, calendar_id)
+            try:
+                await self.ensure_channel(calendar_id)
+            except Exception as e:
+                print(f"Failed to open push channel for {calendar_id}: {str(e)}")
+
+    async def _run(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(PUSH_CHECK_INTERVAL_SECONDS)
+
+    def start(self) -> bool:
+        """Start the check loop on the running event loop
+
+        Refuses (and says why) without a webhook address for Google or a
+        shared token secret, which every worker must verify tokens with.
+        """
+        missing = [name for name, value in (("PUSH_WEBHOOK_URL", self.address),
+                                            ("PUSH_CHANNEL_SECRET", PUSH_CHANNEL_SECRET)) if not value]
+        if missing:
+            print(f"Push notifications not started: {', '.join(missing)} not set")
+            return False
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return True
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        return {"notifications": self.notifications, "renewals": self.renewals}
@@ -0,0 +1,173 @@
+import asyncio
+import functools
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from config import (
+    RATE_LIMIT, OUTBOUND_REQUESTS_PER_MINUTE, OUTBOUND_BURST, OUTBOUND_INTERACTIVE_RESERVE
+)
+
+class TokenBucket:
+    """Up to capacity tokens, refilled continuously at rate tokens per second"""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        if now > self.updated:  # A bucket created after now was read is already full
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def seconds_until(self, tokens: float) -> float:
+        """Seconds until the bucket holds at least tokens (0 if it already does)"""
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+# Inbound admission control
+
+class ClientRateLimiter:
+    """Per-client token buckets for requests per minute and per hour
+
+    A request is admitted only if both of the client's buckets have a
+    token. Buckets start full, so a client can burst up to its per-minute
+    allowance and then proceeds at the sustained rate.
+    """
+
+    def __init__(self, per_minute: int = RATE_LIMIT["requests_per_minute"],
+                 per_hour: int = RATE_LIMIT["requests_per_hour"],
+                 max_clients: int = RATE_LIMIT["max_clients"]):
+        self.per_minute = per_minute
+        self.per_hour = per_hour
+        self.max_clients = max(1, max_clients)
+        self._lock = threading.Lock()
+        self._clients = OrderedDict()  # {client: (minute bucket, hour bucket)}, least recently seen first
+        self.rejected = 0
+
+    def admit(self, client: str) -> float:
+        """0 if the request may proceed, else seconds until the client may retry"""
+        now = time.monotonic()
+        with self._lock:
+            buckets = self._clients.get(client)
+            if buckets is None:
+                buckets = (TokenBucket(self.per_minute, self.per_minute / 60),
+                           TokenBucket(self.per_hour, self.per_hour / 3600))
+                self._clients[client] = buckets
+                if len(self._clients) > self.max_clients:
+                    self._clients.popitem(last=False)
+            else:
+                self._clients.move_to_end(client)
+            for bucket in buckets:
+                bucket.refill(now)
+            retry_after = max(bucket.seconds_until(1) for bucket in buckets)
+            if retry_after > 0:
+                self.rejected += 1
+                return retry_after
+            for bucket in buckets:
+                bucket.tokens -= 1
+            return 0.0
+
+def client_address(peer: str, forwarded_for: str = None) -> str:
+    """The address a request is counted against
+
+    Behind RATE_LIMIT["trusted_proxies"] reverse proxies every request comes
+    from a proxy, so the client is the X-Forwarded-For entry appended by the
+    outermost trusted one. Entries to its left are client-supplied and ignored.
+    """
+    trusted = RATE_LIMIT["trusted_proxies"]
+    hops = [hop.strip() for hop in (forwarded_for or "").split(",") if hop.strip()]
+    if trusted <= 0 or not hops:
+        return peer
+    return hops[-min(trusted, len(hops))]
+
+# Outbound throttle in front of the Calendar API
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+# Priority of the Calendar calls made by the current request/task (copied into worker threads)
+_priority = ContextVar("outbound_priority", default=PRIORITY_BULK)
+
+def interactive(endpoint):
+    """Run an async endpoint's Calendar calls at interactive priority"""
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        token = _priority.set(PRIORITY_INTERACTIVE)
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            _priority.reset(token)
+    return wrapper
+
+class OutboundThrottle:
+    """Token bucket sized to the project's Calendar API quota, with two priorities
+
+    Bulk calls (listings, mirror syncs, batch jobs, auto-reschedule) may not
+    take the last `reserve` tokens of the burst; they wait until the bucket
+    refills above it. Interactive calls (pause/resume) may use the whole
+    bucket, and when it is empty they book the next refill slot, so they
+    queue ahead of every bulk caller.
+    """
+
+    def __init__(self, per_minute: int = OUTBOUND_REQUESTS_PER_MINUTE, burst: int = OUTBOUND_BURST,
+                 reserve: int = OUTBOUND_INTERACTIVE_RESERVE):
+        self.bucket = TokenBucket(max(1, burst), per_minute / 60)
+        self.reserve = min(reserve, max(0, burst - 1))
+        self._lock = threading.Lock()
+        self.waits = {PRIORITY_INTERACTIVE: 0, PRIORITY_BULK: 0}
+
+    def _take(self, priority: int):
+        """(taken, seconds to wait): a taken token may still be a booked future slot"""
+        with self._lock:
+            self.bucket.refill(time.monotonic())
+            if priority == PRIORITY_INTERACTIVE:
+                self.bucket.tokens -= 1
+                return True, self.bucket.seconds_until(0)
+            if self.bucket.tokens >= self.reserve + 1:
+                self.bucket.tokens -= 1
+                return True, 0.0
+            return False, self.bucket.seconds_until(self.reserve + 1)
+
+    def acquire(self, count: int = 1, priority: int = None):
+        """Block until count calls may be sent (priority defaults to the caller's context)"""
+        priority = _priority.get() if priority is None else priority
+        for _ in range(count):
+            while True:
+                taken, wait = self._take(priority)
+                if wait > 0:
+                    self.waits[priority] += 1
+                    time.sleep(wait)
+                if taken:
+                    break
+
+    async def acquire_async(self, count: int = 1, priority: int = None):
+        """acquire() for the event loop"""
+        priority = _priority.get() if priority is None else priority
+        for _ in range(count):
+            while True:
+                taken, wait = self._take(priority)
+                if wait > 0:
+                    self.waits[priority] += 1
+                    await asyncio.sleep(wait)
+                if taken:
+                    break
+
+    def stats(self):
+        with self._lock:
+            return {
+                "tokens": round(self.bucket.tokens, 2),
+                "interactive_waits": self.waits[PRIORITY_INTERACTIVE],
+                "bulk_waits": self.waits[PRIORITY_BULK]
+            }
+
+# Shared limiters; inbound_limiter is None when RATE_LIMIT is disabled
+inbound_limiter = ClientRateLimiter() if RATE_LIMIT["enabled"] else None
+outbound_throttle = OutboundThrottle()
+
+def get_inbound_limiter():
+    return inbound_limiter
+
+def get_outbound_throttle() -> OutboundThrottle:
+    return outbound_throttle
@@ -0,0 +1,255 @@
+import calendar
+import re
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from event_mirror import event_bounds
+
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+SUPPORTED_PARTS = {"FREQ", "INTERVAL", "COUNT", "UNTIL", "BYDAY", "WKST"}
+BYDAY_PATTERN = re.compile(r"^([+-]?\d{1,2})?(MO|TU|WE|TH|FR|SA|SU)$")
+# A rule that yields nothing for this many periods in a row never will (e.g. DAILY;BYDAY=)
+MAX_EMPTY_PERIODS = 2000
+
+class RecurrenceError(ValueError):
+    """Malformed RRULE / EXDATE line"""
+
+class UnsupportedRecurrence(RecurrenceError):
+    """Valid recurrence that uses parts this expander does not implement"""
+
+def parse_ical_datetime(value: str, tz=None):
+    """Parse 20250105T090000Z, 20250105T090000 (floating, read in tz) or 20250105 (a date)"""
+    try:
+        if len(value) == 8:
+            return datetime.strptime(value, "%Y%m%d").date()
+        if value.endswith("Z"):
+            return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+        moment = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    except ValueError:
+        raise RecurrenceError(f"Invalid date-time: {value}")
+    return moment.replace(tzinfo=tz) if tz is not None else moment
+
+class RecurrenceRule:
+    """One parsed RRULE"""
+
+    def __init__(self, line: str):
+        body = line[len("RRULE:"):] if line.upper().startswith("RRULE:") else line
+        parts = {}
+        for part in body.split(";"):
+            name, sep, value = part.partition("=")
+            if not sep or not value:
+                raise RecurrenceError(f"Invalid RRULE part: {part!r}")
+            parts[name.upper()] = value.upper()
+        unsupported = set(parts) - SUPPORTED_PARTS
+        if unsupported:
+            raise UnsupportedRecurrence(f"Unsupported RRULE parts: {', '.join(sorted(unsupported))}")
+
+        self.freq = parts.get("FREQ")
+        if self.freq not in FREQUENCIES:
+            raise UnsupportedRecurrence(f"Unsupported FREQ: {self.freq}")
+        try:
+            self.interval = int(parts.get("INTERVAL", "1"))
+            self.count = int(parts["COUNT"]) if "COUNT" in parts else None
+        except ValueError:
+            raise RecurrenceError(f"Invalid INTERVAL/COUNT in {line!r}")
+        if self.interval < 1 or (self.count is not None and self.count < 1):
+            raise RecurrenceError(f"INTERVAL and COUNT must be positive in {line!r}")
+        if self.count is not None and "UNTIL" in parts:
+            raise RecurrenceError("COUNT and UNTIL cannot both be set")
+        self.until = parse_ical_datetime(parts["UNTIL"]) if "UNTIL" in parts else None
+        if parts.get("WKST", "MO") not in WEEKDAYS:
+            raise RecurrenceError(f"Invalid WKST value: {parts['WKST']}")
+        self.week_start = WEEKDAYS[parts.get("WKST", "MO")]  # Only changes which days share a WEEKLY period
+
+        self.byday = []  # [(ordinal or None, weekday)]
+        for item in filter(None, parts.get("BYDAY", "").split(",")):
+            match = BYDAY_PATTERN.match(item)
+            if not match:
+                raise RecurrenceError(f"Invalid BYDAY value: {item}")
+            ordinal = int(match.group(1)) if match.group(1) else None
+            if ordinal is not None and (ordinal == 0 or self.freq not in ("MONTHLY", "YEARLY")):
+                raise RecurrenceError(f"BYDAY ordinal {item} needs FREQ=MONTHLY or YEARLY")
+            self.byday.append((ordinal, WEEKDAYS[match.group(2)]))
+
+    @property
+    def bounded(self):
+        return self.count is not None or self.until is not None
+
+    def week_of(self, day: date) -> date:
+        """First day (WKST) of the week containing day"""
+        return day - timedelta(days=(day.weekday() - self.week_start) % 7)
+
+    def period_index(self, start: datetime, moment: datetime) -> int:
+        """Index of the period containing moment (0 is the one containing start)"""
+        if self.freq == "DAILY":
+            span = (moment.date() - start.date()).days
+        elif self.freq == "WEEKLY":
+            span = (self.week_of(moment.date()) - self.week_of(start.date())).days // 7
+        elif self.freq == "MONTHLY":
+            span = (moment.year - start.year) * 12 + moment.month - start.month
+        else:
+            span = moment.year - start.year
+        return span // self.interval
+
+    def candidates(self, start: datetime, index: int):
+        """Sorted naive local occurrence starts in period `index`"""
+        at_time = lambda day: datetime.combine(day, start.time())
+        if self.freq == "DAILY":
+            day = start.date() + timedelta(days=index * self.interval)
+            if self.byday and day.weekday() not in {weekday for _, weekday in self.byday}:
+                return []
+            return [at_time(day)]
+        if self.freq == "WEEKLY":
+            week = self.week_of(start.date()) + timedelta(weeks=index * self.interval)
+            offsets = sorted({(weekday - self.week_start) % 7 for weekday in
+                              ({weekday for _, weekday in self.byday} or {start.weekday()})})
+            return [at_time(week + timedelta(days=offset)) for offset in offsets]
+        if self.freq == "MONTHLY":
+            year, month = divmod(start.month - 1 + index * self.interval, 12)
+            year, month = start.year + year, month + 1
+            days = calendar.monthrange(year, month)[1]
+            if not self.byday:
+                return [at_time(date(year, month, start.day))] if start.day <= days else []
+            first, last = date(year, month, 1), date(year, month, days)
+        else:
+            year = start.year + index * self.interval
+            if not self.byday:
+                if start.month == 2 and start.day == 29 and not calendar.isleap(year):
+                    return []
+                return [at_time(date(year, start.month, start.day))]
+            first, last = date(year, 1, 1), date(year, 12, 31)
+        return [at_time(day) for day in sorted(set(_weekdays_in(first, last, self.byday)))]
+
+def _weekdays_in(first: date, last: date, byday):
+    """Days in [first, last] matching BYDAY entries like MO, 2TU, -1FR"""
+    for ordinal, weekday in byday:
+        first_match = first + timedelta(days=(weekday - first.weekday()) % 7)
+        matches = (last - first_match).days // 7 + 1
+        if ordinal is None:
+            for n in range(matches):
+                yield first_match + timedelta(weeks=n)
+        elif -matches <= ordinal <= matches:
+            yield first_match + timedelta(weeks=ordinal - 1 if ordinal > 0 else matches + ordinal)
+
+class Recurrence:
+    """An event's recurrence lines (RRULE + EXDATE) anchored at its start
+
+    start may be naive or aware. Occurrences step in local wall time of
+    start's timezone, so a 09:00 series stays at 09:00 across DST changes.
+    """
+
+    def __init__(self, start: datetime, lines: list):
+        self.start = start
+        self.tz = start.tzinfo
+        self.rules = []
+        self.excluded_instants = set()
+        self.excluded_dates = set()
+        for line in lines or []:
+            name, _, value = line.partition(":")
+            params = name.split(";")
+            kind = params[0].upper()
+            if kind == "RRULE":
+                self.rules.append(RecurrenceRule(line))
+            elif kind == "EXDATE":
+                self._add_exdates(params[1:], value)
+            else:
+                raise UnsupportedRecurrence(f"Unsupported recurrence line: {kind}")
+        if len(self.rules) != 1:
+            raise UnsupportedRecurrence("Exactly one RRULE is supported")
+        self.rule = self.rules[0]
+
+    def _add_exdates(self, params, value):
+        tz = self.tz
+        for param in params:
+            if param.upper().startswith("TZID="):
+                try:
+                    tz = ZoneInfo(param[len("TZID="):])
+                except (ZoneInfoNotFoundError, ValueError):
+                    raise RecurrenceError(f"Unknown EXDATE timezone: {param}")
+        for item in filter(None, value.split(",")):
+            excluded = parse_ical_datetime(item.strip(), tz)
+            if isinstance(excluded, datetime):
+                self.excluded_instants.add(self._key(excluded))
+            else:
+                self.excluded_dates.add(excluded)
+
+    def _key(self, moment: datetime):
+        # Aware instants compare by timestamp; floating ones by wall time
+        if moment.tzinfo is not None and self.tz is not None:
+            return moment.timestamp()
+        return moment.replace(tzinfo=None)
+
+    def _localize(self, naive: datetime):
+        return naive.replace(tzinfo=self.tz) if self.tz is not None else naive
+
+    def _past_until(self, occurrence: datetime):
+        until = self.rule.until
+        if until is None:
+            return False
+        if not isinstance(until, datetime):
+            return occurrence.date() > until
+        if occurrence.tzinfo is None or until.tzinfo is None:
+            return occurrence.replace(tzinfo=None) > until.replace(tzinfo=None)
+        return occurrence > until
+
+    def occurrences(self, window_start: datetime = None, window_end: datetime = None):
+        """Lazily yield occurrence starts, in order, within [window_start, window_end)
+
+        Without COUNT the expansion starts near window_start instead of at
+        the first occurrence, so far-future windows stay cheap.
+        """
+        rule, start = self.rule, self.start.replace(tzinfo=None)
+        index = 0
+        if rule.count is None and window_start is not None and window_start > self.start:
+            local_window = window_start.astimezone(self.tz) if self.tz is not None else window_start
+            index = max(0, rule.period_index(start, local_window.replace(tzinfo=None)) - 1)
+
+        generated = 0
+        empty_periods = 0
+        while empty_periods < MAX_EMPTY_PERIODS:
+            candidates = [naive for naive in rule.candidates(start, index) if naive >= start]
+            index += 1
+            empty_periods = 0 if candidates else empty_periods + 1
+            for naive in candidates:
+                occurrence = self._localize(naive)
+                if self._past_until(occurrence) or (window_end is not None and occurrence >= window_end):
+                    return
+                generated += 1
+                if rule.count is not None and generated > rule.count:
+                    return
+                if self._key(occurrence) in self.excluded_instants or naive.date() in self.excluded_dates:
+                    continue
+                if window_start is None or occurrence >= window_start:
+                    yield occurrence
+
+    def count(self, limit: int):
+        """Number of occurrences, counting at most limit + 1 (an open-ended series returns limit + 1)"""
+        total = 0
+        for _ in self.occurrences():
+            total += 1
+            if total > limit:
+                break
+        return total
+
+def event_occurrences(event: dict, window_start: datetime, window_end: datetime):
+    """(start, end) of each instance of a Calendar event overlapping [window_start, window_end)
+
+    Recurring events are expanded locally from their RRULE/EXDATE lines,
+    in the event's own timeZone. Raises RecurrenceError for recurrences
+    this module cannot expand.
+    """
+    start, end = event_bounds(event)
+    if not event.get("recurrence"):
+        return [(start, end)] if start < window_end and end > window_start else []
+    time_zone = event["start"].get("timeZone")
+    if time_zone:
+        try:
+            start = start.astimezone(ZoneInfo(time_zone))
+        except (ZoneInfoNotFoundError, ValueError):
+            pass  # e.g. "UTC+5:30" - the fixed offset in dateTime already applies
+    duration = end - start
+    return [
+        (occurrence, occurrence + duration)
+        for occurrence in Recurrence(start, event["recurrence"]).occurrences(window_start - duration, window_end)
+        if occurrence + duration > window_start
+    ]
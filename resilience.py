@@ -0,0 +1,194 @@
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from config import (
+    CALENDAR_MAX_RETRIES, CALENDAR_RETRY_BASE_SECONDS, CALENDAR_RETRY_MAX_SECONDS,
+    CALENDAR_ATTEMPT_TIMEOUT_SECONDS, CALENDAR_CALL_DEADLINE_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS
+)
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Google reports per-user and per-project quota exhaustion as 403 with these reasons
+RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded", "Rate Limit Exceeded")
+
+class CircuitOpen(Exception):
+    """Calls fail fast because recent Calendar API calls kept failing"""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"Calendar API unavailable (circuit open), retry in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+def error_status(error):
+    """HTTP status of a CalendarHTTPError or googleapiclient HttpError, else None"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "resp", None), "status", None)
+    return int(status) if status is not None else None
+
+def retry_after_seconds(error):
+    """Seconds from the error's Retry-After header (delta or HTTP date), else None"""
+    value = getattr(error, "retry_after", None)
+    if value is None:
+        resp = getattr(error, "resp", None)
+        value = resp.get("retry-after") if hasattr(resp, "get") else None
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def is_retryable(error) -> bool:
+    """429/5xx, quota 403s, timeouts and connection failures"""
+    status = error_status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUSES or (status == 403 and any(r in str(error) for r in RATE_LIMIT_REASONS))
+    import httpx
+    import httplib2
+    return isinstance(error, (OSError, asyncio.TimeoutError, httpx.TransportError, httplib2.HttpLib2Error))
+
+def backoff_delay(retry: int, error=None) -> float:
+    """Seconds before retry number `retry` (0-based): Retry-After, else full jitter"""
+    retry_after = retry_after_seconds(error) if error is not None else None
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(CALENDAR_RETRY_MAX_SECONDS, CALENDAR_RETRY_BASE_SECONDS * 2 ** retry))
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker
+
+    After failure_threshold retryable failures in a row the circuit opens
+    and every call fails at once with CircuitOpen. After reset_seconds one
+    probe call is let through (half-open). If it succeeds the circuit
+    closes; if it fails the circuit opens again.
+    """
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half_open"
+            return "open"
+
+    def before_call(self):
+        """Raise CircuitOpen unless a call may go upstream now"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            waited = time.monotonic() - self._opened_at
+            if waited < self.reset_seconds or self._probing:
+                self.rejected += 1
+                raise CircuitOpen(max(0.0, self.reset_seconds - waited))
+            self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def abandon(self):
+        """A call ended without an upstream verdict (e.g. cancelled); free the probe slot"""
+        with self._lock:
+            self._probing = False
+
+    def stats(self):
+        return {"state": self.state, "consecutive_failures": self._failures, "rejected": self.rejected}
+
+def call_with_retry(attempt, max_retries: int = CALENDAR_MAX_RETRIES,
+                    deadline_seconds: float = CALENDAR_CALL_DEADLINE_SECONDS):
+    """Run attempt() with backoff on retryable errors, behind the circuit breaker
+
+    No retry is started that would end past the deadline or after the
+    circuit opened, so the caller gets the last error instead of waiting.
+    """
+    breaker = get_circuit_breaker()
+    deadline = time.monotonic() + deadline_seconds
+    retry = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = attempt()
+        except Exception as error:
+            if not is_retryable(error):
+                breaker.record_success()  # Google answered; the request itself was bad
+                raise
+            breaker.record_failure()
+            delay = backoff_delay(retry, error)
+            if retry >= max_retries or breaker.state == "open" or time.monotonic() + delay >= deadline:
+                raise
+            time.sleep(delay)
+            retry += 1
+        except BaseException:
+            breaker.abandon()
+            raise
+        else:
+            breaker.record_success()
+            return result
+
+async def call_with_retry_async(attempt, max_retries: int = CALENDAR_MAX_RETRIES,
+                                deadline_seconds: float = CALENDAR_CALL_DEADLINE_SECONDS, before_attempt=None):
+    """call_with_retry() for coroutines; attempt(timeout) must bound its upstream call by timeout
+
+    before_attempt() is awaited first on every attempt (e.g. for an outbound
+    throttle token); timeout is then CALENDAR_ATTEMPT_TIMEOUT_SECONDS or what
+    is left of the deadline, whichever is sooner, so neither a hung upstream
+    nor a long local wait can hold the caller past the deadline.
+    """
+    breaker = get_circuit_breaker()
+    deadline = time.monotonic() + deadline_seconds
+    retry = 0
+    while True:
+        breaker.before_call()
+        try:
+            if before_attempt is not None:
+                await before_attempt()
+            timeout = min(CALENDAR_ATTEMPT_TIMEOUT_SECONDS, deadline - time.monotonic())
+            result = await attempt(max(timeout, 0.001))
+        except Exception as error:
+            if not is_retryable(error):
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            delay = backoff_delay(retry, error)
+            if retry >= max_retries or breaker.state == "open" or time.monotonic() + delay >= deadline:
+                raise
+            await asyncio.sleep(delay)
+            retry += 1
+        except BaseException:
+            breaker.abandon()
+            raise
+        else:
+            breaker.record_success()
+            return result
+
+# Shared breaker for every Calendar call in this process
+circuit_breaker = CircuitBreaker()
+
+def get_circuit_breaker() -> CircuitBreaker:
+    return circuit_breaker
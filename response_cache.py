@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+from config import CACHE_CONFIG
+
+MISS = object()
+
+class ResponseCache:
+    """Size-bounded LRU of endpoint responses with a TTL
+
+    Each entry belongs to one calendar (None for responses that are not
+    calendar-specific), so a write to a calendar drops exactly that
+    calendar's entries. An entry may also carry a version (e.g. the paused
+    store's meta.version): a lookup with a different version is a miss, which
+    catches writes made by other workers.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300, enabled: bool = True):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # {key: (value, calendar_id, version, expires_at)}, oldest first
+        self._keys_by_calendar = {}  # {calendar_id: {key}}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version=None):
+        """Cached value for key, or MISS"""
+        if not self.enabled:
+            return MISS
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[3] <= time.monotonic() or entry[2] != version:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return MISS
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, calendar_id=None, version=None, expires_in: float = None):
+        """Cache value for at most ttl_seconds (or expires_in, if sooner)"""
+        if not self.enabled:
+            return
+        ttl = self.ttl_seconds if expires_in is None else min(self.ttl_seconds, expires_in)
+        if ttl <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, calendar_id, version, time.monotonic() + ttl)
+            self._keys_by_calendar.setdefault(calendar_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, calendar_id=None):
+        """Drop every entry that belongs to calendar_id (None: the calendar-independent ones)"""
+        with self._lock:
+            for key in self._keys_by_calendar.pop(calendar_id, ()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_calendar.clear()
+
+    def _drop(self, key):
+        _, calendar_id, _, _ = self._entries.pop(key)
+        keys = self._keys_by_calendar.get(calendar_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_calendar[calendar_id]
+
+    def stats(self):
+        with self._lock:
+            return {"enabled": self.enabled, "entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+# Shared cache for the API's GET endpoints
+response_cache = ResponseCache(CACHE_CONFIG["max_entries"], CACHE_CONFIG["ttl_seconds"], CACHE_CONFIG["enabled"])
+
+def get_response_cache() -> ResponseCache:
+    return response_cache
@@ -0,0 +1,96 @@
+from bisect import bisect_right, insort
+from itertools import islice
+from datetime import datetime, timezone
+from config import COMPLETED_EVENT_PREFIX, SCHEDULE_INDEX_HORIZON_HOURS
+
+def is_pausable(event: dict) -> bool:
+    """Timed events that are not [COMPLETED] records (all-day events cannot be paused)"""
+    return 'dateTime' in event.get('start', {}) and not event.get('summary', '').startswith(COMPLETED_EVENT_PREFIX)
+
+def minute_of(moment: datetime) -> int:
+    """Minutes since the epoch; the bucket that contains moment"""
+    return int(moment.timestamp() // 60)
+
+class ScheduleIndex:
+    """Pausable events bucketed by minute for constant-time "what is on now"
+
+    Built from a mirror snapshot ([(start, end, event)] sorted by start).
+    Every minute of the window [minute of built_at, + horizon) maps to the
+    events whose span touches it, in start order, so a lookup only looks at
+    the few events in one bucket. The answer is then kept until the next
+    event start or end (the next boundary), when it can first change.
+
+    The owning EventMirror patches it (add / discard) on its own local
+    writes, and swaps in a new index after a sync or when a lookup falls
+    outside the window. Events before ordered[first] must all end before
+    the window (see window_start).
+    """
+
+    def __init__(self, ordered: list, built_at: datetime, first: int = 0,
+                 horizon_hours: int = SCHEDULE_INDEX_HORIZON_HOURS):
+        self.source = ordered
+        self.first_minute = minute_of(built_at)
+        self.stop_minute = self.first_minute + max(1, horizon_hours) * 60
+        self._buckets = {}  # {minute: [(start, end, event)]}
+        boundaries = set()
+        for item in islice(ordered, first, None):
+            start, end, event = item
+            if minute_of(start) >= self.stop_minute:
+                break
+            if end < start or not is_pausable(event):
+                continue
+            for minute in self._minutes(item):
+                self._buckets.setdefault(minute, []).append(item)
+            boundaries.update((start, end))
+        self._boundaries = sorted(boundaries)
+        self._answer = None  # (valid_from, valid_until, (start, end, event) or None)
+
+    def _minutes(self, item):
+        """The window's minutes that item's span touches"""
+        return range(max(minute_of(item[0]), self.first_minute), min(minute_of(item[1]), self.stop_minute - 1) + 1)
+
+    def add(self, item):
+        """Index one more (start, end, event), keeping each bucket in start order"""
+        start, end, event = item
+        if end < start or not is_pausable(event) or not self._minutes(item):
+            return
+        for minute in self._minutes(item):
+            bucket = list(self._buckets.get(minute, ()))  # New lists: a lookup may be walking the old one
+            insort(bucket, item, key=lambda entry: entry[0])
+            self._buckets[minute] = bucket
+        insort(self._boundaries, start)
+        insort(self._boundaries, end)
+        self._answer = None
+
+    def discard(self, item):
+        """Drop an indexed (start, end, event); its boundaries stay, costing at most an early recompute"""
+        for minute in self._minutes(item):
+            bucket = self._buckets.get(minute)
+            if bucket is not None:
+                self._buckets[minute] = [entry for entry in bucket if entry is not item]
+        self._answer = None
+
+    @staticmethod
+    def window_start(built_at: datetime) -> datetime:
+        """Start of the first bucket of an index built at built_at"""
+        return datetime.fromtimestamp(minute_of(built_at) * 60, timezone.utc)
+
+    def covers(self, moment: datetime) -> bool:
+        return self.first_minute <= minute_of(moment) < self.stop_minute
+
+    def next_boundary(self, moment: datetime) -> datetime:
+        """First event start or end after moment (the window's end if there is none)"""
+        index = bisect_right(self._boundaries, moment)
+        if index < len(self._boundaries):
+            return self._boundaries[index]
+        return datetime.fromtimestamp(self.stop_minute * 60, timezone.utc)
+
+    def ongoing(self, moment: datetime):
+        """First pausable event (by start) whose span contains moment, or None"""
+        answer = self._answer
+        if answer is not None and answer[0] <= moment < answer[1] and (answer[2] is None or moment <= answer[2][1]):
+            return answer[2][2] if answer[2] else None
+        found = next((item for item in self._buckets.get(minute_of(moment), ()) if item[0] <= moment <= item[1]), None)
+        self._answer = (moment, self.next_boundary(moment), found)
+        return found[2] if found else None
+
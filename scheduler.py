@@ -0,0 +1,137 @@
+import asyncio
+import heapq
+import time
+from datetime import datetime
+from config import SCHEDULER_RETRY_SECONDS, SCHEDULER_POLL_SECONDS
+
+class RescheduleScheduler:
+    """Wake up exactly when the next paused event expires
+
+    Deadlines live in a min-heap of (epoch_seconds, event_id). Cancelled or
+    moved deadlines are left in the heap and skipped when they surface
+    (lazy deletion); the authoritative deadline per event is kept in a dict.
+
+    on_due() is awaited whenever at least one deadline has passed. Events
+    that are still pending afterwards (the reschedule failed) are retried
+    SCHEDULER_RETRY_SECONDS later. is_pending() reads the store, so it runs
+    in a thread; schedule() and cancel() may be called from threads too
+    (store writes run there) and are handed over to the scheduler's loop.
+
+    The heap only learns deadlines set by this worker. shared_deadline()
+    returns the earliest deadline in the store every worker writes to; it
+    is read (in a thread) on every wake and at least every
+    SCHEDULER_POLL_SECONDS, so events paused by a worker that has since
+    been recycled still fall due here.
+    """
+
+    def __init__(self, on_due, is_pending, shared_deadline=None):
+        self._on_due = on_due
+        self._is_pending = is_pending
+        self._shared_deadline = shared_deadline
+        self._shared_retry_at = 0.0  # Shared deadlines still due after on_due() wait until then
+        self._heap = []
+        self._deadlines = {}  # {event_id: epoch_seconds}
+        self._wake = asyncio.Event()
+        self._task = None
+        self._loop = None
+
+    def _on_loop(self, function, *args):
+        """Run function on the scheduler's loop: now if called there (or not started), else soon"""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is not loop:
+                loop.call_soon_threadsafe(function, *args)
+                return
+        function(*args)
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def schedule(self, event_id: str, deadline: datetime):
+        """Set (or move) the expiry deadline of a paused event"""
+        self._on_loop(self._push, event_id, deadline.timestamp())
+
+    def _push(self, event_id: str, deadline: float):
+        self._deadlines[event_id] = deadline
+        heapq.heappush(self._heap, (deadline, event_id))
+        if self._heap[0][1] == event_id:
+            # New earliest deadline - re-arm the timer
+            self._wake.set()
+
+    def cancel(self, event_id: str):
+        """Forget an event's deadline (it was resumed or rescheduled)"""
+        self._on_loop(self._deadlines.pop, event_id, None)
+
+    def next_deadline(self):
+        """Epoch seconds of the earliest live deadline, or None"""
+        while self._heap:
+            deadline, event_id = self._heap[0]
+            if self._deadlines.get(event_id) == deadline:
+                return deadline
+            heapq.heappop(self._heap)
+        return None
+
+    def _pop_due(self, now: float):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, event_id = heapq.heappop(self._heap)
+            if self._deadlines.get(event_id) == deadline:
+                del self._deadlines[event_id]
+                due.append(event_id)
+        return due
+
+    async def _shared(self):
+        """Earliest deadline in the shared store (held back after a failed attempt), or None"""
+        if self._shared_deadline is None:
+            return None
+        deadline = await asyncio.to_thread(self._shared_deadline)
+        return None if deadline is None else max(deadline, self._shared_retry_at)
+
+    async def _run(self):
+        while True:
+            shared = await self._shared()
+            wakes = [d for d in (self.next_deadline(), shared) if d is not None]
+            if self._shared_deadline is not None:
+                wakes.append(time.time() + SCHEDULER_POLL_SECONDS)
+            timeout = max(0.0, min(wakes) - time.time()) if wakes else None
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+                continue  # Woken by a new earlier deadline - recompute
+            except asyncio.TimeoutError:
+                pass
+
+            now = time.time()
+            due = self._pop_due(now)
+            if not due and (shared is None or shared > now):
+                continue  # Only the poll interval passed
+            try:
+                await self._on_due()
+            except Exception as e:
+                print(f"Scheduled auto-reschedule failed: {str(e)}")
+            for event_id in due:
+                if await asyncio.to_thread(self._is_pending, event_id) and event_id not in self._deadlines:
+                    self._push(event_id, time.time() + SCHEDULER_RETRY_SECONDS)
+            shared = await self._shared()
+            if shared is not None and shared <= time.time():
+                self._shared_retry_at = time.time() + SCHEDULER_RETRY_SECONDS
+
+    def start(self):
+        """Start the scheduler task on the running event loop"""
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._task = self._loop.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the scheduler task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,35 @@
+import asyncio
+
+class SingleFlight:
+    """Coalesce identical concurrent async calls into one in-flight call
+
+    The first caller for a key starts the call. Callers arriving with the
+    same key before it finishes await the same task and get the same
+    result (or exception). Results are shared, so treat them as read-only.
+    """
+
+    def __init__(self):
+        self._in_flight = {}  # {key: asyncio.Task}
+        self.leaders = 0  # calls that went upstream
+        self.coalesced = 0  # callers that joined an in-flight call instead
+
+    async def do(self, key, call):
+        """Run call() once for all concurrent callers with the same key"""
+        task = self._in_flight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(call())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shield: one caller giving up must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def stats(self):
+        """Counters for the metrics endpoint"""
+        return {
+            "upstream_calls": self.leaders,
+            "coalesced_callers": self.coalesced,
+            "in_flight": len(self._in_flight)
+        }
@@ -0,0 +1,95 @@
+import numpy as np
+from datetime import datetime, timedelta, timezone
+
+def to_epoch_minutes(moment: datetime) -> int:
+    """Whole minutes since the epoch, rounded down"""
+    return int(moment.timestamp() // 60)
+
+def from_epoch_minutes(minutes: int, tz=timezone.utc) -> datetime:
+    """Aware datetime for epoch minutes"""
+    return datetime.fromtimestamp(int(minutes) * 60, tz)
+
+def busy_to_minute_arrays(busy_periods):
+    """Convert [(start, end)] datetimes into int64 epoch-minute start/end arrays
+
+    Starts round down and ends round up so a partially busy minute counts as busy.
+    """
+    if not busy_periods:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    starts = np.fromiter((start.timestamp() for start, _ in busy_periods), dtype=np.float64)
+    ends = np.fromiter((end.timestamp() for _, end in busy_periods), dtype=np.float64)
+    return np.floor(starts / 60).astype(np.int64), np.ceil(ends / 60).astype(np.int64)
+
+def merge_busy(starts: np.ndarray, ends: np.ndarray):
+    """Sweep-line merge of busy intervals into sorted, disjoint arrays"""
+    if starts.size == 0:
+        return starts, ends
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)
+    # A new merged interval begins wherever a start lies past everything before it
+    is_new = np.empty(starts.size, dtype=bool)
+    is_new[0] = True
+    is_new[1:] = starts[1:] > reach[:-1]
+    group_starts = np.flatnonzero(is_new)
+    group_ends = np.append(group_starts[1:], starts.size) - 1
+    return starts[group_starts], reach[group_ends]
+
+def free_gaps(starts: np.ndarray, ends: np.ndarray, horizon_start: int, horizon_end: int):
+    """Free [gap_start, gap_end) arrays inside the horizon, given merged busy arrays"""
+    gap_starts = np.concatenate(([horizon_start], ends))
+    gap_ends = np.concatenate((starts, [horizon_end]))
+    gap_starts = np.clip(gap_starts, horizon_start, horizon_end)
+    gap_ends = np.clip(gap_ends, horizon_start, horizon_end)
+    keep = gap_ends > gap_starts
+    return gap_starts[keep], gap_ends[keep]
+
+def earliest_slots(gap_starts: np.ndarray, gap_ends: np.ndarray, duration: int, top_k: int, step: int):
+    """Epoch-minute starts of the first top_k slots of `duration` minutes
+
+    Inside a gap, candidates start at the gap start and then every `step`
+    minutes on the step grid, as long as the slot still fits.
+    """
+    if gap_starts.size == 0 or top_k <= 0:
+        return np.empty(0, dtype=np.int64)
+    # First candidate per gap, then the step-aligned ones after it
+    aligned = -(-(gap_starts + 1) // step) * step
+    last_start = gap_ends - duration
+    fits = last_start >= gap_starts
+    extra = np.where(fits & (last_start >= aligned), (last_start - aligned) // step + 1, 0)
+    counts = np.where(fits, 1 + extra, 0)
+
+    # Only expand the gaps needed to reach top_k candidates
+    cumulative = np.cumsum(counts)
+    needed = int(np.searchsorted(cumulative, top_k)) + 1
+    counts, extra = counts[:needed], extra[:needed]
+    gap_starts, aligned = gap_starts[:needed], aligned[:needed]
+
+    firsts = gap_starts[counts > 0]
+    gap_index = np.repeat(np.arange(counts.size), extra)
+    offsets = np.arange(gap_index.size) - np.repeat(np.cumsum(extra) - extra, extra)
+    stepped = aligned[gap_index] + offsets * step
+    candidates = np.sort(np.concatenate((firsts, stepped)))
+    return candidates[:top_k]
+
+def suggest_slots(busy_periods, horizon_start: datetime, horizon_end: datetime,
+                  durations, top_k: int, step_minutes: int):
+    """Top-k earliest free slots for each duration within the horizon
+
+    busy_periods is a list of (start, end) datetimes. Returns
+    {duration_minutes: [(slot_start, slot_end)]} in the horizon's timezone.
+    """
+    tz = horizon_start.tzinfo or timezone.utc
+    starts, ends = merge_busy(*busy_to_minute_arrays(busy_periods))
+    gap_starts, gap_ends = free_gaps(
+        starts, ends, -(-int(horizon_start.timestamp()) // 60), to_epoch_minutes(horizon_end))
+
+    suggestions = {}
+    for duration in durations:
+        slots = earliest_slots(gap_starts, gap_ends, int(duration), top_k, step_minutes)
+        suggestions[duration] = [
+            (from_epoch_minutes(start, tz), from_epoch_minutes(start, tz) + timedelta(minutes=int(duration)))
+            for start in slots
+        ]
+    return suggestions
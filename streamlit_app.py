@@ -110,7 +110,8 @@ st.markdown("""
 import os
 from datetime import datetime, timedelta
 from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
+from calendar_client import build_calendar_service, authorized_http, build_resilient_request
+from config import FIELD_MASKS, MAX_EVENTS_PAGE_SIZE
 from typing import Optional, Dict
 
 # Global variables for Google Calendar
@@ -169,7 +170,8 @@ def get_service():
             st.info("For production: Add secrets to Streamlit Cloud")
             return None
             
-        service = build("calendar", "v3", credentials=creds)
+        # Timeouts, retries with backoff and the circuit breaker apply to every execute()
+        service = build_calendar_service(None, http=authorized_http(creds), requestBuilder=build_resilient_request)
         return service
     except Exception as e:
         st.error(f"Failed to connect to Google Calendar: {str(e)}")
@@ -194,7 +196,8 @@ def get_current_ongoing_event():
             timeMin=now,
             maxResults=10,
             singleEvents=True,
-            orderBy='startTime'
+            orderBy='startTime',
+            fields=FIELD_MASKS["ongoing_event"]
         ).execute()
         
         events = events_result.get('items', [])
@@ -228,7 +231,8 @@ def find_available_slot(start_time: datetime, duration: timedelta, service):
             timeMin=time_min,
             timeMax=time_max,
             singleEvents=True,
-            orderBy='startTime'
+            orderBy='startTime',
+            fields=FIELD_MASKS["available_slot"]
         ).execute()
         
         events = events_result.get('items', [])
@@ -481,13 +485,25 @@ def get_all_events():
         return {"error": "Failed to connect to Google Calendar"}
     
     try:
-        events_result = service.events().list(
-            calendarId=calendar_id,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
+        events = []
+        page_token = None
+        
+        # Follow nextPageToken so large calendars are not cut off at the first page
+        while True:
+            events_result = service.events().list(
+                calendarId=calendar_id,
+                singleEvents=True,
+                orderBy='startTime',
+                maxResults=MAX_EVENTS_PAGE_SIZE,
+                pageToken=page_token,
+                fields=FIELD_MASKS["events_page"]
+            ).execute()
+            
+            events.extend(events_result.get('items', []))
+            page_token = events_result.get('nextPageToken')
+            if not page_token:
+                break
         
-        events = events_result.get('items', [])
         event_list = []
         
         for event in events:
@@ -566,7 +582,8 @@ def delete_event_by_name(event_name: str):
         events_result = service.events().list(
             calendarId=calendar_id,
             singleEvents=True,
-            orderBy='startTime'
+            orderBy='startTime',
+            fields=FIELD_MASKS["events_by_name"]
         ).execute()
         
         events = events_result.get('items', [])
@@ -609,7 +626,7 @@ def configure_calendar(gmail: str):
         if not service:
             return {"error": "Failed to connect to Google Calendar"}
         
-        calendar = service.calendars().get(calendarId=gmail).execute()
+        calendar = service.calendars().get(calendarId=gmail, fields=FIELD_MASKS["calendar_info"]).execute()
         configured_calendar_id = gmail
         
         # Also update session state
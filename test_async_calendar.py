@@ -0,0 +1,143 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+import async_calendar
+import event_mirror
+import response_cache
+import utils
+
+def test_requests_are_authorized_and_ids_quoted(google):
+    client = async_calendar.get_async_client()
+    asyncio.run(client.get_calendar("team@example.com"))
+    request = google.requests[-1]
+    assert request.headers["Authorization"] == "Bearer test-token"
+    assert request.url.raw_path == b"/calendar/v3/calendars/team%40example.com"
+
+def test_error_responses_raise_calendar_http_error(google):
+    client = async_calendar.get_async_client()
+    with pytest.raises(async_calendar.CalendarHTTPError) as error:
+        asyncio.run(client.delete_event("team@example.com", "missing"))
+    assert error.value.status_code == 404
+    assert error.value.reason == "Not Found"
+
+def test_pause_and_resume_through_async_transport(google):
+    api = TestClient(app.app)
+    assert api.post("/configure-calendar", json={"gmail": "team@example.com"}).status_code == 200
+
+    now = datetime.now(timezone.utc)
+    created = api.post("/create-event", json={
+        "event_name": "Study Session",
+        "start_datetime": (now - timedelta(minutes=10)).isoformat(),
+        "end_datetime": (now + timedelta(minutes=50)).isoformat(),
+        "timezone": "UTC",
+    }).json()
+
+    paused = api.post("/pause-event", json={})
+    assert paused.status_code == 200
+    assert paused.json()["event_id"] == created["event_id"]
+    assert created["event_id"] not in google.events
+
+    resumed = api.post("/resume-event", json={})
+    assert resumed.status_code == 200
+    assert resumed.json()["event_name"] == "Study Session"
+    assert api.get("/paused-events").json()["paused_events"] == []
+
+def test_identical_concurrent_reads_share_one_request(google):
+    client = async_calendar.get_async_client()
+
+    async def list_concurrently():
+        calls = [client.list_events("team@example.com", singleEvents=True) for _ in range(5)]
+        calls.append(client.list_events("team@example.com", singleEvents=False))
+        return await asyncio.gather(*calls)
+
+    pages = asyncio.run(list_concurrently())
+    list_requests = [r for r in google.requests if r.url.path.endswith("/events")]
+    assert len(list_requests) == 2
+    assert all(page is pages[0] for page in pages[:5])
+    stats = client.reads.stats()
+    assert stats["coalesced_callers"] == 4
+    assert stats["in_flight"] == 0
+
+def test_calendars_are_isolated_by_header(google):
+    api = TestClient(app.app)
+    for gmail in ["one@example.com", "two@example.com"]:
+        assert api.post("/configure-calendar", json={"gmail": gmail}).status_code == 200
+
+    now = datetime.now(timezone.utc)
+    one = {"X-Calendar-Id": "one@example.com"}
+    api.post("/create-event", headers=one, json={
+        "event_name": "Standup",
+        "start_datetime": (now - timedelta(minutes=5)).isoformat(),
+        "end_datetime": (now + timedelta(minutes=25)).isoformat(),
+        "timezone": "UTC",
+    })
+    assert api.post("/pause-event", headers=one, json={}).status_code == 200
+
+    assert len(api.get("/paused-events", headers=one).json()["paused_events"]) == 1
+    assert api.get("/paused-events").json()["paused_events"] == []  # default: two@example.com
+    assert api.get("/paused-events", headers={"X-Calendar-Id": "other@example.com"}).status_code == 400
+
+def test_create_event_reports_and_rejects_conflicts(google, monkeypatch):
+    review = {"id": "r1", "summary": "Review", "status": "confirmed",
+              "start": {"dateTime": "2025-01-08T09:30:00+05:30"}, "end": {"dateTime": "2025-01-08T10:30:00+05:30"}}
+    synced = event_mirror.EventMirror("team@example.com")
+    monkeypatch.setattr(event_mirror, "iter_event_pages",
+                        lambda calendar_id, **params: iter([{"items": [review], "nextSyncToken": "t1"}]))
+    synced.sync()
+    api = TestClient(app.app)
+    assert api.post("/configure-calendar", json={"gmail": "team@example.com"}).status_code == 200
+    utils.calendar_registry.get("team@example.com").mirror = synced
+
+    standup = {
+        "event_name": "Standup",
+        "start_datetime": "2025-01-06T09:00:00",
+        "end_datetime": "2025-01-06T10:00:00",
+        "timezone": "Asia/Kolkata",
+        "recurrence": ["RRULE:FREQ=DAILY;COUNT=5"],
+        "reject_on_conflict": True,
+    }
+    rejected = api.post("/create-event", json=standup)
+    assert rejected.status_code == 409
+    [conflict] = rejected.json()["detail"]["conflicts"]
+    assert conflict["event_id"] == "r1"
+    assert conflict["occurrence_start"] == "2025-01-08T09:00:00+05:30"
+    assert google.events == {}
+
+    moved = dict(standup, start_datetime="2025-01-06T11:00:00", end_datetime="2025-01-06T11:30:00", recurrence=None)
+    created = api.post("/create-event", json=moved)
+    assert created.status_code == 200
+    assert created.json()["conflicts"] == []
+
+    # Events this service creates are in the index straight away
+    clash = api.post("/create-event", json={
+        "event_name": "1:1", "start_datetime": "2025-01-06T05:45:00Z", "end_datetime": "2025-01-06T06:15:00Z"})
+    assert [c["event_name"] for c in clash.json()["conflicts"]] == ["Standup"]
+
+def test_get_responses_are_cached_until_a_write(google, monkeypatch):
+    monkeypatch.setattr(response_cache, "response_cache", response_cache.ResponseCache(ttl_seconds=60))
+    api = TestClient(app.app)
+    assert api.post("/configure-calendar", json={"gmail": "team@example.com"}).status_code == 200
+    list_requests = lambda: [r for r in google.requests if r.method == "GET" and r.url.path.endswith("/events")]
+
+    now = datetime.now(timezone.utc)
+    assert api.get("/events").json()["total_events"] == 0
+    assert api.get("/events").json()["total_events"] == 0
+    assert len(list_requests()) == 1
+
+    api.post("/create-event", json={
+        "event_name": "Standup",
+        "start_datetime": (now - timedelta(minutes=5)).isoformat(),
+        "end_datetime": (now + timedelta(minutes=25)).isoformat(),
+        "timezone": "UTC",
+    })
+    assert api.get("/events").json()["total_events"] == 1
+    assert len(list_requests()) == 2
+
+    assert api.get("/paused-events").json()["paused_events"] == []
+    assert api.post("/pause-event", json={}).status_code == 200
+    assert len(api.get("/paused-events").json()["paused_events"]) == 1
+    assert api.get("/check-expired-events").json()["total_paused_events"] == 1
@@ -0,0 +1,83 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.parser import FeedParser
+
+import httplib2
+from fastapi.testclient import TestClient
+
+import app
+import utils
+from calendar_client import build_calendar_service
+
+class FakeBatchHttp:
+    """Answers Calendar batch requests; inserts of "Flaky" events land but report 503 once,
+    inserts of "Quota" events are refused once with a rate-limit 403"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = {}
+        self.refused = set()
+        self.batches = 0
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        parser = FeedParser()
+        parser.feed(f"content-type: {headers['content-type']}\r\n\r\n{body}")
+        parts = []
+        with self.lock:
+            self.batches += 1
+            for part in parser.close().get_payload():
+                event = json.loads(part.get_payload().replace("\r\n", "\n").split("\n\n", 1)[1])
+                if event["id"] in self.events:
+                    status, payload = "409 Conflict", {"error": {"code": 409, "message": "duplicate"}}
+                elif event["summary"].startswith("Quota") and event["id"] not in self.refused:
+                    self.refused.add(event["id"])
+                    status, payload = "403 Forbidden", {"error": {"code": 403, "message": "Rate Limit Exceeded"}}
+                elif event["summary"].startswith("Flaky"):
+                    self.events[event["id"]] = event
+                    status, payload = "503 Service Unavailable", {"error": {"code": 503, "message": "backend"}}
+                else:
+                    event["htmlLink"] = f"https://calendar/{event['id']}"
+                    self.events[event["id"]] = event
+                    status, payload = "200 OK", event
+                content_id = part["Content-ID"].replace("<", "<response-", 1)
+                parts.append(
+                    f"--batch\r\nContent-Type: application/http\r\nContent-ID: {content_id}\r\n\r\n"
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n\r\n{json.dumps(payload)}\r\n")
+        response = httplib2.Response({"status": "200", "content-type": "multipart/mixed; boundary=batch"})
+        return response, ("".join(parts) + "--batch--").encode()
+
+def test_batch_create_reports_each_item(monkeypatch, local_state):
+    fake = FakeBatchHttp()
+    service = build_calendar_service(None, http=fake)
+    monkeypatch.setattr(utils, "get_service", lambda: service)
+    monkeypatch.setattr(utils, "BATCH_REQUEST_SIZE", 3)
+    monkeypatch.setattr(utils, "BATCH_RETRY_BASE_SECONDS", 0)
+    utils.configure_calendar_id("team@example.com")
+
+    items = [{
+        "event_name": f"Import {n}",
+        "start_datetime": f"2025-03-{n + 1:02d}T09:00:00",
+        "end_datetime": f"2025-03-{n + 1:02d}T10:00:00",
+        "timezone": "Asia/Kolkata",
+    } for n in range(8)]
+    items[2]["timezone"] = "Mars/Olympus_Mons"
+    items[4]["utc_offset"] = "+5:30"
+    items[5]["event_name"] = "Flaky import"
+    items[7]["event_name"] = "Quota import"
+    pools = []
+    monkeypatch.setattr(utils, "ThreadPoolExecutor", lambda **kwargs: pools.append(kwargs) or ThreadPoolExecutor(**kwargs))
+    items[6]["end_datetime"] = items[6]["start_datetime"]
+
+    response = TestClient(app.app).post("/create-events/batch", json=items)
+    assert response.status_code == 200
+    results = response.json()["results"]
+
+    assert [r["status"] for r in results] == [
+        "created", "created", "invalid", "created", "created", "created", "invalid", "created"]
+    assert "Mars/Olympus_Mons" in results[2]["error"]
+    assert results[4]["timezone_used"] == "UTC+5:30"
+    assert len(fake.events) == 6  # the retried flaky insert did not duplicate
+    assert response.json()["created_count"] == 6
+    assert fake.batches == 3  # two batches of three, then one retry of the 503 and the quota 403
+    assert len(pools) == 1  # Retries reuse the call's thread pool
@@ -0,0 +1,79 @@
+import json
+import threading
+from email.parser import FeedParser
+from urllib.parse import unquote
+
+import httplib2
+
+import rate_limit
+import utils
+from calendar_client import build_calendar_service
+
+# Event IDs starting with these get this status: "throttled" and "ratelimited" only on their first attempt
+STATUSES = {
+    "gone": "404 Not Found",
+    "forbidden": "403 Forbidden",
+    "throttled": "429 Too Many Requests",
+    "broken": "500 Internal Server Error",
+    "ratelimited": "403 Rate Limit Exceeded",
+}
+
+class FakeBatchDeleteHttp:
+    """Answers Calendar batch deletes with a status picked by each event ID's prefix"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.batches = []  # [[event_id, ...] per batch call]
+        self.deleted = set()
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        parser = FeedParser()
+        parser.feed(f"content-type: {headers['content-type']}\r\n\r\n{body}")
+        parts, batch = [], []
+        with self.lock:
+            self.batches.append(batch)
+            for part in parser.close().get_payload():
+                request_line = part.get_payload().split("\r\n", 1)[0].split("\n", 1)[0]
+                event_id = unquote(request_line.split()[1].rsplit("/", 1)[1])
+                batch.append(event_id)
+                status = next((s for prefix, s in STATUSES.items() if event_id.startswith(prefix)), "204 No Content")
+                if event_id.startswith(("throttled", "ratelimited")) and sum(b.count(event_id) for b in self.batches) > 1:
+                    status = "204 No Content"
+                if status.startswith("204"):
+                    self.deleted.add(event_id)
+                    payload = ""
+                else:
+                    payload = json.dumps({"error": {"code": int(status[:3]), "message": status[4:]}})
+                content_id = part["Content-ID"].replace("<", "<response-", 1)
+                parts.append(
+                    f"--batch\r\nContent-Type: application/http\r\nContent-ID: {content_id}\r\n\r\n"
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n\r\n{payload}\r\n")
+        response = httplib2.Response({"status": "200", "content-type": "multipart/mixed; boundary=batch"})
+        return response, ("".join(parts) + "--batch--").encode()
+
+def test_batch_delete_reports_each_event_and_retries_only_transient_failures(monkeypatch):
+    fake = FakeBatchDeleteHttp()
+    service = build_calendar_service(None, http=fake)
+    monkeypatch.setattr(utils, "get_service", lambda: service)
+    monkeypatch.setattr(utils, "BATCH_MAX_RETRIES", 2)
+    monkeypatch.setattr(utils, "BATCH_RETRY_BASE_SECONDS", 0)
+    monkeypatch.setattr(rate_limit, "outbound_throttle", rate_limit.OutboundThrottle(burst=1000))  # Google is local
+
+    event_ids = [f"e{n}" for n in range(115)] + ["gone1", "forbidden1", "throttled1", "broken1", "ratelimited1"]
+    results = utils.batch_delete_events("team@example.com", event_ids)
+
+    assert [r["event_id"] for r in results] == event_ids
+    by_id = {r["event_id"]: r for r in results}
+    assert all(by_id[f"e{n}"]["status"] == "deleted" for n in range(115))
+    assert by_id["gone1"] == {"event_id": "gone1", "status": "already_deleted", "error": None}
+    assert by_id["throttled1"] == {"event_id": "throttled1", "status": "deleted", "error": None}
+    assert by_id["ratelimited1"] == {"event_id": "ratelimited1", "status": "deleted", "error": None}
+    assert by_id["forbidden1"]["status"] == "failed" and "403" in by_id["forbidden1"]["error"]
+    assert by_id["broken1"]["status"] == "failed" and "500" in by_id["broken1"]["error"]
+
+    # 120 deletes in batches of at most 50, then only the 429, 500 and quota 403 are resent
+    assert [len(batch) for batch in fake.batches] == [50, 50, 20, 3, 1]
+    assert sorted(fake.batches[3]) == ["broken1", "ratelimited1", "throttled1"]
+    assert fake.batches[4] == ["broken1"]
+    assert sum(batch.count("forbidden1") for batch in fake.batches) == 1
+    assert sum(batch.count("gone1") for batch in fake.batches) == 1
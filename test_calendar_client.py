@@ -0,0 +1,84 @@
+import threading
+from datetime import datetime, timedelta
+
+import calendar_client
+from config import TOKEN_REFRESH_MARGIN_SECONDS
+
+class FakeCredentials:
+    """Service account credentials as far as the client and refresher look at them"""
+
+    def __init__(self, expires_in: float = 3600, token: str = "test-token"):
+        self.token = token
+        self.expiry = datetime.utcnow() + timedelta(seconds=expires_in)  # Naive UTC, like google-auth
+
+def in_threads(function, count=8):
+    """function's result in each of `count` threads started together"""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def run(n):
+        barrier.wait()
+        results[n] = function()
+
+    threads = [threading.Thread(target=run, args=(n,)) for n in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_service_is_built_once_for_every_thread(monkeypatch):
+    builds = []
+
+    def build(credentials, **kwargs):
+        builds.append(credentials)
+        return object()
+
+    credentials = FakeCredentials()
+    monkeypatch.setattr(calendar_client, "_service", None)
+    monkeypatch.setattr(calendar_client, "get_credentials", lambda: credentials)
+    monkeypatch.setattr(calendar_client, "build_calendar_service", build)
+    services = in_threads(calendar_client.get_service)
+    assert builds == [credentials]
+    assert all(service is services[0] for service in services)
+    assert calendar_client.get_service() is services[0]
+
+def test_each_thread_gets_its_own_transport(monkeypatch):
+    monkeypatch.setattr(calendar_client, "_thread_local", threading.local())
+    monkeypatch.setattr(calendar_client, "get_credentials", lambda: FakeCredentials())
+    monkeypatch.setattr(calendar_client, "authorized_http", lambda credentials: object())
+
+    def twice():
+        first = calendar_client.get_thread_http()
+        assert calendar_client.get_thread_http() is first  # Reused within the thread
+        return first
+
+    transports = in_threads(twice, count=4)
+    assert len({id(http) for http in transports}) == 4
+
+def test_refresh_is_scheduled_ahead_of_the_margin():
+    wait = calendar_client._seconds_until_refresh(FakeCredentials(expires_in=TOKEN_REFRESH_MARGIN_SECONDS + 600))
+    assert 590 < wait <= 600
+    assert calendar_client._seconds_until_refresh(FakeCredentials(expires_in=TOKEN_REFRESH_MARGIN_SECONDS - 1)) == 0
+    assert calendar_client._seconds_until_refresh(FakeCredentials(token=None)) == 0
+
+def test_refresher_renews_a_token_inside_the_margin(monkeypatch):
+    credentials = FakeCredentials(expires_in=TOKEN_REFRESH_MARGIN_SECONDS - 1)
+    stop = threading.Event()
+    refreshed = []
+
+    def refresh():
+        refreshed.append(credentials.expiry)
+        credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+        stop.set()  # One refresh is enough here
+        return credentials.expiry
+
+    monkeypatch.setattr(calendar_client, "_credentials", credentials)
+    monkeypatch.setattr(calendar_client, "_refresher_stop", stop)
+    monkeypatch.setattr(calendar_client, "refresh_credentials", refresh)
+    thread = threading.Thread(target=calendar_client._token_refresher_loop, daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert len(refreshed) == 1
+    assert calendar_client._seconds_until_refresh(credentials) > 0
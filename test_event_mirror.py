@@ -0,0 +1,122 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import event_mirror
+from conftest import FakeCalendar, make_event
+from event_mirror import EventMirror
+
+def test_full_then_incremental_sync(monkeypatch):
+    fake = FakeCalendar(
+        pages=[
+            [make_event("a", "Standup", "2025-01-01T09:00:00Z", "2025-01-01T09:15:00Z")],
+            [make_event("b", "Review", "2025-01-01T10:00:00Z", "2025-01-01T11:00:00Z")],
+        ],
+        changes=[
+            make_event("a", "Standup", "2025-01-01T09:00:00Z", "2025-01-01T09:15:00Z", status="cancelled"),
+            make_event("c", "Lunch", "2025-01-01T12:00:00Z", "2025-01-01T13:00:00Z"),
+        ],
+    )
+    monkeypatch.setattr(event_mirror, "iter_event_pages", fake.iter_event_pages)
+
+    mirror = EventMirror("team@example.com")
+    mirror.sync()
+    assert [e["id"] for e in mirror.all_events()] == ["a", "b"]
+    assert mirror.is_fresh()
+
+    mirror.sync()
+    assert fake.calls[-1]["syncToken"] == "t1"
+    assert [e["id"] for e in mirror.all_events()] == ["b", "c"]
+
+def test_expired_sync_token_triggers_full_resync(monkeypatch):
+    fake = FakeCalendar(
+        pages=[[make_event("a", "Standup", "2025-01-01T09:00:00Z", "2025-01-01T09:15:00Z")]],
+        expired_tokens={"t1"},
+    )
+    monkeypatch.setattr(event_mirror, "iter_event_pages", fake.iter_event_pages)
+
+    mirror = EventMirror("team@example.com")
+    mirror.sync()
+    mirror.sync()
+    assert "syncToken" not in fake.calls[-1]
+    assert [e["id"] for e in mirror.all_events()] == ["a"]
+
+def test_window_queries_and_local_writes(monkeypatch):
+    fake = FakeCalendar(pages=[[
+        make_event("a", "Focus", "2025-01-01T09:00:00Z", "2025-01-01T12:00:00Z"),
+        make_event("b", "Sync", "2025-01-01T10:00:00Z", "2025-01-01T10:30:00Z"),
+        {"id": "d", "summary": "Holiday", "start": {"date": "2025-01-02"}, "end": {"date": "2025-01-03"}},
+    ]])
+    monkeypatch.setattr(event_mirror, "iter_event_pages", fake.iter_event_pages)
+
+    mirror = EventMirror("team@example.com")
+    mirror.sync()
+    moment = datetime(2025, 1, 1, 10, 15, tzinfo=timezone.utc)
+    assert mirror.ongoing_event(moment)["id"] == "a"
+    window = mirror.intervals_overlapping(datetime(2025, 1, 1, 11, tzinfo=timezone.utc),
+                                          datetime(2025, 1, 2, 1, tzinfo=timezone.utc))
+    assert [event["id"] for _, _, event in window] == ["a", "d"]
+
+    mirror.apply_event(make_event("n", "Sync", "2025-01-01T14:00:00Z", "2025-01-01T15:00:00Z"))
+    mirror.discard_event("b")
+    assert [e["id"] for e in mirror.events_named("Sync")] == ["n"]
+    assert [e["id"] for e in mirror.events_named("sync", match_case=False)] == ["n"]
+    assert mirror.events_named("sync") == []
+
+def test_name_index_follows_renames_and_cancellations(monkeypatch):
+    fake = FakeCalendar(
+        pages=[[make_event("a", "Standup", "2025-01-01T09:00:00Z", "2025-01-01T09:15:00Z"),
+                make_event("b", "Standup", "2025-01-02T09:00:00Z", "2025-01-02T09:15:00Z")]],
+        changes=[
+            make_event("a", "Retro", "2025-01-01T09:00:00Z", "2025-01-01T09:15:00Z"),
+            make_event("b", "Standup", "2025-01-02T09:00:00Z", "2025-01-02T09:15:00Z", status="cancelled"),
+        ],
+    )
+    monkeypatch.setattr(event_mirror, "iter_event_pages", fake.iter_event_pages)
+
+    mirror = EventMirror("team@example.com")
+    mirror.sync()
+    assert [e["id"] for e in mirror.events_named("STANDUP", match_case=False)] == ["a", "b"]
+    mirror.sync()
+    assert mirror.events_named("Standup") == []
+    assert [e["id"] for e in mirror.events_named("Retro")] == ["a"]
+
+def test_overlap_query_matches_a_full_scan(monkeypatch):
+    # One long event first, so the prefix-max ends (not the starts) bound the scan
+    events = [make_event("long", "Offsite", "2025-01-01T00:00:00Z", "2025-01-03T00:00:00Z")]
+    for hour in range(40):
+        events.append(make_event(f"e{hour}", "Slot", f"2025-01-01T{hour % 24:02d}:00:00Z",
+                                 f"2025-01-01T{hour % 24:02d}:{30 + hour % 30:02d}:00Z"))
+    monkeypatch.setattr(event_mirror, "iter_event_pages", FakeCalendar(pages=[events]).iter_event_pages)
+    mirror = EventMirror("team@example.com")
+    mirror.sync()
+
+    for start_minute in range(0, 26 * 60, 17):
+        time_min = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=start_minute)
+        time_max = time_min + timedelta(minutes=45)
+        expected = {e["id"] for e in events if event_mirror.event_bounds(e)[1] > time_min
+                    and event_mirror.event_bounds(e)[0] < time_max}
+        assert {e["id"] for _, _, e in mirror.intervals_overlapping(time_min, time_max)} == expected
+
+def test_local_writes_patch_the_snapshot_in_place_of_a_resort(monkeypatch):
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    event = lambda n, start, minutes: make_event(
+        f"e{n}", "Slot", (base + timedelta(minutes=start)).isoformat(),
+        (base + timedelta(minutes=start + minutes)).isoformat())
+    rng = random.Random(3)
+    events = [event(n, rng.randrange(0, 3000, 15), rng.choice([15, 60, 600])) for n in range(200)]
+    monkeypatch.setattr(event_mirror, "iter_event_pages", FakeCalendar(pages=[events]).iter_event_pages)
+    mirror = EventMirror("team@example.com")
+    mirror.sync()
+    mirror.all_events()
+
+    for step in range(300):
+        n = rng.randrange(260)
+        if rng.random() < 0.4:
+            mirror.discard_event(f"e{n}")
+        else:
+            mirror.apply_event(event(n, rng.randrange(0, 3000, 15), rng.choice([15, 60, 600])))
+    ordered, starts, max_ends = mirror._snapshot()
+    assert ordered is mirror._ordered  # Never dropped for a full rebuild
+    assert starts == [item[0] for item in ordered] == sorted(starts)
+    assert max_ends == [max(item[1] for item in ordered[:i + 1]) for i in range(len(ordered))]
+    assert sorted(e["id"] for _, _, e in ordered) == sorted(mirror._events)
@@ -0,0 +1,53 @@
+import json
+
+from fastapi.testclient import TestClient
+
+import app
+
+CALENDAR = "team@example.com"
+
+def seeded(google, count):
+    """A configured API client over a calendar of `count` hourly events, e0 first"""
+    for n in range(count):
+        google.events[f"e{n}"] = {"id": f"e{n}", "summary": f"Event {n}", "status": "confirmed",
+                                  "start": {"dateTime": f"2025-01-01T{n:02d}:00:00Z"},
+                                  "end": {"dateTime": f"2025-01-01T{n:02d}:30:00Z"}}
+    api = TestClient(app.app)
+    assert api.post("/configure-calendar", json={"gmail": CALENDAR}).status_code == 200
+    return api
+
+def test_limit_pages_continue_from_next_page_token(google):
+    api = seeded(google, 5)
+    seen, params = [], {"limit": 2}
+    while True:
+        page = api.get("/events", params=params).json()
+        assert page["total_events"] == len(page["events"]) <= 2
+        seen += [e["event_id"] for e in page["events"]]
+        if not page["next_page_token"]:
+            break
+        params = {"limit": 2, "page_token": page["next_page_token"]}
+    assert seen == [f"e{n}" for n in range(5)]
+    assert [r.url.params.get("pageToken") for r in google.requests if r.method == "GET"][-3:] == [None, "2", "4"]
+
+def test_page_token_alone_uses_the_default_page_size(google):
+    api = seeded(google, 3)
+    page = api.get("/events", params={"page_token": "1"}).json()
+    assert [e["event_id"] for e in page["events"]] == ["e1", "e2"]
+    assert page["next_page_token"] is None
+
+def test_stream_emits_one_line_per_event_across_pages(google):
+    api = seeded(google, 5)
+    response = api.get("/events", params={"stream": True, "limit": 2})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["event_id"] for line in lines] == [f"e{n}" for n in range(5)]
+    assert sum(r.url.path.endswith("/events") for r in google.requests) == 3
+
+def test_stream_reports_an_upstream_failure_in_band(google):
+    api = seeded(google, 5)
+    google.failing_pages["2"] = 400  # The second page fails after the first was sent
+    response = api.get("/events", params={"stream": True, "limit": 2})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line.get("event_id") for line in lines[:2]] == ["e0", "e1"]
+    assert len(lines) == 3 and "Listing failed" in lines[2]["error"]
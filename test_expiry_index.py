@@ -0,0 +1,61 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+import utils
+from expiry_index import ExpiryIndex
+
+NOW = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+
+def test_expired_matches_full_scan():
+    rng = random.Random(7)
+    index, deadlines = ExpiryIndex(), {}
+    for n in range(2000):
+        event_id = f"e{rng.randrange(1500)}"
+        if rng.random() < 0.2:
+            index.remove(event_id)
+            deadlines.pop(event_id, None)
+        else:
+            deadline = NOW + timedelta(minutes=rng.randint(-600, 600))
+            index.add(event_id, deadline)
+            deadlines[event_id] = deadline
+    expected = sorted((d, e) for e, d in deadlines.items() if d < NOW)
+    assert index.expired(NOW) == [e for _, e in expected]
+    assert len(index) == len(deadlines)
+
+def test_expired_events_info_uses_configured_thresholds(monkeypatch, local_state):
+    monkeypatch.setattr(utils, "AUTO_RESCHEDULE_AFTER_ORIGINAL_END_MINUTES", 5)
+    monkeypatch.setattr(utils, "AUTO_RESCHEDULE_AFTER_PAUSE_HOURS", 10)
+    now = datetime.now(timezone.utc)
+    for event_id, ended_minutes_ago in [("missed", 10), ("fresh", 1)]:
+        utils.add_paused_event("team@example.com", event_id, utils.PausedEvent.create(
+            event_id, now - timedelta(minutes=30), now - timedelta(minutes=ended_minutes_ago), timedelta(minutes=15)))
+    expired = utils.get_expired_events_info()
+    assert [e["event_id"] for e in expired] == ["missed"]
+    assert expired[0]["will_be_labeled"] == utils.MISSED_EVENT_PREFIX
+
+    utils.remove_paused_event("missed")
+    assert utils.get_expired_events_info() == []
+
+def test_expired_events_resumed_meanwhile_are_skipped(monkeypatch, local_state):
+    now = datetime.now(timezone.utc)
+    utils.add_paused_event("team@example.com", "resumed", utils.PausedEvent.create(
+        "Focus", now - timedelta(hours=5), now - timedelta(hours=4), timedelta(minutes=15)))
+    monkeypatch.setattr(local_state, "get", lambda event_id: None)  # Resumed between expired() and get()
+    assert utils.get_expired_events_info() == []
+
+def test_forced_reschedule_only_touches_the_callers_calendar(monkeypatch, local_state):
+    now = datetime.now(timezone.utc)
+    for calendar_id in ("one@example.com", "two@example.com"):
+        utils.add_paused_event(calendar_id, f"{calendar_id}-event", utils.PausedEvent.create(
+            "Focus", now - timedelta(hours=5), now - timedelta(hours=4), timedelta(minutes=15)))
+    rescheduled = []
+
+    async def reschedule(event_id, current_time, lease):
+        rescheduled.append(event_id)
+
+    monkeypatch.setattr(utils, "reschedule_paused_event", reschedule)
+    asyncio.run(utils.auto_reschedule_abandoned_events("one@example.com"))
+    assert rescheduled == ["one@example.com-event"]
+    asyncio.run(utils.auto_reschedule_abandoned_events())
+    assert sorted(rescheduled[1:]) == ["one@example.com-event", "two@example.com-event"]
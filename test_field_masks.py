@@ -0,0 +1,164 @@
+import asyncio
+import importlib
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+import async_calendar
+import config
+import event_mirror
+import utils
+from config import FIELD_MASKS
+
+class TrackingDict(dict):
+    """dict that records which keys were read"""
+
+    def __init__(self, data, reads):
+        super().__init__(data)
+        self.reads = reads
+
+    def __getitem__(self, key):
+        self.reads.add(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.reads.add(key)
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        self.reads.add(key)
+        return super().__contains__(key)
+
+def parse_mask(mask):
+    """(top-level fields, item fields) of a mask like nextPageToken,items(id,summary)"""
+    item_fields = set()
+    match = re.search(r"items\(([^)]*)\)", mask)
+    if match:
+        item_fields = set(match.group(1).split(","))
+        mask = mask.replace(match.group(0), "items")
+    return set(mask.split(",")), item_fields
+
+def full_event(event_id, summary, start, end):
+    """An expanded instance with every field Google sends when no mask is given"""
+    return {
+        "kind": "calendar#event", "etag": '"1"', "id": event_id, "status": "confirmed",
+        "htmlLink": "https://calendar/event", "created": "2025-01-01T00:00:00Z", "updated": "2025-01-01T00:00:00Z",
+        "summary": summary, "description": "notes", "location": "Room 1", "creator": {"email": "a@example.com"},
+        "organizer": {"email": "a@example.com"}, "start": {"dateTime": start, "timeZone": "UTC"},
+        "end": {"dateTime": end, "timeZone": "UTC"}, "transparency": "opaque", "iCalUID": f"{event_id}@google.com",
+        "sequence": 0, "attendees": [{"email": "b@example.com"}], "reminders": {"useDefault": True},
+        "eventType": "default",
+    }
+
+class TrackedCalendar:
+    """events().list pages of one event each, with top-level and per-event key reads recorded"""
+
+    PAGE_KEYS = {"kind", "summary", "timeZone", "updated", "nextPageToken", "nextSyncToken", "items"}
+
+    def __init__(self, events):
+        self.events = events
+        self.page_reads = set()
+        self.item_reads = set()
+        self.masks = []
+
+    def page(self, fields, page_token=None):
+        self.masks.append(fields)
+        index = int(page_token or 0)
+        page = {"kind": "calendar#events", "summary": "Team", "timeZone": "UTC", "updated": "2025-01-01T00:00:00Z",
+                "items": [TrackingDict(self.events[index], self.item_reads)]}
+        if index + 1 < len(self.events):
+            page["nextPageToken"] = str(index + 1)
+        else:
+            page["nextSyncToken"] = "t1"
+        return TrackingDict(page, self.page_reads)
+
+    def assert_reads_match(self, name):
+        """The call site asked for exactly what it read (of what Google would have sent)"""
+        assert self.masks and set(self.masks) == {FIELD_MASKS[name]}
+        page_fields, item_fields = parse_mask(FIELD_MASKS[name])
+        assert page_fields == self.page_reads & self.PAGE_KEYS
+        assert item_fields == self.item_reads & set(self.events[0])
+
+@pytest.fixture
+def tracked(google, monkeypatch):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    calendar = TrackedCalendar([
+        # Overlaps now but cannot be paused, so the pause lookup has to read on
+        full_event("e0", "[COMPLETED] Warm-up", (now - timedelta(minutes=30)).isoformat(), (now + timedelta(minutes=5)).isoformat()),
+        full_event("e1", "Study Session", (now - timedelta(minutes=10)).isoformat(), (now + timedelta(minutes=50)).isoformat()),
+        full_event("e2", "Study Session", (now + timedelta(hours=2)).isoformat(), (now + timedelta(hours=3)).isoformat()),
+    ])
+    client = async_calendar.get_async_client()
+    forward = client._read
+
+    async def read(method, path, params=None, body=None):
+        if method == "GET" and path.endswith("/events"):
+            return calendar.page(params.get("fields"), params.get("pageToken"))
+        return await forward(method, path, params=params, body=body)
+
+    monkeypatch.setattr(client, "_read", read)
+    api = TestClient(app.app)
+    assert api.post("/configure-calendar", json={"gmail": "team@example.com"}).status_code == 200
+    return api, calendar
+
+@pytest.mark.parametrize("query", [{}, {"limit": 5}, {"stream": True}])
+def test_event_listings_request_only_what_they_return(tracked, query):
+    api, calendar = tracked
+    assert api.get("/events", params=query).status_code == 200
+    calendar.assert_reads_match("events_page")
+
+def test_pause_requests_only_what_it_reads(tracked):
+    api, calendar = tracked
+    assert api.post("/pause-event", json={}).status_code == 200
+    calendar.assert_reads_match("ongoing_event")
+
+def test_search_and_delete_request_only_what_they_read(tracked):
+    api, calendar = tracked
+    assert api.get("/events/search", params={"event_name": "Study Session"}).status_code == 200
+    assert api.request("DELETE", "/delete-event", json={"event_name": "missing"}).status_code == 200
+    calendar.assert_reads_match("events_by_name")
+
+def test_configure_requests_only_the_calendar_name(google):
+    api = TestClient(app.app)
+    assert api.post("/configure-calendar", json={"gmail": "team@example.com"}).status_code == 200
+    assert google.requests[-1].url.params["fields"] == FIELD_MASKS["calendar_info"] == "summary"
+
+def test_mirror_sync_requests_only_what_mirrored_reads_use(monkeypatch):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    calendar = TrackedCalendar([
+        full_event("e1", "Standup", now.isoformat(), (now + timedelta(minutes=15)).isoformat()),
+    ])
+
+    def iter_event_pages(calendar_id, **params):
+        page = calendar.page(params["fields"])
+        yield page
+        assert not page.get("nextPageToken")  # What calendar_client's pager reads
+
+    monkeypatch.setattr(event_mirror, "iter_event_pages", iter_event_pages)
+    mirror = event_mirror.EventMirror("team@example.com")
+    mirror.sync()
+    mirror.sync()  # incremental
+
+    # Every mirrored read: listings, names, ongoing lookup and conflicts
+    [utils.format_event_info(e) for _, _, e in mirror.intervals_overlapping(now - timedelta(days=1), now + timedelta(days=1))]
+    mirror.events_named("Standup", match_case=False)
+    monkeypatch.setattr(utils, "get_event_mirror", lambda calendar_id: mirror)
+    body, _ = utils.build_event_body(
+        "Review", now.isoformat(), (now + timedelta(hours=1)).isoformat(), "UTC")
+    utils.find_conflicts("team@example.com", body)
+    asyncio.run(utils.get_current_ongoing_event("team@example.com"))
+    calendar.assert_reads_match("mirror_sync")
+
+def test_kept_originals_are_fetched_whole(monkeypatch):
+    # /pause-event archives the event it found, from the mirror or a live lookup
+    monkeypatch.setenv("PAUSED_KEEP_ORIGINAL_EVENT", "true")
+    try:
+        masks = importlib.reload(config).FIELD_MASKS
+    finally:
+        monkeypatch.delenv("PAUSED_KEEP_ORIGINAL_EVENT")
+        importlib.reload(config)
+    assert masks["ongoing_event"] == "nextPageToken,items"
+    assert masks["mirror_sync"] == "nextPageToken,nextSyncToken,items"
@@ -0,0 +1,45 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from interval_index import BusyIntervals
+
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+def at(minutes):
+    return BASE + timedelta(minutes=minutes)
+
+def linear_next_slot(intervals, start, duration):
+    """The original per-event walk, used as the reference answer"""
+    current = start
+    for busy_start, busy_end in sorted(intervals):
+        if current + duration <= busy_start:
+            return current
+        if busy_end > current:
+            current = busy_end
+    return current
+
+def test_intervals_are_merged():
+    busy = BusyIntervals([(at(0), at(30)), (at(20), at(60)), (at(60), at(90)), (at(120), at(150))])
+    assert list(busy) == [(at(0), at(90)), (at(120), at(150))]
+
+def test_next_free_slot_skips_short_gaps():
+    busy = BusyIntervals([(at(0), at(60)), (at(70), at(120)), (at(180), at(240))])
+    assert busy.next_free_slot(at(10), timedelta(minutes=30)) == (at(120), at(150))
+    assert busy.next_free_slot(at(60), timedelta(minutes=10)) == (at(60), at(70))
+    assert busy.next_free_slot(at(200), timedelta(minutes=90)) == (at(240), at(330))
+    assert busy.is_free(at(120), at(180))
+    assert not busy.is_free(at(110), at(130))
+
+def test_matches_linear_walk():
+    rng = random.Random(7)
+    for _ in range(500):
+        intervals = []
+        for _ in range(rng.randint(0, 20)):
+            begin = rng.randint(0, 600)
+            intervals.append((at(begin), at(begin + rng.randint(1, 90))))
+        busy = BusyIntervals(intervals)
+        start = at(rng.randint(-30, 650))
+        duration = timedelta(minutes=rng.randint(1, 120))
+        slot_start, slot_end = busy.next_free_slot(start, duration)
+        assert slot_start == linear_next_slot(intervals, start, duration)
+        assert slot_end - slot_start == duration
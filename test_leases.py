@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import pytest
+
+import leases
+
+class FakeRedis:
+    """Local stand-in for the Redis commands the lease backend uses"""
+
+    def __init__(self):
+        self.values = {}  # {key: (value, expires_at or None)}
+
+    def _get(self, key):
+        value, expires_at = self.values.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.values.pop(key, None)
+            return None
+        return value
+
+    def incr(self, key):
+        value = int(self._get(key) or 0) + 1
+        self.values[key] = (str(value), None)
+        return value
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and self._get(key) is not None:
+            return None
+        self.values[key] = (value, time.monotonic() + px / 1000 if px else None)
+        return True
+
+    def eval(self, script, numkeys, key, value):
+        matches = self._get(key) == value
+        if script == leases.RELEASE_SCRIPT:
+            if matches:
+                del self.values[key]
+            return int(matches)
+        if script == leases.CHECK_SCRIPT:
+            return int(matches)
+        raise AssertionError("unexpected script")
+
+@pytest.fixture(params=["sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return leases.SQLiteLeaseBackend(tmp_path / "leases.db")
+    return leases.RedisLeaseBackend(FakeRedis())
+
+def test_lease_is_exclusive_until_released(backend):
+    first = backend.acquire("event:a", "w1", 30)
+    assert first is not None
+    assert backend.acquire("event:a", "w2", 30) is None
+    assert backend.acquire("event:b", "w2", 30) is not None
+
+    backend.release("event:a", first, "w1")
+    assert backend.acquire("event:a", "w2", 30) > first
+
+def test_expired_lease_is_taken_over_with_a_larger_token(backend):
+    stale = backend.acquire("event:a", "w1", 0.05)
+    time.sleep(0.1)
+    fresh = backend.acquire("event:a", "w2", 30)
+    assert fresh > stale
+    assert not backend.is_current("event:a", stale, "w1")
+
+    # The stale holder's release must not drop the new lease
+    backend.release("event:a", stale, "w1")
+    assert backend.is_current("event:a", fresh, "w2")
+    assert backend.acquire("event:a", "w3", 30) is None
+
+def test_manager_holds_one_lease_per_block(backend):
+    first, second = leases.LeaseManager(backend, 30), leases.LeaseManager(backend, 30)
+
+    async def scenario():
+        async with first.hold("event:a") as lease:
+            await lease.ensure_valid()
+            with pytest.raises(leases.LeaseUnavailable):
+                async with second.hold("event:a"):
+                    pass
+        async with second.hold("event:a"):
+            pass
+
+    asyncio.run(scenario())
+
+def test_ensure_valid_fails_after_takeover(backend):
+    holder, other = leases.LeaseManager(backend, 0.05), leases.LeaseManager(backend, 30)
+
+    async def scenario():
+        async with holder.hold("event:a") as lease:
+            await asyncio.sleep(0.1)
+            async with other.hold("event:a"):
+                with pytest.raises(leases.LeaseLost):
+                    await lease.ensure_valid()
+
+    asyncio.run(scenario())
@@ -0,0 +1,111 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import paused_store
+from paused_store import PausedEvent, PausedEventStore
+
+NOW = datetime(2025, 1, 1, 12, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+
+def pause_info(name):
+    return PausedEvent.create(name, NOW, NOW + timedelta(minutes=20), timedelta(minutes=20),
+                              {"id": name, "summary": name})
+
+def test_state_survives_restart(tmp_path):
+    store = PausedEventStore(tmp_path / "paused.db")
+    store.add("a", "team@example.com", pause_info("a"), NOW + timedelta(minutes=50))
+    store.add("b", "team@example.com", pause_info("b"), NOW + timedelta(minutes=10))
+    store.set_meta("configured_calendar", "team@example.com")
+    store.close()
+
+    reopened = PausedEventStore(tmp_path / "paused.db")
+    assert reopened.get("a") == pause_info("a")
+    assert reopened.last_paused_id("team@example.com") == "b"
+    assert reopened.get_meta("configured_calendar") == "team@example.com"
+    assert reopened.calendar_of("a") == "team@example.com"
+    assert reopened.expired(NOW + timedelta(minutes=30)) == ["b"]
+    with reopened._connection() as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_workers_see_each_others_writes(tmp_path):
+    first = PausedEventStore(tmp_path / "paused.db")
+    second = PausedEventStore(tmp_path / "paused.db")
+    assert second.all() == {}
+
+    first.add("a", "team@example.com", pause_info("a"), NOW)
+    assert set(second.all()) == {"a"}
+    second.add("b", "team@example.com", pause_info("b"), NOW)
+    first.remove("a")
+    assert set(second.all()) == {"b"}
+    assert set(first.all()) == {"b"}
+    assert first.last_paused_id("team@example.com") == "b"
+
+    second.remove("b")
+    assert first.last_paused_id("team@example.com") is None
+
+def test_paused_events_are_partitioned_by_calendar(tmp_path):
+    store = PausedEventStore(tmp_path / "paused.db")
+    store.add("a", "one@example.com", pause_info("a"), NOW)
+    store.add("b", "two@example.com", pause_info("b"), NOW)
+    assert set(store.all("one@example.com")) == {"a"}
+    assert store.last_paused_id("one@example.com") == "a"
+    assert store.expired(NOW + timedelta(minutes=1), "two@example.com") == ["b"]
+    assert set(store.all()) == {"a", "b"}
+
+    snapshot = store.all("one@example.com")
+    store.add("c", "one@example.com", pause_info("c"), NOW)
+    store.remove("a")
+    assert set(snapshot) == {"a"}  # Callers iterate it while other threads write
+
+def test_records_are_compact_and_keep_the_original_only_on_request(monkeypatch, tmp_path):
+    original = {"id": "a", "summary": "Review", "description": "agenda " * 500, "attendees": [{"email": "x@y.z"}] * 50}
+    paused = PausedEvent.create("Review", NOW, NOW + timedelta(minutes=20), timedelta(minutes=20), original)
+    assert not hasattr(paused, "__dict__")
+    assert paused.original_event is None
+    assert paused.pause_time == NOW and paused.remaining_duration == timedelta(minutes=20)
+    assert paused.event_name is PausedEvent.create("".join(["Rev", "iew"]), NOW, NOW, timedelta(0)).event_name
+
+    monkeypatch.setattr(paused_store, "PAUSED_KEEP_ORIGINAL_EVENT", True)
+    kept = PausedEvent.create("Review", NOW, NOW + timedelta(minutes=20), timedelta(minutes=20), original)
+    assert len(kept.original_event_z) < len(str(original)) // 10
+    store = PausedEventStore(tmp_path / "paused.db")
+    store.add("a", "team@example.com", kept, NOW)
+    assert PausedEventStore(tmp_path / "paused.db").get("a").original_event == original
+
+def test_rows_written_before_paused_event_still_load(tmp_path):
+    store = PausedEventStore(tmp_path / "paused.db")
+    legacy = json.dumps({
+        "event_name": "Review", "original_event": {"id": "a"},
+        "pause_time": NOW.isoformat(), "original_end_time": (NOW + timedelta(minutes=20)).isoformat(),
+        "remaining_seconds": 1200.5})
+    with store._write() as connection:
+        connection.execute("INSERT INTO paused_events VALUES (?, ?, ?, ?, ?)",
+                           ("a", "team@example.com", NOW.timestamp(), NOW.timestamp(), legacy))
+    paused = PausedEventStore(tmp_path / "paused.db").get("a")
+    assert (paused.event_name, paused.pause_time, paused.remaining_seconds) == ("Review", NOW, 1200)
+    assert paused.original_event is None
+
+def test_other_workers_catch_up_by_delta(monkeypatch, tmp_path):
+    first = PausedEventStore(tmp_path / "paused.db")
+    second = PausedEventStore(tmp_path / "paused.db")
+    for name in "abc":
+        first.add(name, "team@example.com", pause_info(name), NOW + timedelta(minutes=ord(name)))
+    assert set(second.all()) == {"a", "b", "c"}  # First load: everything
+
+    reloads = []
+    reload = second._reload
+    monkeypatch.setattr(second, "_reload", lambda connection: reloads.append(1) or reload(connection))
+    first.remove("a")
+    first.add("d", "two@example.com", pause_info("d"), NOW)
+    first.set_meta("configured_calendar", "two@example.com")
+    assert set(second.all()) == {"b", "c", "d"}
+    assert second.expired(NOW + timedelta(minutes=1)) == ["d"]
+    assert second.last_paused_id("two@example.com") == "d"
+    assert second.get_meta("configured_calendar") == "two@example.com"
+    assert reloads == []
+
+    # Fallen behind the log: a full reload
+    monkeypatch.setattr(paused_store, "PAUSED_STORE_CHANGE_LOG_SIZE", 2)
+    for name in "efg":
+        first.add(name, "team@example.com", pause_info(name), NOW)
+    assert set(second.all()) == {"b", "c", "d", "e", "f", "g"}
+    assert reloads == [1]
@@ -0,0 +1,189 @@
+import asyncio
+import itertools
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+import async_calendar
+import calendar_registry
+import event_mirror
+import leases
+import push_channels
+import rate_limit
+import response_cache
+import utils
+from config import PUSH_WEBHOOK_PATH
+from conftest import FakeCalendar, make_event
+from push_channels import PushChannels
+
+CALENDAR = "team@example.com"
+
+class FakeNotifier:
+    """Local stand-in for Google's side of events().watch: opens channels and posts notifications"""
+
+    def __init__(self, expires_in: float = 7 * 24 * 3600):
+        self.channels = {}  # {channel_id: watch request body}
+        self.stopped = []
+        self.expires_in = expires_in
+        self.resource_ids = itertools.count(1)
+        self.message_numbers = itertools.count(1)
+
+    async def watch_events(self, calendar_id, body):
+        self.channels[body["id"]] = dict(body, calendar_id=calendar_id)
+        return {"kind": "api#channel", "id": body["id"], "resourceId": f"r{next(self.resource_ids)}",
+                "expiration": str(int((time.time() + self.expires_in) * 1000))}
+
+    async def stop_channel(self, channel_id, resource_id):
+        self.stopped.append(channel_id)
+        return {}
+
+    def notify(self, api, channel_id, state="exists", token=None):
+        return api.post(PUSH_WEBHOOK_PATH, headers={
+            "X-Goog-Channel-ID": channel_id,
+            "X-Goog-Channel-Token": self.channels[channel_id]["token"] if token is None else token,
+            "X-Goog-Resource-State": state,
+            "X-Goog-Message-Number": str(next(self.message_numbers)),
+        })
+
+@pytest.fixture
+def notifier(google, monkeypatch):
+    fake = FakeNotifier()
+    client = async_calendar.get_async_client()
+    monkeypatch.setattr(client, "watch_events", fake.watch_events)
+    monkeypatch.setattr(client, "stop_channel", fake.stop_channel)
+    monkeypatch.setattr(response_cache, "response_cache", response_cache.ResponseCache(ttl_seconds=60))
+    monkeypatch.setattr(app, "ENABLE_PUSH_NOTIFICATIONS", True)
+    return fake
+
+def open_channel(notifier):
+    asyncio.run(utils.get_push_channels().check())
+    return next(reversed(notifier.channels))
+
+def test_notification_refreshes_a_cached_listing(google, notifier):
+    api = TestClient(app.app)
+    assert api.post("/configure-calendar", json={"gmail": CALENDAR}).status_code == 200
+    channel_id = open_channel(notifier)
+    assert notifier.channels[channel_id]["type"] == "web_hook"
+    assert api.get("/events").json()["total_events"] == 0
+
+    # An edit made directly in Google Calendar
+    google.events["g1"] = make_event("g1", "Planning", "2025-01-01T09:00:00Z", "2025-01-01T10:00:00Z")
+    assert api.get("/events").json()["total_events"] == 0  # Still the cached answer
+
+    assert notifier.notify(api, channel_id).status_code == 200
+    assert api.get("/events").json()["total_events"] == 1
+    assert api.get("/metrics").json()["push_channels"]["notifications"] == 1
+
+def test_forged_tokens_and_handshakes(google, notifier):
+    api = TestClient(app.app)
+    assert api.post("/configure-calendar", json={"gmail": CALENDAR}).status_code == 200
+    channel_id = open_channel(notifier)
+    token = notifier.channels[channel_id]["token"]
+
+    assert notifier.notify(api, channel_id, token=token.replace("sig=", "sig=0")).status_code == 403
+    assert notifier.notify(api, channel_id, token=token.replace("team", "other")).status_code == 403
+    notifier.channels["elsewhere"] = {"token": token}  # A valid token replayed on another channel
+    assert notifier.notify(api, "elsewhere").status_code == 403
+
+    assert notifier.notify(api, channel_id, state="sync").status_code == 200
+    assert utils.get_push_channels().store.changed(CALENDAR) is None
+
+def test_webhook_is_exempt_from_the_rate_limiter(google, notifier, monkeypatch):
+    api = TestClient(app.app)
+    assert api.post("/configure-calendar", json={"gmail": CALENDAR}).status_code == 200
+    channel_id = open_channel(notifier)
+    monkeypatch.setattr(rate_limit, "inbound_limiter", rate_limit.ClientRateLimiter(per_minute=1, per_hour=100))
+    assert [api.get("/").status_code for _ in range(2)] == [200, 429]
+    assert [notifier.notify(api, channel_id).status_code for _ in range(5)] == [200] * 5
+
+def test_channels_are_renewed_before_they_expire(google, notifier):
+    api = TestClient(app.app)
+    assert api.post("/configure-calendar", json={"gmail": CALENDAR}).status_code == 200
+    notifier.expires_in = 1800  # Inside the default one-hour renewal margin
+    first = open_channel(notifier)
+    notifier.expires_in = 7 * 24 * 3600
+    second = open_channel(notifier)
+    assert second != first
+    assert notifier.stopped == [first]
+    assert utils.get_push_channels().channel(CALENDAR)["id"] == second
+
+    open_channel(notifier)  # Nothing due: no new channel
+    assert len(notifier.channels) == 2
+    assert utils.get_push_channels().stats()["renewals"] == 2
+
+    assert notifier.notify(api, first).status_code == 403  # Replaced: its token no longer counts
+    assert notifier.notify(api, second).status_code == 200
+
+def test_channel_bookkeeping_leaves_the_store_version_alone(google, notifier):
+    api = TestClient(app.app)
+    assert api.post("/configure-calendar", json={"gmail": CALENDAR}).status_code == 200
+    version = utils.get_paused_store().version()
+    channel_id = open_channel(notifier)
+    assert notifier.notify(api, channel_id).status_code == 200
+    assert utils.get_paused_store().version() == version
+
+def test_configured_calendars_get_a_channel_before_any_request(google, notifier):
+    utils.configure_calendar_id(CALENDAR)
+    utils.calendar_registry.stop_all()  # As after a restart: configured, but not served here yet
+    channel_id = open_channel(notifier)
+    assert notifier.channels[channel_id]["calendar_id"] == CALENDAR
+    assert utils.get_push_channels().channel(CALENDAR)["id"] == channel_id
+
+def test_a_channel_opened_after_losing_the_lease_is_stopped(google, notifier, monkeypatch):
+    utils.configure_calendar_id(CALENDAR)
+
+    async def lost(lease):
+        raise leases.LeaseLost("expired during watch")
+
+    monkeypatch.setattr(leases.Lease, "ensure_valid", lost)
+    channel_id = open_channel(notifier)
+    assert notifier.stopped == [channel_id]
+    assert utils.get_push_channels().channel(CALENDAR) is None
+
+def test_disabled_push_leaves_the_channel_store_unopened(local_state, monkeypatch):
+    monkeypatch.setattr(app, "ENABLE_PUSH_NOTIFICATIONS", False)
+    monkeypatch.setattr(utils, "push_channels", None)
+    with TestClient(app.app) as api:
+        assert api.get("/metrics").json()["push_channels"] is None
+    assert utils.push_channels is None
+
+def test_start_requires_an_address_and_a_shared_secret(monkeypatch, capsys):
+    monkeypatch.setattr(push_channels, "PUSH_CHANNEL_SECRET", "")
+    channels = PushChannels(None, lambda: None, address="")
+
+    async def start():
+        return channels.start()
+
+    assert asyncio.run(start()) is False
+    assert channels._task is None
+    assert "PUSH_WEBHOOK_URL, PUSH_CHANNEL_SECRET not set" in capsys.readouterr().out
+
+def test_other_workers_sync_their_mirrors(google, notifier, monkeypatch):
+    calendar = FakeCalendar([[make_event("a", "Standup", "2025-01-01T09:00:00Z", "2025-01-01T09:15:00Z")]])
+    monkeypatch.setattr(event_mirror, "iter_event_pages", calendar.iter_event_pages)
+    monkeypatch.setattr(calendar_registry, "ENABLE_EVENT_MIRROR", True)
+    # A second worker: its own registry and mirror, the same shared store
+    registry = calendar_registry.CalendarRegistry()
+    worker = PushChannels(utils.get_push_channels().store, lambda: registry)
+    mirror = registry.get(CALENDAR).mirror
+    try:
+        deadline = time.monotonic() + 5
+        while not mirror.is_fresh() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        worker.apply(CALENDAR)  # Nothing notified yet
+        calendar.changes = [make_event("b", "Review", "2025-01-01T10:00:00Z", "2025-01-01T11:00:00Z")]
+        assert [e["id"] for e in mirror.all_events()] == ["a"]
+
+        api = TestClient(app.app)
+        assert api.post("/configure-calendar", json={"gmail": CALENDAR}).status_code == 200
+        assert notifier.notify(api, open_channel(notifier)).status_code == 200
+
+        asyncio.run(worker.check())
+        while len(mirror.all_events()) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [e["id"] for e in mirror.all_events()] == ["a", "b"]
+    finally:
+        registry.stop_all()
+        utils.calendar_registry.stop_all()
@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+import app
+import rate_limit
+
+def test_clients_have_separate_minute_and_hour_buckets():
+    limiter = rate_limit.ClientRateLimiter(per_minute=3, per_hour=100)
+    assert [limiter.admit("10.0.0.1") for _ in range(3)] == [0, 0, 0]
+    assert 19 < limiter.admit("10.0.0.1") <= 20
+    assert limiter.admit("10.0.0.2") == 0
+
+    hourly = rate_limit.ClientRateLimiter(per_minute=100, per_hour=2)
+    hourly.admit("10.0.0.1")
+    hourly.admit("10.0.0.1")
+    assert 1790 < hourly.admit("10.0.0.1") <= 1800
+
+def test_a_new_clients_first_request_is_admitted():
+    # The bucket is created after admit() reads the clock; a one-token bucket must still be full
+    limiter = rate_limit.ClientRateLimiter(per_minute=1, per_hour=1)
+    assert limiter.admit("10.0.0.1") == 0
+    assert limiter.admit("10.0.0.1") > 0
+
+def test_over_the_limit_gets_429_with_retry_after(monkeypatch, local_state):
+    monkeypatch.setattr(rate_limit, "inbound_limiter", rate_limit.ClientRateLimiter(per_minute=2, per_hour=100))
+    api = TestClient(app.app)
+    assert [api.get("/").status_code for _ in range(2)] == [200, 200]
+    limited = api.get("/")
+    assert limited.status_code == 429
+    assert limited.headers["Retry-After"] == "30"
+
+def test_clients_behind_trusted_proxies_are_keyed_on_forwarded_for(monkeypatch, local_state):
+    monkeypatch.setattr(rate_limit, "inbound_limiter", rate_limit.ClientRateLimiter(per_minute=1, per_hour=100))
+    api = TestClient(app.app)
+    assert api.get("/", headers={"X-Forwarded-For": "198.51.100.1"}).status_code == 200
+    assert api.get("/", headers={"X-Forwarded-For": "198.51.100.2"}).status_code == 429  # Header not trusted
+
+    monkeypatch.setitem(rate_limit.RATE_LIMIT, "trusted_proxies", 1)
+    monkeypatch.setattr(rate_limit, "inbound_limiter", rate_limit.ClientRateLimiter(per_minute=1, per_hour=100))
+    assert api.get("/", headers={"X-Forwarded-For": "198.51.100.1"}).status_code == 200
+    assert api.get("/", headers={"X-Forwarded-For": "198.51.100.2"}).status_code == 200
+    # A spoofed leftmost entry doesn't buy a fresh bucket; the proxy-appended one counts
+    assert api.get("/", headers={"X-Forwarded-For": "203.0.113.9, 198.51.100.1"}).status_code == 429
+    assert rate_limit.client_address("10.0.0.1", None) == "10.0.0.1"
+
+def test_bulk_calls_leave_the_reserve_to_interactive_ones():
+    throttle = rate_limit.OutboundThrottle(per_minute=60, burst=5, reserve=2)
+    began = time.monotonic()
+    throttle.acquire(3, rate_limit.PRIORITY_BULK)
+    throttle.acquire(2, rate_limit.PRIORITY_INTERACTIVE)
+    assert time.monotonic() - began < 0.1
+    assert throttle.stats()["interactive_waits"] == 0
+
+def test_interactive_calls_queue_ahead_of_bulk():
+    throttle = rate_limit.OutboundThrottle(per_minute=6000, burst=3, reserve=1)  # a token every 10ms
+    throttle.acquire(3, rate_limit.PRIORITY_INTERACTIVE)
+    finished = []
+
+    async def call(name, priority, delay):
+        await asyncio.sleep(delay)
+        await throttle.acquire_async(priority=priority)
+        finished.append(name)
+
+    async def scenario():
+        await asyncio.gather(
+            call("bulk", rate_limit.PRIORITY_BULK, 0),
+            call("interactive", rate_limit.PRIORITY_INTERACTIVE, 0.002))
+
+    asyncio.run(scenario())
+    assert finished == ["interactive", "bulk"]
+    assert throttle.stats()["bulk_waits"] >= 1
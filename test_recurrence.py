@@ -0,0 +1,87 @@
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+import utils
+from config import RECURRENCE_RULES
+from recurrence import Recurrence, RecurrenceError, UnsupportedRecurrence, event_occurrences
+
+def starts(start, lines, **window):
+    return [o.replace(tzinfo=None) for o in Recurrence(start, lines).occurrences(**window)]
+
+def test_weekly_byday_with_count():
+    assert starts(datetime(2025, 1, 6, 9), ["RRULE:FREQ=WEEKLY;BYDAY=MO,WE;COUNT=5"]) == [
+        datetime(2025, 1, 6, 9), datetime(2025, 1, 8, 9), datetime(2025, 1, 13, 9),
+        datetime(2025, 1, 15, 9), datetime(2025, 1, 20, 9)]
+
+def test_week_start_decides_which_days_share_a_weekly_period():
+    # RFC 5545's WKST example: a Tuesday start, every other week on Tuesday and Sunday
+    start = datetime(1997, 8, 5, 9)
+    assert [o.day for o in starts(start, ["RRULE:FREQ=WEEKLY;INTERVAL=2;COUNT=4;BYDAY=TU,SU;WKST=MO"])] == [5, 10, 19, 24]
+    assert [o.day for o in starts(start, ["RRULE:FREQ=WEEKLY;INTERVAL=2;COUNT=4;BYDAY=TU,SU;WKST=SU"])] == [5, 17, 19, 31]
+    window = {"window_start": datetime(1997, 8, 16), "window_end": datetime(1997, 8, 20)}
+    assert [o.day for o in starts(start, ["RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=TU,SU;WKST=SU"], **window)] == [17, 19]
+
+def test_monthly_ordinal_byday_and_short_months():
+    assert starts(datetime(2025, 1, 31, 18), ["RRULE:FREQ=MONTHLY;BYDAY=-1FR;COUNT=3"]) == [
+        datetime(2025, 1, 31, 18), datetime(2025, 2, 28, 18), datetime(2025, 3, 28, 18)]
+    # Day 31 only exists in some months
+    assert [o.month for o in starts(datetime(2025, 1, 31), ["RRULE:FREQ=MONTHLY;COUNT=4"])] == [1, 3, 5, 7]
+
+def test_interval_until_and_exdate():
+    lines = ["RRULE:FREQ=DAILY;INTERVAL=2;UNTIL=20250110T090000Z", "EXDATE:20250105T090000Z"]
+    start = datetime(2025, 1, 1, 9, tzinfo=timezone.utc)
+    assert [o.day for o in starts(start, lines)] == [1, 3, 7, 9]
+
+def test_exdate_still_counts_toward_count():
+    lines = ["RRULE:FREQ=DAILY;COUNT=3", "EXDATE;TZID=Asia/Kolkata:20250102T093000"]
+    start = datetime(2025, 1, 1, 9, 30, tzinfo=ZoneInfo("Asia/Kolkata"))
+    assert [o.day for o in starts(start, lines)] == [1, 3]
+
+def test_wall_time_is_kept_across_dst():
+    start = datetime(2025, 3, 3, 9, tzinfo=ZoneInfo("America/New_York"))
+    occurrences = list(Recurrence(start, ["RRULE:FREQ=WEEKLY;COUNT=3"]).occurrences())
+    assert [o.hour for o in occurrences] == [9, 9, 9]
+    assert occurrences[1].timestamp() - occurrences[0].timestamp() == timedelta(days=7, hours=-1).total_seconds()
+
+def test_far_window_skips_ahead_lazily():
+    series = Recurrence(datetime(2000, 1, 3, 8, tzinfo=timezone.utc), ["RRULE:FREQ=WEEKLY;BYDAY=MO,TH"])
+    window_start = datetime(2090, 6, 1, tzinfo=timezone.utc)
+    began = time.perf_counter()
+    found = list(series.occurrences(window_start, window_start + timedelta(days=14)))
+    assert time.perf_counter() - began < 0.05
+    assert len(found) == 4
+    assert all(o.weekday() in (0, 3) and o >= window_start for o in found)
+
+def test_rejects_malformed_and_flags_unsupported():
+    with pytest.raises(RecurrenceError):
+        Recurrence(datetime(2025, 1, 1), ["RRULE:FREQ=DAILY;COUNT=0"])
+    with pytest.raises(RecurrenceError):
+        Recurrence(datetime(2025, 1, 1), ["RRULE:FREQ=WEEKLY;WKST=XX"])
+    with pytest.raises(UnsupportedRecurrence):
+        Recurrence(datetime(2025, 1, 1), ["RRULE:FREQ=MONTHLY;BYMONTHDAY=15"])
+
+def test_event_occurrences_clip_to_window():
+    event = {
+        "start": {"dateTime": "2025-01-06T09:00:00+05:30", "timeZone": "Asia/Kolkata"},
+        "end": {"dateTime": "2025-01-06T10:00:00+05:30", "timeZone": "Asia/Kolkata"},
+        "recurrence": ["RRULE:FREQ=DAILY"],
+    }
+    window_start = datetime(2025, 1, 10, 4, tzinfo=timezone.utc)  # 09:30 IST, mid-occurrence
+    found = event_occurrences(event, window_start, window_start + timedelta(days=2))
+    assert [start.day for start, _ in found] == [10, 11, 12]  # the 12th starts 09:00 IST, before 09:30
+    assert all(end - start == timedelta(hours=1) for start, end in found)
+
+def test_create_validation_enforces_max_recurring_count(monkeypatch):
+    monkeypatch.setattr(utils, "MAX_RECURRING_COUNT", 10)
+    args = ("Standup", "2025-01-06T09:00:00", "2025-01-06T09:15:00", "Asia/Kolkata")
+    utils.build_event_body(*args, recurrence=["RRULE:FREQ=DAILY;COUNT=10"])
+    utils.build_event_body(*args, recurrence=["RRULE:FREQ=WEEKLY;UNTIL=20250301T000000Z"])
+    for too_many in (["RRULE:FREQ=DAILY;COUNT=11"], ["RRULE:FREQ=DAILY;UNTIL=20250301T000000Z"]):
+        with pytest.raises(ValueError):
+            utils.build_event_body(*args, recurrence=too_many)
+    # Open-ended series (the RECURRENCE_RULES presets) are never capped
+    for rule in ["RRULE:FREQ=DAILY", "RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR", *RECURRENCE_RULES.values()]:
+        utils.build_event_body(*args, recurrence=[rule])
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+import async_calendar
+import resilience
+from async_calendar import CalendarHTTPError
+
+class Flaky:
+    """Fails with the given errors, then returns "ok" """
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(resilience.time, "sleep", slept.append)
+    return slept
+
+def test_retries_retryable_errors_honoring_retry_after(sleeps):
+    attempt = Flaky(CalendarHTTPError(503, "backend"), CalendarHTTPError(429, "slow down", "2"), TimeoutError())
+    assert resilience.call_with_retry(attempt) == "ok"
+    assert attempt.calls == 4
+    assert sleeps[1] == 2
+    assert all(0 <= delay <= resilience.CALENDAR_RETRY_MAX_SECONDS for delay in sleeps)
+
+def test_client_errors_and_long_retry_after_are_not_retried(sleeps):
+    with pytest.raises(CalendarHTTPError):
+        resilience.call_with_retry(Flaky(CalendarHTTPError(404, "Not Found")))
+    # Waiting 60s would end past the 20s deadline, so the caller gets the error now
+    with pytest.raises(CalendarHTTPError):
+        resilience.call_with_retry(Flaky(CalendarHTTPError(503, "backend", "60")), deadline_seconds=20)
+    assert sleeps == []
+    assert resilience.is_retryable(CalendarHTTPError(403, "Rate Limit Exceeded"))
+    assert not resilience.is_retryable(CalendarHTTPError(403, "Forbidden"))
+
+def test_circuit_opens_fails_fast_and_probes(monkeypatch, sleeps):
+    breaker = resilience.CircuitBreaker(failure_threshold=3, reset_seconds=0.05)
+    monkeypatch.setattr(resilience, "circuit_breaker", breaker)
+    attempt = Flaky(*[CalendarHTTPError(503, "backend")] * 3)
+    with pytest.raises(CalendarHTTPError):
+        resilience.call_with_retry(attempt, max_retries=5)
+    assert attempt.calls == 3  # the third failure opened the circuit
+    assert breaker.state == "open"
+    with pytest.raises(resilience.CircuitOpen):
+        resilience.call_with_retry(attempt)
+    assert attempt.calls == 3
+
+    threading.Event().wait(0.06)  # time.sleep is stubbed out here
+    assert resilience.call_with_retry(attempt) == "ok"  # the probe succeeds
+    assert breaker.state == "closed"
+
+def test_hung_upstream_is_bounded_and_inserts_stay_idempotent(monkeypatch):
+    monkeypatch.setattr(resilience, "CALENDAR_ATTEMPT_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(resilience, "CALENDAR_RETRY_BASE_SECONDS", 0.001)
+    monkeypatch.setattr(async_calendar, "get_credentials", lambda: type("Creds", (), {"valid": True, "token": "t"})())
+    stored = {}
+    posts = []
+
+    async def handler(request):
+        if request.method == "POST":
+            event = json.loads(request.content)
+            posts.append(event["id"])
+            if event["id"] in stored:
+                return httpx.Response(409, json={"error": {"message": "duplicate"}})
+            stored[event["id"]] = event
+            await asyncio.sleep(1)  # lands upstream, but the response hangs
+        if request.url.path.endswith("/slow"):
+            await asyncio.sleep(1)
+        return httpx.Response(200, json=stored[request.url.path.split("/")[-1]])
+
+    client = async_calendar.AsyncCalendarClient()
+    client._http = httpx.AsyncClient(base_url=client._http.base_url, transport=httpx.MockTransport(handler))
+
+    began = time.monotonic()
+    created = asyncio.run(client.insert_event("team@example.com", {"summary": "Standup"}))
+    assert created["summary"] == "Standup"
+    assert len(stored) == 1 and len(posts) == 2  # the retry hit 409 and fetched the first insert
+    assert time.monotonic() - began < 0.5
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(resilience.call_with_retry_async(
+            lambda timeout: asyncio.wait_for(asyncio.sleep(1), timeout), deadline_seconds=0.2))
+    assert time.monotonic() - began < 0.9
+
+def test_throttle_waits_come_out_of_the_deadline_not_the_attempt_timeout(monkeypatch):
+    monkeypatch.setattr(resilience, "CALENDAR_ATTEMPT_TIMEOUT_SECONDS", 1)
+    timeouts = []
+
+    async def throttle():
+        await asyncio.sleep(0.15)
+
+    async def attempt(timeout):
+        timeouts.append(timeout)
+        return "ok"
+
+    assert asyncio.run(resilience.call_with_retry_async(attempt, deadline_seconds=0.2, before_attempt=throttle)) == "ok"
+    assert timeouts[0] <= 0.05  # Only what the throttle wait left of the deadline
@@ -0,0 +1,39 @@
+import time
+
+from response_cache import MISS, ResponseCache
+
+def test_lru_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1, "one@example.com")
+    cache.set("b", 2, "one@example.com")
+    assert cache.get("a") == 1
+    cache.set("c", 3, "two@example.com")
+    assert cache.get("b") is MISS
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+def test_entries_expire_after_ttl_or_sooner():
+    cache = ResponseCache(ttl_seconds=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2, expires_in=0.01)
+    assert cache.get("a") == 1
+    time.sleep(0.02)
+    assert cache.get("b") is MISS
+    assert cache.get("a") == 1
+    time.sleep(0.04)
+    assert cache.get("a") is MISS
+
+def test_invalidation_is_per_calendar_and_versions_must_match():
+    cache = ResponseCache()
+    cache.set(("/events", "one@example.com"), "one", "one@example.com")
+    cache.set(("/events", "two@example.com"), "two", "two@example.com")
+    cache.set(("/",), "root", None, version=7)
+    cache.invalidate("one@example.com")
+    assert cache.get(("/events", "one@example.com")) is MISS
+    assert cache.get(("/events", "two@example.com")) == "two"
+    assert cache.get(("/",), version=7) == "root"
+    assert cache.get(("/",), version=8) is MISS  # Another worker wrote to the store
+
+def test_disabled_cache_never_stores():
+    cache = ResponseCache(enabled=False)
+    cache.set("a", 1)
+    assert cache.get("a") is MISS
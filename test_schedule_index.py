@@ -0,0 +1,98 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+import async_calendar
+import event_mirror
+import utils
+from conftest import FakeCalendar, make_event
+from event_mirror import EventMirror
+from schedule_index import ScheduleIndex, is_pausable
+
+BASE = datetime(2025, 3, 3, 8, tzinfo=timezone.utc)
+
+def at(minutes, seconds=0):
+    return BASE + timedelta(minutes=minutes, seconds=seconds)
+
+def mirror_of(monkeypatch, events):
+    monkeypatch.setattr(event_mirror, "iter_event_pages", FakeCalendar([events]).iter_event_pages)
+    mirror = EventMirror("team@example.com")
+    mirror.sync()
+    return mirror
+
+def scan(mirror, moment):
+    """The old lookup: first pausable event, by start, containing moment"""
+    return next((e for e in mirror.all_events() if is_pausable(e) and
+                 event_mirror.event_bounds(e)[0] <= moment <= event_mirror.event_bounds(e)[1]), None)
+
+def test_lookup_matches_a_full_scan(monkeypatch):
+    rng = random.Random(7)
+    events = []
+    for n in range(300):
+        start = at(rng.randrange(0, 24 * 60), rng.randrange(60))
+        end = start + timedelta(minutes=rng.choice([0, 1, 15, 45, 90, 600]), seconds=rng.randrange(60))
+        summary = rng.choice(["Focus", "[COMPLETED] Focus", "Review"])
+        events.append(make_event(f"e{n}", summary, start.isoformat(), end.isoformat()))
+    mirror = mirror_of(monkeypatch, events)
+
+    moments = sorted(at(rng.randrange(-60, 25 * 60), rng.randrange(60)) for _ in range(500))
+    moments += [event_mirror.event_bounds(e)[i] for e in events[:50] for i in (0, 1)]
+    for moment in moments:
+        assert mirror.ongoing_event(moment) is scan(mirror, moment)
+
+def test_answer_is_kept_until_the_next_boundary(monkeypatch):
+    events = [make_event("a", "Standup", at(0).isoformat(), at(15).isoformat()),
+              make_event("b", "Review", at(30).isoformat(), at(60).isoformat())]
+    ordered = mirror_of(monkeypatch, events)._snapshot()[0]
+    index = ScheduleIndex(ordered, at(0))
+
+    assert index.ongoing(at(5))["id"] == "a"
+    assert index.next_boundary(at(5)) == at(15)
+    assert index.ongoing(at(15))["id"] == "a"  # The end minute itself still counts
+    assert index.ongoing(at(15, 1)) is None
+    assert index.ongoing(at(29, 59)) is None
+    assert index.ongoing(at(30))["id"] == "b"
+    assert not index.covers(at(24 * 60))
+
+def test_mirror_rebuilds_the_index_after_changes(monkeypatch):
+    mirror = mirror_of(monkeypatch, [make_event("a", "Standup", at(0).isoformat(), at(15).isoformat())])
+    assert mirror.ongoing_event(at(5))["id"] == "a"
+    mirror.discard_event("a")
+    assert mirror.ongoing_event(at(5)) is None
+    mirror.apply_event(make_event("b", "Review", at(0).isoformat(), at(60).isoformat()))
+    assert mirror.ongoing_event(at(5))["id"] == "b"
+    assert mirror.ongoing_event(at(3 * 24 * 60)) is None  # Outside the first window
+
+def test_live_lookup_reads_past_a_page_of_unpausable_events(google, monkeypatch):
+    now = datetime.now(timezone.utc)
+    span = lambda n, summary: make_event(f"e{n}", summary, (now - timedelta(minutes=30)).isoformat(),
+                                         (now + timedelta(minutes=30)).isoformat())
+    pages = [[span(n, "[COMPLETED] Focus") for n in range(10)], [span(10, "Study Session")]]
+    requests = []
+
+    async def iter_event_pages(calendar_id, **params):
+        requests.append(params)
+        for items in pages:
+            yield {"items": items}
+
+    monkeypatch.setattr(async_calendar.get_async_client(), "iter_event_pages", iter_event_pages)
+    event = asyncio.run(utils.get_current_ongoing_event("team@example.com"))
+    assert event["id"] == "e10"
+    assert requests[0]["timeMax"] > requests[0]["timeMin"]
+
+def test_local_writes_patch_the_index(monkeypatch):
+    rng = random.Random(11)
+    event = lambda n: make_event(f"e{n}", rng.choice(["Focus", "[COMPLETED] Focus"]),
+                                 at(rng.randrange(-120, 24 * 60)).isoformat(),
+                                 at(rng.randrange(-120, 24 * 60) + 180).isoformat())
+    mirror = mirror_of(monkeypatch, [event(n) for n in range(100)])
+    mirror.ongoing_event(at(0))
+    schedule = mirror._schedule
+    for step in range(200):
+        if rng.random() < 0.3:
+            mirror.discard_event(f"e{rng.randrange(150)}")
+        else:
+            mirror.apply_event(event(rng.randrange(150)))
+        moment = at(rng.randrange(0, 24 * 60), rng.randrange(60))
+        assert mirror.ongoing_event(moment) is scan(mirror, moment)
+    assert mirror._schedule is schedule  # Patched, never rebuilt
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import scheduler
+
+def run_scheduler(entries, cancelled=(), pending=lambda event_id: False, wait=0.3):
+    """Schedule (event_id, seconds_from_now) entries and record each on_due call"""
+    calls = []
+
+    async def scenario():
+        s = scheduler.RescheduleScheduler(lambda: record(calls), pending)
+        s.start()
+        now = datetime.now(timezone.utc)
+        for event_id, delay in entries:
+            s.schedule(event_id, now + timedelta(seconds=delay))
+        for event_id in cancelled:
+            s.cancel(event_id)
+        await asyncio.sleep(wait)
+        await s.stop()
+        return s
+
+    async def record(calls):
+        calls.append(asyncio.get_running_loop().time())
+
+    return calls, asyncio.run(scenario())
+
+def test_wakes_for_earlier_deadline_added_later():
+    calls, s = run_scheduler([("late", 60), ("soon", 0.05)])
+    assert len(calls) == 1
+    assert len(s) == 1  # "late" still waiting
+
+def test_cancelled_deadlines_never_fire():
+    calls, s = run_scheduler([("resumed", 0.05)], cancelled=["resumed"])
+    assert calls == []
+    assert s.next_deadline() is None
+
+def test_still_pending_events_are_retried_later(monkeypatch):
+    monkeypatch.setattr(scheduler, "SCHEDULER_RETRY_SECONDS", 0.1)
+    calls, s = run_scheduler([("stuck", 0.02)], pending=lambda event_id: True, wait=0.3)
+    assert len(calls) >= 2
+    assert len(s) == 1
+
+def test_deadlines_set_from_another_thread_wake_the_loop():
+    calls = []
+
+    async def scenario():
+        s = scheduler.RescheduleScheduler(lambda: record(calls), lambda event_id: False)
+        s.start()
+        await asyncio.sleep(0.05)
+        # Store writes run in threads and schedule from there
+        await asyncio.to_thread(s.schedule, "paused", datetime.now(timezone.utc) + timedelta(seconds=0.05))
+        await asyncio.sleep(0.3)
+        await s.stop()
+        return s
+
+    async def record(calls):
+        calls.append(asyncio.get_running_loop().time())
+
+    s = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert len(s) == 0
+
+def test_deadlines_only_in_the_shared_store_fall_due(monkeypatch):
+    # Another (since recycled) worker paused the event: it is in the store but not in this heap
+    monkeypatch.setattr(scheduler, "SCHEDULER_RETRY_SECONDS", 10)
+    calls = []
+    shared = [time.time() + 0.05]
+
+    async def scenario():
+        s = scheduler.RescheduleScheduler(lambda: record(calls), lambda event_id: False, lambda: shared[0])
+        s.start()
+        await asyncio.sleep(0.3)
+        await s.stop()
+
+    async def record(calls):
+        calls.append(asyncio.get_running_loop().time())
+
+    asyncio.run(scenario())
+    assert len(calls) == 1  # Still due after on_due(): held back for the retry delay, not spun on
+
+def test_the_shared_store_is_polled_for_new_deadlines(monkeypatch):
+    monkeypatch.setattr(scheduler, "SCHEDULER_POLL_SECONDS", 0.05)
+    calls = []
+    shared = [None]
+
+    async def scenario():
+        s = scheduler.RescheduleScheduler(lambda: record(calls), lambda event_id: False, lambda: shared[0])
+        s.start()
+        await asyncio.sleep(0.1)
+        shared[0] = time.time()  # Set by another worker; nothing wakes this one
+        await asyncio.sleep(0.2)
+        await s.stop()
+
+    async def record(calls):
+        calls.append(asyncio.get_running_loop().time())
+        shared[0] = None  # Rescheduled
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
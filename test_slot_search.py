@@ -0,0 +1,54 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from slot_search import merge_busy, suggest_slots
+
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+def at(minutes):
+    return BASE + timedelta(minutes=minutes)
+
+def minute_by_minute(busy, horizon_start, horizon_end, duration, top_k, step):
+    """Reference answer: check every minute of the horizon one by one"""
+    first = int(horizon_start.timestamp() // 60)
+    last = int(horizon_end.timestamp() // 60)
+    busy_minutes = [(int(start.timestamp() // 60), int(end.timestamp() // 60)) for start, end in busy]
+
+    def minute_free(minute):
+        return all(not start <= minute < end for start, end in busy_minutes)
+
+    slots = []
+    for minute in range(first, last - duration + 1):
+        fits = all(minute_free(m) for m in range(minute, minute + duration))
+        gap_start = minute == first or not minute_free(minute - 1)
+        if fits and (gap_start or minute % step == 0):
+            slots.append(at(minute - int(BASE.timestamp() // 60)))
+    return slots[:top_k]
+
+def test_merge_busy_sweep():
+    starts, ends = merge_busy(np.array([50, 0, 10, 100]), np.array([60, 20, 40, 120]))
+    assert starts.tolist() == [0, 50, 100]
+    assert ends.tolist() == [40, 60, 120]
+
+def test_suggestions_skip_busy_time():
+    busy = [(at(60), at(120)), (at(150), at(300))]
+    slots = suggest_slots(busy, at(0), at(600), [30, 60], top_k=3, step_minutes=30)
+    assert slots[30] == [(at(0), at(30)), (at(30), at(60)), (at(120), at(150))]
+    assert slots[60] == [(at(0), at(60)), (at(300), at(360)), (at(330), at(390))]
+
+def test_matches_minute_by_minute_scan():
+    rng = random.Random(3)
+    for _ in range(200):
+        busy = []
+        for _ in range(rng.randint(0, 8)):
+            begin = rng.randint(0, 400)
+            busy.append((at(begin), at(begin + rng.randint(1, 90))))
+        horizon_start = at(rng.randint(0, 60))
+        horizon_end = horizon_start + timedelta(minutes=rng.randint(60, 480))
+        duration = rng.randint(5, 90)
+        top_k = rng.randint(1, 10)
+        step = rng.choice([15, 30])
+        got = [start for start, _ in suggest_slots(busy, horizon_start, horizon_end, [duration], top_k, step)[duration]]
+        assert got == minute_by_minute(busy, horizon_start, horizon_end, duration, top_k, step)
@@ -0,0 +1,73 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from config import STARTUP_BUDGET_SECONDS
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def get_free_port():
+    """Ask the OS for an unused local port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def measure_startup_seconds():
+    """Launch uvicorn and return the seconds until it answers GET /"""
+    port = get_free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = started + STARTUP_BUDGET_SECONDS * 5
+        while time.perf_counter() < deadline:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=0.5) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.02)
+        raise AssertionError("uvicorn did not become ready")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+def test_app_import_defers_google_client():
+    """Importing app.py must not pull in the googleapiclient stack"""
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, app; print('googleapiclient' in sys.modules)"],
+        cwd=APP_DIR, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
+
+def test_app_import_defers_numpy():
+    """NumPy is only needed by /suggest-slots, so importing app.py must not load it"""
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, app; print('numpy' in sys.modules)"],
+        cwd=APP_DIR, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
+
+def test_bundled_discovery_document_builds_offline():
+    """The pinned discovery document builds a service without fetching anything"""
+    from calendar_client import build_calendar_service, load_discovery_document
+    from google.auth.credentials import AnonymousCredentials
+
+    document = load_discovery_document()
+    assert document["name"] == "calendar" and document["version"] == "v3"
+    service = build_calendar_service(AnonymousCredentials())
+    assert hasattr(service, "events") and hasattr(service, "freebusy")
+
+def test_startup_within_budget():
+    """Time from launching uvicorn until it serves requests stays under budget"""
+    elapsed = measure_startup_seconds()
+    print(f"uvicorn ready in {elapsed:.3f}s (budget {STARTUP_BUDGET_SECONDS:.1f}s)")
+    assert elapsed < STARTUP_BUDGET_SECONDS
+
+if __name__ == "__main__":
+    print(f"uvicorn ready in {measure_startup_seconds():.3f}s (budget {STARTUP_BUDGET_SECONDS:.1f}s)")
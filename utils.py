@@ -1,261 +1,599 @@
+import asyncio
 import os
-from datetime import datetime, timedelta
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from datetime import datetime, timedelta, timezone
+from calendar_client import get_service
+from async_calendar import get_async_client
+from event_mirror import event_bounds, parse_rfc3339
+from schedule_index import is_pausable
+from calendar_registry import CalendarRegistry
+from interval_index import BusyIntervals
+from paused_store import PausedEventStore, PausedEvent
+from leases import get_lease_manager, LeaseUnavailable
+from push_channels import PushChannels, SQLitePushChannelStore
+from response_cache import get_response_cache
+from rate_limit import get_outbound_throttle
+from resilience import call_with_retry, is_retryable
+from recurrence import Recurrence, RecurrenceError, UnsupportedRecurrence, event_occurrences
 from config import (
-    SERVICE_ACCOUNT_FILE, SCOPES, AUTO_RESCHEDULE_AFTER_ORIGINAL_END_MINUTES,
+    AUTO_RESCHEDULE_AFTER_ORIGINAL_END_MINUTES,
     AUTO_RESCHEDULE_AFTER_PAUSE_HOURS, AUTO_RESCHEDULE_SEARCH_DAYS,
-    COMPLETED_EVENT_PREFIX, MISSED_EVENT_PREFIX, RESCHEDULED_EVENT_PREFIX,
-    MAX_EVENTS_TO_FETCH, LOG_AUTO_RESCHEDULE, UTC_TIMEZONE
+    MISSED_EVENT_PREFIX, RESCHEDULED_EVENT_PREFIX,
+    MAX_EVENTS_TO_FETCH, LOG_AUTO_RESCHEDULE, UTC_TIMEZONE,
+    BATCH_REQUEST_SIZE, BATCH_MAX_RETRIES, BATCH_RETRY_BASE_SECONDS, BATCH_PARALLELISM, MAX_EVENTS_PAGE_SIZE,
+    FREEBUSY_CACHE_SECONDS, SLOT_SUGGESTION_STEP_MINUTES, MAX_RECURRING_COUNT, PAUSED_STORE_PATH, PAUSED_STORE_POOL_SIZE,
+    CONFLICT_CHECK_HORIZON_DAYS, MAX_REPORTED_CONFLICTS, FIELD_MASKS
 )
 
 # Global variables
-configured_calendar_id = None
-paused_events = {}  # {event_id: {"event_name": str, "original_event": event_data, "pause_time": datetime, "remaining_duration": timedelta}}
-last_paused_event_id = None  # Track the most recently paused event
-
-def get_service():
-    """Get Google Calendar service instance"""
-    creds = Credentials.from_service_account_file(
-        SERVICE_ACCOUNT_FILE, scopes=SCOPES)
-    service = build("calendar", "v3", credentials=creds)
-    return service
-
-def get_current_ongoing_event():
+paused_store = None  # Paused events, configured calendars and last paused IDs, shared by all workers
+calendar_registry = CalendarRegistry()  # Per-calendar mirror and free/busy cache in this process
+reschedule_scheduler = None  # Background deadline scheduler, attached by the app lifespan
+push_channels = None  # events().watch channels and notification fan-out (see get_push_channels)
+
+async def get_current_ongoing_event(calendar_id: str):
     """Get the current/ongoing event at this moment"""
-    global configured_calendar_id
-    
-    if not configured_calendar_id:
+    if not calendar_id:
         raise Exception("Calendar not configured")
     
-    service = get_service()
-    now = datetime.utcnow().isoformat() + 'Z'  # 'Z' indicates UTC time
+    current_time = datetime.now(datetime.utcnow().astimezone().tzinfo)  # Make timezone-aware
+    mirror = get_event_mirror(calendar_id)
     
-    # Get events happening now and in the near future
-    events_result = service.events().list(
-        calendarId=configured_calendar_id,
-        timeMin=now,
-        maxResults=MAX_EVENTS_TO_FETCH,
-        singleEvents=True,
-        orderBy='startTime'
-    ).execute()
+    if mirror:
+        return mirror.ongoing_event(current_time)
     
-    events = events_result.get('items', [])
-    current_time = datetime.now(datetime.utcnow().astimezone().tzinfo)  # Make timezone-aware
+    # Whole minutes so concurrent callers send identical requests and share one
+    minute = datetime.utcnow().replace(second=0, microsecond=0)
     
-    for event in events:
-        # Skip completed events
-        if event.get('summary', '').startswith(COMPLETED_EVENT_PREFIX):
-            continue
+    # Only events overlapping this minute, every page of them: [COMPLETED] records and
+    # all-day events can fill a page ahead of the one that is on now
+    async for page in get_async_client().iter_event_pages(
+        calendar_id,
+        timeMin=minute.isoformat() + 'Z',  # 'Z' indicates UTC time
+        timeMax=(minute + timedelta(minutes=1)).isoformat() + 'Z',
+        maxResults=MAX_EVENTS_TO_FETCH,
+        singleEvents=True,
+        orderBy='startTime',
+        fields=FIELD_MASKS["ongoing_event"]
+    ):
+        for event in page.get('items', []):
+            if not is_pausable(event):
+                continue
+            start_time, end_time = event_bounds(event)
             
-        start_time = datetime.fromisoformat(event['start']['dateTime'].replace('Z', '+00:00'))
-        end_time = datetime.fromisoformat(event['end']['dateTime'].replace('Z', '+00:00'))
-        
-        # Check if current time is within the event duration
-        if start_time <= current_time <= end_time:
-            return event
+            # Check if current time is within the event duration
+            if start_time <= current_time <= end_time:
+                return event
     
     return None
 
-def auto_reschedule_abandoned_events():
-    """Reschedule events that have been paused for too long without resume"""
-    global paused_events, configured_calendar_id
-    
-    if not configured_calendar_id or not paused_events:
-        return
-    
+def paused_event_lease_key(event_id: str):
+    """Lease key shared by pause, resume and reschedule of one event"""
+    return f"event:{event_id}"
+
+async def auto_reschedule_abandoned_events(calendar_id: str = None):
+    """Reschedule events that have been paused for too long without resume (one calendar, or every one for None)"""
     current_time = datetime.now(datetime.utcnow().astimezone().tzinfo)  # Make timezone-aware
-    service = get_service()
-    events_to_reschedule = []
-    
-    for event_id, pause_info in list(paused_events.items()):
-        original_end_time = pause_info["original_end_time"]
-        pause_time = pause_info["pause_time"]
-        
-        # Smart timeout logic:
-        # 1. If original end time + 30 minutes has passed, reschedule immediately
-        # 2. OR if paused for more than 2 hours (fallback for very long pauses)
-        time_since_original_end = current_time - original_end_time
-        time_since_pause = current_time - pause_time
-        
-        should_reschedule = (
-            (time_since_original_end > timedelta(minutes=AUTO_RESCHEDULE_AFTER_ORIGINAL_END_MINUTES)) or  # Configurable minutes after original end time
-            (time_since_pause > timedelta(hours=AUTO_RESCHEDULE_AFTER_PAUSE_HOURS))  # Configurable hours after pause
-        )
-        
-        if should_reschedule:
-            events_to_reschedule.append((event_id, pause_info, time_since_original_end, time_since_pause))
     
-    for event_id, pause_info, time_since_original_end, time_since_pause in events_to_reschedule:
+    # Smart timeout logic (see get_pause_deadline):
+    # 1. If original end time + configured minutes has passed, reschedule immediately
+    # 2. OR if paused for more than the configured hours (fallback for very long pauses)
+    for event_id in await asyncio.to_thread(get_paused_store().expired, current_time, calendar_id):
         try:
-            # Find available slot and reschedule
-            available_start, available_end = find_available_slot(
-                current_time,
-                pause_info["remaining_duration"],
-                service
-            )
-            
-            # Create the rescheduled event with smart labeling
-            if time_since_original_end > timedelta(minutes=AUTO_RESCHEDULE_AFTER_ORIGINAL_END_MINUTES):
-                summary = f"{MISSED_EVENT_PREFIX} {pause_info['event_name']}"
-            else:
-                summary = f"{RESCHEDULED_EVENT_PREFIX} {pause_info['event_name']}"
-            
-            event_data = {
-                "summary": summary,
-                "start": {"dateTime": available_start.isoformat(), "timeZone": UTC_TIMEZONE},
-                "end": {"dateTime": available_end.isoformat(), "timeZone": UTC_TIMEZONE},
-                "description": f"Auto-rescheduled after {time_since_pause.total_seconds()/3600:.1f} hours pause. Original end time was {pause_info['original_end_time'].strftime('%Y-%m-%d %H:%M')}"
-            }
-            
-            created_event = service.events().insert(
-                calendarId=configured_calendar_id,
-                body=event_data
-            ).execute()
-            
-            # Remove from paused events
-            del paused_events[event_id]
-            
-            # Update last_paused_event_id if this was the last one
-            global last_paused_event_id
-            if last_paused_event_id == event_id:
-                last_paused_event_id = None
-            
-            if LOG_AUTO_RESCHEDULE:
-                print(f"Auto-rescheduled event: {pause_info['event_name']} -> {summary}")
-            
+            async with get_lease_manager().hold(paused_event_lease_key(event_id)) as lease:
+                await reschedule_paused_event(event_id, current_time, lease)
+        except LeaseUnavailable:
+            continue  # Being resumed or rescheduled by another worker
         except Exception as e:
             print(f"Failed to auto-reschedule event {event_id}: {str(e)}")
 
-def find_available_slot(start_time: datetime, duration: timedelta, service):
-    """Find the next available slot for the given duration"""
-    global configured_calendar_id
+async def reschedule_paused_event(event_id: str, current_time: datetime, lease):
+    """Move one expired paused event to the next free slot (caller holds its lease)"""
+    store = get_paused_store()
+    # Re-read under the lease: a resume or another worker may have got here first
+    pause_info = await asyncio.to_thread(store.get, event_id)
+    if pause_info is None:
+        return
+    calendar_id = await asyncio.to_thread(lambda: store.calendar_of(event_id) or get_configured_calendar_id())
+    time_since_original_end = current_time - pause_info.original_end_time
+    time_since_pause = current_time - pause_info.pause_time
     
-    # Convert to ISO format for API
-    time_min = start_time.isoformat()
-    time_max = (start_time + timedelta(days=7)).isoformat()  # Look up to 7 days ahead
+    # Find available slot and reschedule
+    available_start, available_end = await find_available_slot(
+        calendar_id,
+        current_time,
+        pause_info.remaining_duration
+    )
     
-    # Get existing events in the range
-    events_result = service.events().list(
-        calendarId=configured_calendar_id,
-        timeMin=time_min,
-        timeMax=time_max,
-        singleEvents=True,
-        orderBy='startTime'
-    ).execute()
+    # Create the rescheduled event with smart labeling
+    if time_since_original_end > timedelta(minutes=AUTO_RESCHEDULE_AFTER_ORIGINAL_END_MINUTES):
+        summary = f"{MISSED_EVENT_PREFIX} {pause_info.event_name}"
+    else:
+        summary = f"{RESCHEDULED_EVENT_PREFIX} {pause_info.event_name}"
+    
+    event_data = {
+        "summary": summary,
+        "start": {"dateTime": available_start.isoformat(), "timeZone": UTC_TIMEZONE},
+        "end": {"dateTime": available_end.isoformat(), "timeZone": UTC_TIMEZONE},
+        "description": f"Auto-rescheduled after {time_since_pause.total_seconds()/3600:.1f} hours pause. Original end time was {pause_info.original_end_time.strftime('%Y-%m-%d %H:%M')}"
+    }
     
-    events = events_result.get('items', [])
+    # Fencing: never insert on a lease that has expired meanwhile
+    await lease.ensure_valid()
+    created_event = await get_async_client().insert_event(calendar_id, event_data)
+    record_created_event(calendar_id, created_event)
     
-    # Sort events by start time
-    sorted_events = sorted(events, key=lambda x: x['start']['dateTime'])
+    # Remove from paused events (also drops its scheduler deadline)
+    await asyncio.to_thread(remove_paused_event, event_id)
     
-    # Find the first available slot
-    current_time = start_time
-    end_time = start_time + duration
+    if LOG_AUTO_RESCHEDULE:
+        print(f"Auto-rescheduled event: {pause_info.event_name} -> {summary}")
+
+async def query_busy_periods(calendar_id: str, time_min: datetime, time_max: datetime):
+    """Busy (start, end) datetimes of a calendar from freebusy().query"""
+    freebusy_result = await get_async_client().freebusy({
+        "timeMin": time_min.isoformat(),
+        "timeMax": time_max.isoformat(),
+        "items": [{"id": calendar_id}]
+    })
     
-    for event in sorted_events:
-        event_start = datetime.fromisoformat(event['start']['dateTime'].replace('Z', '+00:00'))
-        event_end = datetime.fromisoformat(event['end']['dateTime'].replace('Z', '+00:00'))
-        
-        # If there's a gap before this event
-        if current_time + duration <= event_start:
-            return current_time, end_time
-        
-        # Move to after this event
-        if event_end > current_time:
-            current_time = event_end
-            end_time = current_time + duration
+    calendar_info = freebusy_result.get('calendars', {}).get(calendar_id, {})
+    if calendar_info.get('errors'):
+        raise Exception(f"Free/busy query failed: {calendar_info['errors']}")
     
-    # If no suitable slot found, return the last available time
-    return current_time, end_time
+    return [(parse_rfc3339(busy['start']), parse_rfc3339(busy['end'])) for busy in calendar_info.get('busy', [])]
 
-def create_event_in_past(event_name: str, start_time: datetime, end_time: datetime):
-    """Create an event in the past to record the completed portion"""
-    global configured_calendar_id
+async def get_busy_intervals(calendar_id: str, start_time: datetime):
+    """Get merged busy intervals from start_time over the search horizon
     
-    service = get_service()
+    Uses freebusy().query, which returns only busy intervals instead of full
+    event bodies. The result is kept for FREEBUSY_CACHE_SECONDS so repeated
+    slot searches (e.g. one auto-reschedule pass) share one upstream call.
+    """
+    state = calendar_registry.get(calendar_id)
+    cached = state.busy_intervals_cache
+    if (cached is not None
+            and cached["window_start"] <= start_time
+            and time.monotonic() - cached["fetched_at"] <= FREEBUSY_CACHE_SECONDS):
+        return cached["intervals"]
+    
+    # Whole minutes so concurrent searches send identical queries and share one
+    window_start = start_time.replace(second=0, microsecond=0)
+    window_end = window_start + timedelta(days=AUTO_RESCHEDULE_SEARCH_DAYS)
+    intervals = BusyIntervals(await query_busy_periods(calendar_id, window_start, window_end))
+    state.busy_intervals_cache = {
+        "window_start": window_start,
+        "fetched_at": time.monotonic(),
+        "intervals": intervals
+    }
+    return intervals
+
+async def find_available_slot(calendar_id: str, start_time: datetime, duration: timedelta):
+    """Find the next available slot for the given duration"""
+    busy = await get_busy_intervals(calendar_id, start_time)
     
+    # If nothing fits inside the horizon this is the end of the last busy interval
+    return busy.next_free_slot(start_time, duration)
+
+async def suggest_free_slots(calendar_id: str, start_time: datetime, durations_minutes: list,
+                             horizon: timedelta, top_k: int):
+    """Earliest top_k free slots for each duration between start_time and start_time + horizon"""
+    from slot_search import suggest_slots  # NumPy; imported on first use to keep app start-up fast
+
+    busy_periods = await query_busy_periods(calendar_id, start_time, start_time + horizon)
+    return suggest_slots(busy_periods, start_time, start_time + horizon,
+                         durations_minutes, top_k, SLOT_SUGGESTION_STEP_MINUTES)
+
+async def create_event_in_past(calendar_id: str, event_name: str, start_time: datetime, end_time: datetime):
+    """Create an event in the past to record the completed portion"""
     event_data = {
         "summary": f"[COMPLETED] {event_name}",
         "start": {"dateTime": start_time.isoformat(), "timeZone": "UTC"},
         "end": {"dateTime": end_time.isoformat(), "timeZone": "UTC"},
     }
     
-    created_event = service.events().insert(
-        calendarId=configured_calendar_id,
-        body=event_data
-    ).execute()
+    created_event = await get_async_client().insert_event(calendar_id, event_data)
+    record_created_event(calendar_id, created_event)
     
     return created_event
 
-def get_expired_events_info():
-    """Get information about expired paused events"""
-    global paused_events
+def batch_delete_events(calendar_id: str, event_ids: list):
+    """Delete events with Google batch requests and report a result per event
     
-    if not paused_events:
-        return []
+    Up to BATCH_REQUEST_SIZE deletes go in each batch. Sub-requests that fail
+    with a retryable status (429, 5xx or a quota 403) are retried on their own;
+    the rest of the batch is not resent.
     
-    current_time = datetime.now(datetime.utcnow().astimezone().tzinfo)
-    expired_events = []
+    Returns one {"event_id", "status", "error"} dict per input ID, in order.
+    Status is "deleted", "already_deleted" (404/410) or "failed".
+    """
+    service = get_service()
+    results = {event_id: {"event_id": event_id, "status": "failed", "error": None} for event_id in event_ids}
+    pending = list(dict.fromkeys(event_ids))
     
-    for event_id, pause_info in paused_events.items():
-        original_end_time = pause_info["original_end_time"]
-        pause_time = pause_info["pause_time"]
+    for attempt in range(BATCH_MAX_RETRIES + 1):
+        retryable = []
         
-        time_since_original_end = current_time - original_end_time
-        time_since_pause = current_time - pause_time
+        def on_response(request_id, response, exception):
+            if exception is None:
+                results[request_id].update(status="deleted", error=None)
+                return
+            status = getattr(getattr(exception, "resp", None), "status", None)
+            if status in (404, 410):
+                results[request_id].update(status="already_deleted", error=None)
+                return
+            results[request_id]["error"] = str(exception)
+            if is_retryable(exception):
+                retryable.append(request_id)
         
-        # Check if event should be expired
-        should_expire = (
-            (time_since_original_end > timedelta(minutes=30)) or
-            (time_since_pause > timedelta(hours=2))
-        )
+        for offset in range(0, len(pending), BATCH_REQUEST_SIZE):
+            batch = service.new_batch_http_request(callback=on_response)
+            chunk = pending[offset:offset + BATCH_REQUEST_SIZE]
+            for event_id in chunk:
+                batch.add(service.events().delete(calendarId=calendar_id, eventId=event_id), request_id=event_id)
+            get_outbound_throttle().acquire(len(chunk))  # Google charges quota per sub-request
+            try:
+                # Failed sub-requests are retried below, so only the circuit breaker applies here
+                call_with_retry(batch.execute, max_retries=0)
+            except Exception as e:
+                # The whole batch call failed - every sub-request in it can be retried
+                for event_id in chunk:
+                    if results[event_id]["status"] == "failed":
+                        results[event_id]["error"] = str(e)
+                        retryable.append(event_id)
         
-        if should_expire:
-            expired_events.append({
-                "event_id": event_id,
-                "event_name": pause_info["event_name"],
-                "paused_at": pause_info["pause_time"].isoformat(),
-                "original_end_time": pause_info["original_end_time"].isoformat(),
-                "time_since_original_end_minutes": time_since_original_end.total_seconds() / 60,
-                "time_since_pause_hours": time_since_pause.total_seconds() / 3600,
-                "remaining_duration": str(pause_info["remaining_duration"]),
-                "will_be_labeled": "[MISSED]" if time_since_original_end > timedelta(minutes=30) else "[RESCHEDULED]"
-            })
+        if not retryable or attempt == BATCH_MAX_RETRIES:
+            break
+        pending = retryable
+        time.sleep(BATCH_RETRY_BASE_SECONDS * (2 ** attempt))
+    
+    return [results[event_id] for event_id in event_ids]
+
+def batch_insert_events(calendar_id: str, bodies: list):
+    """Insert events with Google batch requests and report a result per body
+    
+    Bodies are split into batches of BATCH_REQUEST_SIZE, and up to
+    BATCH_PARALLELISM batches are in flight at once. Each body gets a
+    client-generated event ID, so a sub-request retried after a 429/5xx or
+    quota 403 cannot create a duplicate: a 409 on retry means the first attempt landed.
+    
+    Returns one {"status", "event", "error"} dict per body, in order.
+    Status is "created" or "failed".
+    """
+    bodies = [dict(body, id=body.get("id") or uuid.uuid4().hex) for body in bodies]
+    results = [{"status": "failed", "event": None, "error": None} for _ in bodies]
+    pending = list(range(len(bodies)))
+    if not bodies:
+        return results
+    
+    # One pool for every attempt; retries reuse its threads (and their connections)
+    with ThreadPoolExecutor(max_workers=min(BATCH_PARALLELISM, len(range(0, len(bodies), BATCH_REQUEST_SIZE)))) as pool:
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            retryable = []
+            
+            def run_batch(chunk):
+                service = get_service()  # Requests built here use this worker thread's connection
+                
+                def on_response(request_id, response, exception):
+                    index = int(request_id)
+                    if exception is None:
+                        results[index].update(status="created", event=response, error=None)
+                        return
+                    status = getattr(getattr(exception, "resp", None), "status", None)
+                    if status == 409 and attempt > 0:
+                        results[index].update(status="created", event=bodies[index], error=None)
+                        return
+                    results[index]["error"] = str(exception)
+                    if is_retryable(exception):
+                        retryable.append(index)
+                
+                batch = service.new_batch_http_request(callback=on_response)
+                for index in chunk:
+                    batch.add(service.events().insert(calendarId=calendar_id, body=bodies[index]), request_id=str(index))
+                get_outbound_throttle().acquire(len(chunk))  # Google charges quota per sub-request
+                try:
+                    # Failed sub-requests are retried below, so only the circuit breaker applies here
+                    call_with_retry(batch.execute, max_retries=0)
+                except Exception as e:
+                    # The whole batch call failed - every sub-request in it can be retried
+                    for index in chunk:
+                        if results[index]["status"] == "failed":
+                            results[index]["error"] = str(e)
+                            retryable.append(index)
+            
+            chunks = [pending[offset:offset + BATCH_REQUEST_SIZE] for offset in range(0, len(pending), BATCH_REQUEST_SIZE)]
+            list(pool.map(run_batch, chunks))
+            
+            if not retryable or attempt == BATCH_MAX_RETRIES:
+                break
+            pending = sorted(retryable)
+            time.sleep(BATCH_RETRY_BASE_SECONDS * (2 ** attempt))
+    
+    return results
+
+def get_expired_events_info(calendar_id: str = None):
+    """Get information about expired paused events (of one calendar, or all)"""
+    current_time = datetime.now(datetime.utcnow().astimezone().tzinfo)
+    expired_events = []
+    
+    # Only the expired prefix of the deadline index is visited
+    store = get_paused_store()
+    for event_id in store.expired(current_time, calendar_id):
+        pause_info = store.get(event_id)
+        if pause_info is None:
+            continue  # Resumed or rescheduled meanwhile
+        time_since_original_end = current_time - pause_info.original_end_time
+        time_since_pause = current_time - pause_info.pause_time
+        missed = time_since_original_end > timedelta(minutes=AUTO_RESCHEDULE_AFTER_ORIGINAL_END_MINUTES)
+        
+        expired_events.append({
+            "event_id": event_id,
+            "event_name": pause_info.event_name,
+            "paused_at": pause_info.pause_time.isoformat(),
+            "original_end_time": pause_info.original_end_time.isoformat(),
+            "time_since_original_end_minutes": time_since_original_end.total_seconds() / 60,
+            "time_since_pause_hours": time_since_pause.total_seconds() / 3600,
+            "remaining_duration": str(pause_info.remaining_duration),
+            "will_be_labeled": MISSED_EVENT_PREFIX if missed else RESCHEDULED_EVENT_PREFIX
+        })
     
     return expired_events
 
+async def find_events_by_name(calendar_id: str, event_name: str, match_case: bool = True):
+    """Find events by title, ordered by start time
+    
+    Served from the mirror's name index when it is warm. Otherwise Google's
+    q= full-text filter narrows the listing server-side and the exact title
+    match is applied here.
+    """
+    mirror = get_event_mirror(calendar_id)
+    if mirror:
+        return mirror.events_named(event_name, match_case)
+    
+    wanted = event_name if match_case else event_name.casefold()
+    events = []
+    async for page in get_async_client().iter_event_pages(calendar_id, q=event_name, singleEvents=True,
+                                                          orderBy='startTime', maxResults=MAX_EVENTS_PAGE_SIZE,
+                                                          fields=FIELD_MASKS["events_by_name"]):
+        for event in page.get('items', []):
+            summary = event.get('summary', '')
+            if (summary if match_case else summary.casefold()) == wanted:
+                events.append(event)
+    return events
+
+UTC_OFFSET_PATTERN = re.compile(r"^[+-](\d{1,2}):([0-5]\d)$")
+
+def resolve_event_timezone(timezone_name: str, utc_offset: str = None):
+    """Validate a timezone name or UTC offset and return the value sent to Google
+    
+    Offsets like "+5:30" become "UTC+5:30"; names must be IANA zones.
+    Raises ValueError for anything Google would reject.
+    """
+    if utc_offset:
+        match = UTC_OFFSET_PATTERN.match(utc_offset)
+        if not match or int(match.group(1)) > 14:
+            raise ValueError(f"Invalid utc_offset: {utc_offset}")
+        # Google Calendar accepts UTC offsets in format like "UTC+05:30" or "UTC-07:00"
+        return f"UTC{utc_offset}"
+    try:
+        ZoneInfo(timezone_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {timezone_name}")
+    return timezone_name
+
+def build_event_body(event_name: str, start_datetime: str, end_datetime: str,
+                     timezone_name: str, utc_offset: str = None, recurrence: list = None):
+    """Validate a create-event payload and build the events().insert body
+    
+    Returns (body, timezone_used). Raises ValueError on bad input.
+    """
+    timezone_to_use = resolve_event_timezone(timezone_name, utc_offset)
+    try:
+        start = datetime.fromisoformat(start_datetime.replace('Z', '+00:00'))
+        end = datetime.fromisoformat(end_datetime.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"Invalid datetime: {start_datetime} / {end_datetime}")
+    if (start.tzinfo is None) != (end.tzinfo is None) or end <= start:
+        raise ValueError("end_datetime must be after start_datetime")
+    
+    if recurrence:
+        if start.tzinfo is None and not utc_offset:
+            start = start.replace(tzinfo=ZoneInfo(timezone_to_use))
+        try:
+            series = Recurrence(start, recurrence)
+        except UnsupportedRecurrence:
+            series = None  # Parts we do not expand are left to Google
+        # Open-ended series are fine: expansion is always windowed (see Recurrence.occurrences)
+        if series is not None and series.rule.bounded and series.count(MAX_RECURRING_COUNT) > MAX_RECURRING_COUNT:
+            raise ValueError(f"Recurrence COUNT/UNTIL allows more than {MAX_RECURRING_COUNT} occurrences")
+    
+    event_data = {
+        "summary": event_name,
+        "start": {"dateTime": start_datetime, "timeZone": timezone_to_use},
+        "end": {"dateTime": end_datetime, "timeZone": timezone_to_use},
+    }
+    
+    # Add recurrence if provided
+    if recurrence:
+        event_data["recurrence"] = recurrence
+    return event_data, timezone_to_use
+
+def event_body_bounds(event_data: dict):
+    """Aware (start, end) of a build_event_body result
+
+    Naive dateTimes are read in the body's timeZone ("UTC+5:30" style
+    offsets included).
+    """
+    time_zone = event_data["start"]["timeZone"]
+    match = UTC_OFFSET_PATTERN.match(time_zone[3:]) if time_zone.startswith("UTC") else None
+    if match:
+        offset = timedelta(hours=int(match.group(1)), minutes=int(match.group(2)))
+        tz = timezone(-offset if time_zone[3] == "-" else offset)
+    else:
+        tz = ZoneInfo(time_zone)
+    bounds = []
+    for key in ("start", "end"):
+        moment = datetime.fromisoformat(event_data[key]["dateTime"].replace('Z', '+00:00'))
+        bounds.append(moment if moment.tzinfo is not None else moment.replace(tzinfo=tz))
+    return tuple(bounds)
+
+def find_conflicts(calendar_id: str, event_data: dict):
+    """Existing events overlapping a new event, checking every occurrence of a recurrence
+
+    Answered from the calendar mirror's interval index, never from Google.
+    Returns None when no fresh mirror is available (nothing was checked).
+    Transparent ("show as available") events never conflict.
+    """
+    mirror = get_event_mirror(calendar_id)
+    if mirror is None:
+        return None
+    start, end = event_body_bounds(event_data)
+    aware = dict(event_data,
+                 start=dict(event_data["start"], dateTime=start.isoformat()),
+                 end=dict(event_data["end"], dateTime=end.isoformat()))
+    try:
+        occurrences = event_occurrences(aware, start, start + timedelta(days=CONFLICT_CHECK_HORIZON_DAYS))
+    except RecurrenceError:
+        occurrences = [(start, end)]  # Only the first instance can be checked locally
+    
+    conflicts = {}
+    for occurrence_start, occurrence_end in occurrences:
+        for _, _, existing in mirror.intervals_overlapping(occurrence_start, occurrence_end):
+            if existing.get('transparency') == 'transparent' or existing['id'] in conflicts:
+                continue
+            conflicts[existing['id']] = dict(format_event_info(existing), occurrence_start=occurrence_start.isoformat())
+            if len(conflicts) >= MAX_REPORTED_CONFLICTS:
+                return list(conflicts.values())
+    return list(conflicts.values())
+
+def format_event_info(event: dict):
+    """Reduce a Google event to the fields returned by the API"""
+    return {
+        "event_id": event.get('id'),
+        "event_name": event.get('summary', 'No Title'),
+        "start_time": event.get('start', {}).get('dateTime', event.get('start', {}).get('date', 'N/A')),
+        "end_time": event.get('end', {}).get('dateTime', event.get('end', {}).get('date', 'N/A')),
+        "status": event.get('status', 'confirmed')
+    }
+
 def configure_calendar_id(gmail: str):
-    """Configure the calendar ID"""
-    global configured_calendar_id
-    configured_calendar_id = gmail
+    """Register a calendar and make it the default for requests that do not name one
+    
+    Persisted, so every worker (and the next restart) serves it too.
+    """
+    store = get_paused_store()
+    store.set_meta(f"calendar:{gmail}", "configured")
+    store.set_meta("configured_calendar", gmail)
+    state = calendar_registry.get(gmail)
+    state.busy_intervals_cache = None
+    get_response_cache().invalidate(gmail)
+    get_response_cache().invalidate(None)
+
+def is_calendar_configured(calendar_id: str):
+    """Whether a calendar has been registered through configure_calendar_id"""
+    return get_paused_store().get_meta(f"calendar:{calendar_id}") is not None
+
+def get_event_mirror(calendar_id: str):
+    """Get a calendar's mirror if it is synced and fresh enough to serve reads"""
+    mirror = calendar_registry.get(calendar_id).mirror
+    if mirror is not None and mirror.is_fresh():
+        return mirror
+    return None
+
+def record_created_event(calendar_id: str, event: dict):
+    """Make an event created by this service visible to mirrored reads"""
+    state = calendar_registry.get(calendar_id)
+    with calendar_registry.lock_for(calendar_id):
+        if state.mirror is not None:
+            state.mirror.apply_event(event)
+        cache = state.busy_intervals_cache
+        if cache is not None:
+            try:
+                # Recurring events are expanded locally over the cached window
+                window_end = cache["window_start"] + timedelta(days=AUTO_RESCHEDULE_SEARCH_DAYS)
+                for bounds in event_occurrences(event, cache["window_start"], window_end):
+                    cache["intervals"].add(*bounds)
+            except (KeyError, ValueError):
+                state.busy_intervals_cache = None
+    get_response_cache().invalidate(calendar_id)
+
+def record_deleted_event(calendar_id: str, event_id: str):
+    """Drop an event deleted by this service from mirrored reads"""
+    state = calendar_registry.get(calendar_id)
+    with calendar_registry.lock_for(calendar_id):
+        if state.mirror is not None:
+            state.mirror.discard_event(event_id)
+        # Merged intervals cannot be split again, so refetch on the next search
+        state.busy_intervals_cache = None
+    get_response_cache().invalidate(calendar_id)
+
+def get_paused_store():
+    """Get the shared paused-event store, opening it on first use"""
+    global paused_store
+    if paused_store is None:
+        paused_store = PausedEventStore(PAUSED_STORE_PATH, PAUSED_STORE_POOL_SIZE)
+    return paused_store
+
+def get_push_channels():
+    """Get this process's push channel manager, creating it on first use"""
+    global push_channels
+    if push_channels is None:
+        push_channels = PushChannels(SQLitePushChannelStore(PAUSED_STORE_PATH), lambda: calendar_registry,
+                                     get_configured_calendar_ids)
+    return push_channels
+
+def get_configured_calendar_ids():
+    """Every calendar configured by any worker"""
+    return [key[len("calendar:"):] for key in get_paused_store().meta_keys("calendar:")]
 
 def get_configured_calendar_id():
-    """Get the configured calendar ID"""
-    return configured_calendar_id
+    """Get the default calendar ID (the most recently configured one)"""
+    return get_paused_store().get_meta("configured_calendar")
+
+def get_pause_deadline(pause_info: PausedEvent):
+    """When a paused event becomes due for auto-reschedule"""
+    return min(
+        pause_info.original_end_time + timedelta(minutes=AUTO_RESCHEDULE_AFTER_ORIGINAL_END_MINUTES),
+        pause_info.pause_time + timedelta(hours=AUTO_RESCHEDULE_AFTER_PAUSE_HOURS)
+    )
 
-def add_paused_event(event_id: str, pause_info: dict):
-    """Add an event to the paused events list"""
-    global paused_events, last_paused_event_id
-    paused_events[event_id] = pause_info
-    last_paused_event_id = event_id
+def attach_reschedule_scheduler(scheduler):
+    """Feed paused-event deadlines to the background scheduler (None detaches)"""
+    global reschedule_scheduler
+    reschedule_scheduler = scheduler
+    if scheduler is not None:
+        for event_id, pause_info in get_all_paused_events().items():
+            scheduler.schedule(event_id, get_pause_deadline(pause_info))
+
+def add_paused_event(calendar_id: str, event_id: str, pause_info: PausedEvent):
+    """Add an event to a calendar's paused events"""
+    deadline = get_pause_deadline(pause_info)
+    get_paused_store().add(event_id, calendar_id, pause_info, deadline)
+    get_response_cache().invalidate(calendar_id)
+    if reschedule_scheduler is not None:
+        reschedule_scheduler.schedule(event_id, deadline)
 
 def get_paused_event(event_id: str):
     """Get a specific paused event"""
-    return paused_events.get(event_id)
+    return get_paused_store().get(event_id)
 
-def get_all_paused_events():
-    """Get all paused events"""
-    return paused_events
+def get_all_paused_events(calendar_id: str = None):
+    """Get the paused events of one calendar, or of every calendar"""
+    return get_paused_store().all(calendar_id)
 
 def remove_paused_event(event_id: str):
     """Remove an event from the paused events list"""
-    global paused_events, last_paused_event_id
-    if event_id in paused_events:
-        del paused_events[event_id]
-    if last_paused_event_id == event_id:
-        last_paused_event_id = None
-
-def get_last_paused_event_id():
-    """Get the last paused event ID"""
-    return last_paused_event_id
\ No newline at end of file
+    store = get_paused_store()
+    calendar_id = store.calendar_of(event_id)
+    store.remove(event_id)
+    get_response_cache().invalidate(calendar_id)
+    if reschedule_scheduler is not None:
+        reschedule_scheduler.cancel(event_id)
+
+def get_last_paused_event_id(calendar_id: str):
+    """Get a calendar's last paused event ID"""
+    return get_paused_store().last_paused_id(calendar_id)
\ No newline at end of file